@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the Repository Schema Generator
+
+Generates synthetic repositories and times each pipeline stage separately: directory walk,
+ignore matching, metadata extraction, JSON write, markdown write, dependency graph and
+Qdrant upsert (against qdrant-client's in-process mode). Results are written as JSON so
+runs on different commits can be compared with --compare. Progress and comparisons go to
+stderr, so without --output stdout holds only the results JSON.
+
+Usage:
+    python benchmark.py --files 1000 10000 --depth 4 --ignore-patterns 100 --output bench.json
+    python benchmark.py --files 10000 --compare bench.json
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import contextlib
+import statistics
+import subprocess
+import importlib.util
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+# repo-schema.py is not importable by name, so load it from its file path
+_spec = importlib.util.spec_from_file_location("repo_schema", os.path.join(SCRIPT_DIR, "repo-schema.py"))
+repo_schema = importlib.util.module_from_spec(_spec)
+# Registered so process pool workers can unpickle references to its functions
+sys.modules["repo_schema"] = repo_schema
+_spec.loader.exec_module(repo_schema)
+
+from utils.ignore_matcher import IgnoreMatcher
+
+# Bump when a stage's measurement changes, so results are not compared across definitions
+BENCHMARK_VERSION = 3
+STAGES = ["walk", "ignore_matching", "metadata_extraction", "json_write", "markdown_write",
+          "dependency_graph", "qdrant_upsert"]
+DEFAULT_LANGUAGES = "py=4,js=3,go=1,java=1,md=1,json=1"
+
+# Synthetic file templates; {name} is the module name, {dep} another module in the repo
+TEMPLATES = {
+    "py": ('"""Module {name}"""\nimport os\nimport json\nfrom {dep} import helper_{dep}\n\n'
+           'def helper_{name}(value):\n    return helper_{dep}(value)\n\n'
+           'class {cls}:\n    def run(self):\n        return os.getcwd()\n'),
+    "js": ("import React from 'react';\nimport {{ helper_{dep} }} from './{dep}';\n\n"
+           "export function helper_{name}(value) {{\n    return helper_{dep}(value);\n}}\n\n"
+           "export class {cls} {{}}\n"),
+    "go": ('package {name}\n\nimport (\n    "fmt"\n    "example.com/app/{dep}"\n)\n\n'
+           'type {cls} struct {{}}\n\nfunc Run() {{\n    fmt.Println({dep}.Name)\n}}\n'),
+    "java": ("package com.example;\n\nimport com.example.{dep};\n\n"
+             "public class {cls} {{\n    public void run() {{}}\n}}\n"),
+    "md": "# {cls}\n\nNotes for {name}.\n\n## Usage\n\nSee {dep}.\n",
+    "json": '{{"name": "{name}", "version": "1.0.0", "depends": ["{dep}"]}}\n',
+}
+
+def parse_languages(spec):
+    """Parse "py=4,js=3" into {"py": 4, "js": 3}"""
+    weights = {}
+    for item in spec.split(","):
+        ext, _, weight = item.partition("=")
+        ext = ext.strip().lstrip(".")
+        if ext not in TEMPLATES:
+            raise ValueError(f"Unsupported language '{ext}' (choose from {', '.join(sorted(TEMPLATES))})")
+        weights[ext] = float(weight or 1)
+    return weights
+
+def generate_ignore_patterns(count):
+    """Generate a mix of literal, extension, glob, anchored and negated gitignore patterns"""
+    patterns = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            patterns.append(f"build{i}/")
+        elif kind == 1:
+            patterns.append(f"*.tmp{i}")
+        elif kind == 2:
+            patterns.append(f"gen{i}/**/*.out")
+        elif kind == 3:
+            patterns.append(f"/cache{i}")
+        else:
+            patterns.append(f"!keep{i - 3}.tmp{i - 3}")
+    return patterns
+
+def generate_synthetic_repo(base_dir, files, depth=3, languages=DEFAULT_LANGUAGES, ignore_patterns=20, seed=0):
+    """Create a synthetic repository under base_dir and return a description of it.
+
+    Files are spread over directories up to depth levels deep, with extensions drawn from the
+    languages weights. Each source file imports another generated module so the dependency
+    stage has work to do. ignore_patterns patterns (plus node_modules/) are written to
+    .gitignore, and for some of them matching files and directories are created so the walk
+    has something to prune.
+    """
+    rng = random.Random(seed)
+    weights = parse_languages(languages) if isinstance(languages, str) else dict(languages)
+    extensions = list(weights)
+    dir_names = [f"pkg{i}" for i in range(max(2, int(files ** 0.5) // 2))]
+    modules = [f"mod{i}" for i in range(files)]
+
+    for i, name in enumerate(modules):
+        ext = rng.choices(extensions, weights=[weights[e] for e in extensions])[0]
+        levels = rng.randint(0, depth)
+        folder = os.path.join(base_dir, *(rng.choice(dir_names) for _ in range(levels)))
+        os.makedirs(folder, exist_ok=True)
+        content = TEMPLATES[ext].format(name=name, dep=modules[rng.randrange(files)], cls=f"Class{i}")
+        with open(os.path.join(folder, f"{name}.{ext}"), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    patterns = generate_ignore_patterns(ignore_patterns)
+    with open(os.path.join(base_dir, ".gitignore"), "w", encoding="utf-8") as f:
+        f.write("\n".join(patterns + ["node_modules/"]) + "\n")
+
+    # Content matched by the first patterns of each kind, plus a dependency directory
+    ignored = 0
+    for pattern in patterns[:50]:
+        if pattern.endswith("/"):
+            target = os.path.join(base_dir, rng.choice(dir_names), pattern.rstrip("/"), "out.js")
+        elif pattern.startswith("*"):
+            target = os.path.join(base_dir, rng.choice(dir_names), "scratch" + pattern[1:])
+        elif pattern.startswith("/"):
+            target = os.path.join(base_dir, pattern[1:], "data.bin")
+        else:
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            f.write("ignored\n")
+        ignored += 1
+    for i in range(min(200, files // 10)):
+        target = os.path.join(base_dir, "node_modules", f"dep{i % 20}", f"index{i}.js")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            f.write("module.exports = {};\n")
+        ignored += 1
+
+    return {"files": files, "depth": depth, "languages": weights, "ignore_patterns": ignore_patterns,
+            "ignored_files": ignored, "seed": seed}
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the progress output of the pipeline functions"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def _time(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def run_stages(base_dir, output_dir, workers=1, worker_type="process"):
+    """Run each pipeline stage once on base_dir, returning {stage: {"seconds", "items"}}
+
+    Only the generated repo's .gitignore is applied, not the tool's own .repoignore, so the
+    results depend on the generation parameters alone.
+    """
+    stages = {}
+    patterns = repo_schema.read_ignore_file(os.path.join(base_dir, ".gitignore"))
+    spec = IgnoreMatcher(patterns)
+
+    # Walk: full traversal without ignore pruning
+    def walk():
+        paths = []
+        for _, rel_prefix, dirs, files in repo_schema.scan_tree(base_dir):
+            paths.extend((rel_prefix + d.name, True) for d in dirs)
+            paths.extend((rel_prefix + f.name, False) for f in files)
+        return paths
+    seconds, paths = _time(walk)
+    stages["walk"] = {"seconds": seconds, "items": len(paths)}
+
+    # Ignore matching: every walked path against a freshly compiled matcher
+    def match():
+        matcher = IgnoreMatcher(patterns)
+        return sum(1 for rel_path, is_dir in paths if matcher.match(rel_path, is_dir))
+    seconds, ignored = _time(match)
+    stages["ignore_matching"] = {"seconds": seconds, "items": len(paths), "ignored": ignored}
+
+    # The real scan (pruned walk, matching and extraction) builds the schema the later stages
+    # use. As in run_schema_generation, it also extracts imports/exports for the dependency stage.
+    dependency_records = {} if repo_schema.DEPENDENCY_GRAPH_AVAILABLE else None
+    with _quiet():
+        scan_seconds, schema = _time(lambda: repo_schema.generate_repo_schema(
+            base_dir, spec, workers=workers, worker_type=worker_type, dependency_records=dependency_records))
+
+    # Metadata extraction: the scanned files extracted again on their own (file contents are
+    # in the page cache after the scan), the same way the scan does
+    rel_paths = [file_info["path"] for entry in schema["taxonomy"] for file_info in entry["files"]]
+    file_paths = [os.path.join(base_dir, rel_path) for rel_path in rel_paths]
+    with_dependencies = dependency_records is not None
+    def extract():
+        if workers > 1:
+            return repo_schema.extract_metadata_parallel(file_paths, workers, worker_type,
+                                                         with_dependencies=with_dependencies, rel_paths=rel_paths)
+        return [repo_schema.extract_file_record(file_path, with_dependencies=with_dependencies, rel_path=rel_path)
+                for file_path, rel_path in zip(file_paths, rel_paths)]
+    seconds, _ = _time(extract)
+    stages["metadata_extraction"] = {"seconds": seconds, "items": len(file_paths), "scan_seconds": scan_seconds}
+
+    json_path = os.path.join(output_dir, "repo-schema.json")
+    seconds, _ = _time(lambda: repo_schema.write_schema_json(json_path, schema, schema["taxonomy"]))
+    stages["json_write"] = {"seconds": seconds, "items": len(schema["taxonomy"]),
+                            "bytes": os.path.getsize(json_path)}
+
+    md_path = os.path.join(output_dir, "repo-schema.md")
+    def write_markdown():
+        with open(md_path, "w", encoding="utf-8") as f:
+            repo_schema.write_markdown(schema, base_dir, f)
+    seconds, _ = _time(write_markdown)
+    stages["markdown_write"] = {"seconds": seconds, "items": schema["files_processed"],
+                                "bytes": os.path.getsize(md_path)}
+
+    if repo_schema.DEPENDENCY_GRAPH_AVAILABLE:
+        generator = repo_schema.DependencyGraphGenerator()
+        seconds, graph = _time(lambda: generator.generate_from_schema(
+            schema, workers=workers, base_dir=base_dir, file_records=dependency_records))
+        stages["dependency_graph"] = {"seconds": seconds, "items": len(graph.nodes), "edges": len(graph.edges)}
+    else:
+        stages["dependency_graph"] = {"skipped": "dependency graph module not available"}
+
+    stages["qdrant_upsert"] = _run_qdrant_stage(schema, base_dir)
+    return stages
+
+def _run_qdrant_stage(schema, base_dir):
+    """Time storing every file in an in-process Qdrant collection, in batched upserts"""
+    if not repo_schema.QDRANT_AVAILABLE:
+        return {"skipped": "Qdrant utilities not available"}
+    try:
+        manager = repo_schema.QdrantManager(location=":memory:")
+    except ImportError as e:
+        return {"skipped": str(e)}
+
+    collection_name = manager.generate_collection_name(schema["project"], base_dir)
+    manager.create_collection(collection_name)
+    start = time.perf_counter()
+    report = manager.store_knowledge_graph_batch(
+        collection_name, (point for entry in schema["taxonomy"] for point in repo_schema._qdrant_points(entry)))
+    return {"seconds": time.perf_counter() - start, "items": report["stored"]}
+
+def summarize(runs):
+    """Reduce repeated runs to min/median seconds per stage"""
+    summary = {}
+    for stage in STAGES:
+        timings = [run[stage]["seconds"] for run in runs if "seconds" in run.get(stage, {})]
+        if not timings:
+            summary[stage] = {"skipped": runs[0].get(stage, {}).get("skipped", "not run")}
+            continue
+        last = runs[-1][stage]
+        summary[stage] = {"min_seconds": min(timings), "median_seconds": statistics.median(timings),
+                          **{key: value for key, value in last.items() if key != "seconds"}}
+    return summary
+
+def _git_commit():
+    """Commit the benchmarked code is at, if it is in a git checkout"""
+    try:
+        result = subprocess.run(["git", "-C", SCRIPT_DIR, "rev-parse", "HEAD"], capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode().strip() or None
+
+def run_benchmark(file_counts, depth=3, languages=DEFAULT_LANGUAGES, ignore_patterns=20, repeat=3,
+                  workers=1, worker_type="process", seed=0, keep_dir=None):
+    """Generate one synthetic repo per file count and benchmark it; returns the results document"""
+    document = {
+        "benchmark_version": BENCHMARK_VERSION,
+        "generated_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"depth": depth, "languages": languages, "ignore_patterns": ignore_patterns,
+                       "repeat": repeat, "workers": workers, "worker_type": worker_type, "seed": seed},
+        "results": []
+    }
+
+    for files in file_counts:
+        work_dir = tempfile.mkdtemp(prefix=f"repo-schema-bench-{files}-", dir=keep_dir)
+        try:
+            base_dir = os.path.join(work_dir, "repo")
+            output_dir = os.path.join(work_dir, "output")
+            os.makedirs(base_dir)
+            os.makedirs(output_dir)
+            seconds, repo = _time(lambda: generate_synthetic_repo(
+                base_dir, files, depth=depth, languages=languages, ignore_patterns=ignore_patterns, seed=seed))
+            print(f"Generated {files} files in {seconds:.2f}s, running {repeat} repetition(s)...", file=sys.stderr)
+
+            runs = [run_stages(base_dir, output_dir, workers=workers, worker_type=worker_type)
+                    for _ in range(repeat)]
+            document["results"].append({"repo": repo, "stages": summarize(runs)})
+        finally:
+            if keep_dir is None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+    return document
+
+def compare(current, baseline, threshold=0.10):
+    """Print per-stage median ratios against a baseline document (to stderr); returns the regressions found
+
+    Raises ValueError if the documents were produced by different benchmark versions, whose
+    stages measure different things. Stages missing or skipped on either side are reported.
+    """
+    versions = (current.get("benchmark_version"), baseline.get("benchmark_version"))
+    if versions[0] != versions[1]:
+        raise ValueError(f"Benchmark version {versions[1]} of the baseline does not match version {versions[0]}; "
+                         f"re-run the baseline with this benchmark")
+    baseline_by_files = {result["repo"]["files"]: result["stages"] for result in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        files = result["repo"]["files"]
+        base_stages = baseline_by_files.get(files)
+        if base_stages is None:
+            print(f"{files} files: no baseline result", file=sys.stderr)
+            continue
+        print(f"{files} files (baseline {baseline.get('git_commit') or 'unknown'}):", file=sys.stderr)
+        for stage in STAGES:
+            for stages, side in ((base_stages, "baseline"), (result["stages"], "current run")):
+                if stage not in stages:
+                    print(f"  {stage:<20} missing from the {side}", file=sys.stderr)
+                elif "skipped" in stages[stage]:
+                    print(f"  {stage:<20} skipped in the {side}: {stages[stage]['skipped']}", file=sys.stderr)
+            now = result["stages"].get(stage, {}).get("median_seconds")
+            before = base_stages.get(stage, {}).get("median_seconds")
+            if now is None or not before:
+                continue
+            ratio = now / before
+            marker = "  REGRESSION" if ratio > 1 + threshold else ""
+            print(f"  {stage:<20} {before:9.4f}s -> {now:9.4f}s  x{ratio:.2f}{marker}", file=sys.stderr)
+            if marker:
+                regressions.append({"files": files, "stage": stage, "ratio": ratio})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the repository schema pipeline on synthetic repositories")
+    parser.add_argument("--files", type=int, nargs="+", default=[1000], help="File counts to generate (one repo each)")
+    parser.add_argument("--depth", type=int, default=3, help="Maximum directory depth (default: 3)")
+    parser.add_argument("--languages", default=DEFAULT_LANGUAGES, help=f"Extension weights (default: {DEFAULT_LANGUAGES})")
+    parser.add_argument("--ignore-patterns", type=int, default=20, help="Number of .gitignore patterns (default: 20)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per repo; min and median are reported (default: 3)")
+    parser.add_argument("--workers", type=int, default=1, help="Workers for metadata extraction and dependency analysis (default: 1)")
+    parser.add_argument("--worker-type", choices=sorted(repo_schema.WORKER_TYPES), default="process")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for repo generation (default: 0)")
+    parser.add_argument("--output", help="Write results JSON to this path (default: stdout)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown ratio reported as a regression (default: 0.10)")
+    parser.add_argument("--keep-dir", help="Generate repos under this directory and keep them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    document = run_benchmark(args.files, depth=args.depth, languages=args.languages,
+                             ignore_patterns=args.ignore_patterns, repeat=max(1, args.repeat),
+                             workers=max(1, args.workers), worker_type=args.worker_type, seed=args.seed,
+                             keep_dir=args.keep_dir)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(document, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(document, baseline, args.threshold)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(2)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
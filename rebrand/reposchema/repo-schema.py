@@ -7,24 +7,35 @@ import time
 import mimetypes
 import logging
 import signal
+import shutil
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from pathspec import PathSpec
 import argparse
+from functools import partial
+
+from utils.file_buffer import open_file_buffer, sniff_text, decode_text
+from utils.file_manifest import FileManifest, MANIFEST_FILENAME, compute_content_hash, hash_bytes
+from utils.git_source import is_git_checkout, list_git_files
+from utils.ignore_matcher import IgnoreMatcher
+from utils.source_symbols import SYMBOL_EXTENSIONS, extract_symbols, summarize_symbols
 
 # Import Qdrant utilities
 try:
-    from utils.qdrant_client import QdrantManager
+    from utils.qdrant_client import QdrantManager, DEFAULT_BATCH_SIZE as QDRANT_BATCH_SIZE
     QDRANT_AVAILABLE = True
 except ImportError:
     QDRANT_AVAILABLE = False
     QdrantManager = None
+    QDRANT_BATCH_SIZE = 256
 
 # Import dependency graph utilities
 try:
-    from utils.dependency_graph import DependencyGraphGenerator, generate_dependency_graph
+    from utils.dependency_graph import DependencyAnalyzer, DependencyGraphGenerator, generate_dependency_graph
     DEPENDENCY_GRAPH_AVAILABLE = True
 except ImportError:
     DEPENDENCY_GRAPH_AVAILABLE = False
+    DependencyAnalyzer = None
     DependencyGraphGenerator = None
     generate_dependency_graph = None
 
@@ -40,6 +51,15 @@ DEFAULT_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # File processing limits and exclusions
 FILE_SIZE_LIMIT = 1 * 1024 * 1024  # 1MB in bytes - prevents processing of large files
 
+# Files per worker extracted in each batch when streaming, bounding how many entries are held back
+STREAM_BATCH_FILES_PER_WORKER = 256
+
+# Parallel metadata extraction (--workers). Executor types map to concurrent.futures pools.
+WORKER_TYPES = {
+    'process': ProcessPoolExecutor,
+    'thread': ThreadPoolExecutor
+}
+
 # Known binary file extensions to exclude from processing
 BINARY_EXTENSIONS = {
     '.exe', '.dll', '.so', '.dylib', '.bin',
@@ -87,125 +107,148 @@ def debug_print(*args, **kwargs):
     if DEBUG:
         print(*args, **kwargs)
 
-def load_gitignore_patterns(target_base_dir, custom_ignore_file=None):
-    """Load and parse ignore patterns from default .repoignore and optional custom ignore file."""
+def read_ignore_file(path):
+    """Read gitignore-style patterns from a file, skipping blank lines and comments"""
     patterns = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                patterns.append(line)
+    return patterns
+
+def load_gitignore_patterns(target_base_dir, custom_ignore_file=None, include_gitignore=True):
+    """Load and parse ignore patterns from default .repoignore and optional custom ignore file.
+
+    The .repoignore and custom patterns form an outer matcher that nested .gitignore
+    negations cannot override; the root .gitignore is the matcher nested ones stack onto.
+    A custom file that is the root .gitignore itself is only loaded once, as the .gitignore.
+    With include_gitignore=False (git listings) neither is loaded and only the outer
+    patterns are returned.
+    """
+    patterns = []
+    gitignore_patterns = []
 
     # 1. Load from default .repoignore in script directory (ALWAYS loaded)
     script_dir = os.path.dirname(os.path.abspath(__file__))
     repoignore_path = os.path.join(script_dir, ".repoignore")
     if os.path.exists(repoignore_path):
         try:
-            with open(repoignore_path, "r", encoding="utf-8") as f:
-                debug_print(f"\nDEBUG: Loading default patterns from: {repoignore_path}")
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        patterns.append(line)
+            debug_print(f"\nDEBUG: Loading default patterns from: {repoignore_path}")
+            patterns.extend(read_ignore_file(repoignore_path))
         except Exception as e:
             print(f"Warning: Error reading default .repoignore: {e}")
     else:
         print(f"Warning: Default .repoignore not found at: {repoignore_path}")
 
     # 2. Load from standard .gitignore in target_base_dir (optional)
+    #    Nested .gitignore files are picked up during the walk (see load_nested_ignore)
     gitignore_path = os.path.join(target_base_dir, ".gitignore")
-    if os.path.exists(gitignore_path):
+    if include_gitignore and os.path.exists(gitignore_path):
         try:
-            with open(gitignore_path, "r", encoding="utf-8") as f:
-                debug_print(f"\nDEBUG: Loading patterns from: {gitignore_path}")
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        patterns.append(line)
+            debug_print(f"\nDEBUG: Loading patterns from: {gitignore_path}")
+            gitignore_patterns.extend(read_ignore_file(gitignore_path))
         except Exception as e:
             print(f"Warning: Error reading standard .gitignore: {e}")
 
     # 3. Load from custom ignore file if provided
-    if custom_ignore_file and os.path.exists(custom_ignore_file):
+    if custom_ignore_file and os.path.exists(custom_ignore_file) and not (
+            os.path.exists(gitignore_path) and os.path.samefile(custom_ignore_file, gitignore_path)):
         try:
-            with open(custom_ignore_file, "r", encoding="utf-8") as f:
-                debug_print(f"\nDEBUG: Loading patterns from custom file: {custom_ignore_file}")
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        # Add custom patterns, potentially overriding standard ones if needed later
-                        patterns.append(line)
+            debug_print(f"\nDEBUG: Loading patterns from custom file: {custom_ignore_file}")
+            # Add custom patterns, potentially overriding standard ones if needed later
+            patterns.extend(read_ignore_file(custom_ignore_file))
         except Exception as e:
             print(f"Warning: Error reading custom ignore file '{custom_ignore_file}': {e}")
 
-    if not patterns:
+    if not patterns and not gitignore_patterns:
         return None
 
     # Debug print loaded patterns
     debug_print("nDEBUG: Combined ignore patterns loaded:")
-    for pattern in patterns:
+    for pattern in patterns + gitignore_patterns:
         debug_print(f"  - {pattern}")
 
-    # Create PathSpec object (handles precedence internally if patterns overlap)
-    # Using gitwildmatch style
-    return PathSpec.from_lines("gitwildmatch", patterns)
+    # Compile into matchers (gitwildmatch semantics, later patterns take precedence)
+    if not include_gitignore:
+        return IgnoreMatcher(patterns)
+    outer = IgnoreMatcher(patterns) if patterns else None
+    return IgnoreMatcher(gitignore_patterns, outer=outer)
+
+def load_nested_ignore(gitignore_spec, dir_path, rel_dir):
+    """Stack the .gitignore found in a subdirectory onto the matcher inherited from its parent.
+
+    rel_dir is the base-relative '/'-separated directory. Returns the inherited matcher
+    unchanged if the file cannot be read or has no patterns.
+    """
+    gitignore_path = os.path.join(dir_path, ".gitignore")
+    try:
+        patterns = read_ignore_file(gitignore_path)
+    except Exception as e:
+        print(f"Warning: Error reading {gitignore_path}: {e}")
+        return gitignore_spec
+
+    if not patterns:
+        return gitignore_spec
+    debug_print(f"DEBUG: Loaded {len(patterns)} nested patterns from: {gitignore_path}")
+    if gitignore_spec is None:
+        return IgnoreMatcher(patterns, base=rel_dir)
+    return gitignore_spec.child(rel_dir, patterns)
 
 def is_git_path(path):
     """Check if a path contains a .git component"""
     # Check relative path parts for '.git'
     return '.git' in path.split(os.sep)
 
-def is_ignored(file_path, base_dir, gitignore_spec):
+def is_ignored(file_path, base_dir, gitignore_spec, is_dir=False, rel_path=None):
+    """Check a path against the ignore matcher.
+
+    is_dir selects directory-only patterns (e.g. 'node_modules/'). Callers that already know
+    the base-relative '/'-separated path can pass rel_path to skip the relpath computation.
+    The .git directory is always ignored.
+    """
+    if rel_path is None:
+        try:
+            relative_path = os.path.relpath(file_path, base_dir)
+        except ValueError:
+            if DEBUG: print(f"DEBUG: Cannot get relative path for {file_path} against {base_dir}")
+            return False
+        if is_git_path(relative_path):
+            return True
+        rel_path = relative_path.replace(os.sep, '/')
+    elif '.git' in rel_path.split('/'):
+        return True
+
     if gitignore_spec is None:
         return False
 
-    try:
-        relative_path = os.path.relpath(file_path, base_dir)
-    except ValueError:
-        if DEBUG: print(f"DEBUG: Cannot get relative path for {file_path} against {base_dir}")
-        return False 
-
-    relative_path_normalized = relative_path.replace(os.sep, '/')
-    is_dir_flag_for_debug_only = os.path.isdir(file_path)
-
-    # Specific debug for 'vendor' directory check
-    if relative_path_normalized == "vendor" and is_dir_flag_for_debug_only:
-        if DEBUG:
-            print(f"DEBUG_VENDOR_CHECK: Checking relative path 'vendor' (is_dir={is_dir_flag_for_debug_only}). file_path='{file_path}'. base_dir='{base_dir}'")
-            match_against_vendor_slash = False
-            if gitignore_spec:
-                for pattern_obj in gitignore_spec.patterns:
-                    if 'vendor/' in pattern_obj.pattern: 
-                        temp_spec = PathSpec.from_lines('gitwildmatch', [pattern_obj.pattern])
-                        if temp_spec.match_file(relative_path_normalized):
-                            match_against_vendor_slash = True
-                            print(f"DEBUG_VENDOR_CHECK: Pattern '{pattern_obj.pattern}' matches '{relative_path_normalized}' (is_dir={is_dir_flag_for_debug_only})")
-            print(f"DEBUG_VENDOR_CHECK: Preliminary match for 'vendor' (dir) against a 'vendor/' like pattern: {match_against_vendor_slash}")
-
-    match_result = gitignore_spec.match_file(relative_path_normalized)
-
-    if match_result:
-        if DEBUG: print(f"DEBUG_IS_IGNORED: Path '{relative_path_normalized}' (is_dir={is_dir_flag_for_debug_only}, from file_path '{file_path}') MATCHED by gitignore_spec. RESULT: IGNORED")
-        return True
-    
-    # if DEBUG: print(f"DEBUG_IS_IGNORED: Path '{relative_path_normalized}' (is_dir={is_dir_flag_for_debug_only}, from file_path '{file_path}') NOT matched by gitignore_spec. RESULT: NOT IGNORED")
-    return False
+    match_result = gitignore_spec.match(rel_path, is_dir)
+    if match_result and DEBUG:
+        print(f"DEBUG_IS_IGNORED: Path '{rel_path}' (is_dir={is_dir}, from file_path '{file_path}') MATCHED by gitignore_spec. RESULT: IGNORED")
+    return match_result
 
 # File Analysis Functions
 # ----------------------
 
-def is_text_file(file_path):
+def is_text_candidate(file_path, size):
+    """Check the cheap, content-free conditions for treating a file as text"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in BINARY_EXTENSIONS:
+        return False
+    if size > FILE_SIZE_LIMIT:
+        return False
+    mime_type = mimetypes.guess_type(file_path)[0]
+    if mime_type and not mime_type.startswith('text/'):
+        return False
+    return True
+
+def is_text_file(file_path, stat_result=None):
     try:
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext in BINARY_EXTENSIONS:
-            return False
-        if os.path.getsize(file_path) > FILE_SIZE_LIMIT:
-            return False
-        mime_type = mimetypes.guess_type(file_path)[0]
-        if mime_type and not mime_type.startswith('text/'):
+        size = stat_result.st_size if stat_result is not None else os.path.getsize(file_path)
+        if not is_text_candidate(file_path, size):
             return False
         with open(file_path, 'rb') as f:
-            chunk = f.read(512)
-            try:
-                chunk.decode('utf-8')
-                return True
-            except UnicodeDecodeError:
-                return False
+            return sniff_text(f.read(512))
     except Exception:
         return False
 
@@ -234,295 +277,15 @@ def get_ai_description(file_path, file_name, content=None):
 
 def extract_python_summary(content):
     """Extract enhanced Python code summary for AI agents"""
-    summary_parts = []
-
-    try:
-        lines = content.split('\n')
-        imports = []
-        functions = []
-        classes = []
-        decorators = []
-        constants = []
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            # Extract imports with better parsing
-            if line.startswith(('import ', 'from ')):
-                if len(imports) < 5:  # Increased limit
-                    if 'import ' in line:
-                        # Handle multi-import: import os, sys
-                        parts = line.split('import ')[1].split(',')
-                        for part in parts[:2]:  # Limit per line
-                            imports.append(part.strip().split()[0])
-                    elif 'from ' in line:
-                        # Handle: from pathlib import Path
-                        module = line.split('from ')[1].split(' import ')[0]
-                        imports.append(module)
-
-            # Extract decorators
-            elif line.startswith('@') and len(decorators) < 3:
-                decorators.append(line[1:].strip())
-
-            # Extract function definitions with parameters
-            elif line.startswith('def ') and len(functions) < 4:
-                func_line = line.split('def ')[1]
-                func_name = func_line.split('(')[0].strip()
-                # Extract parameter count
-                params_part = func_line.split('(')[1].split(')')[0] if '(' in func_line else ""
-                param_count = len([p for p in params_part.split(',') if p.strip() and p.strip() != 'self'])
-                functions.append(f"{func_name}({param_count}p)")
-
-            # Extract class definitions with inheritance
-            elif line.startswith('class ') and len(classes) < 3:
-                class_line = line.split('class ')[1]
-                class_name = class_line.split('(')[0].split(':')[0].strip()
-                # Check for inheritance
-                if '(' in class_line and ')' in class_line:
-                    inheritance = class_line.split('(')[1].split(')')[0]
-                    classes.append(f"{class_name}({inheritance})")
-                else:
-                    classes.append(class_name)
-
-            # Extract constants (uppercase variables)
-            elif '=' in line and len(constants) < 3:
-                var_part = line.split('=')[0].strip()
-                if var_part.isupper() and not var_part.startswith('_'):
-                    constants.append(var_part)
-
-        # Build summary with priorities
-        if imports:
-            summary_parts.append(f"Imports: {', '.join(imports[:5])}")
-        if classes:
-            summary_parts.append(f"Classes: {', '.join(classes)}")
-        if functions:
-            summary_parts.append(f"Functions: {', '.join(functions[:4])}")
-        if decorators:
-            summary_parts.append(f"Decorators: {', '.join(decorators)}")
-        if constants:
-            summary_parts.append(f"Constants: {', '.join(constants)}")
-
-        # Add file type indicators
-        if any('async def' in l for l in lines):
-            summary_parts.append("Async support")
-        if any('__main__' in l for l in lines):
-            summary_parts.append("Executable")
-        if any('if __name__' in l for l in lines):
-            summary_parts.append("Script entry point")
-
-    except Exception as e:
-        return f"Python file (parsing error: {str(e)[:30]})"
-
-    return ' | '.join(summary_parts) if summary_parts else "Python module"
+    return summarize_symbols(extract_symbols(content, '.py'))
 
 def extract_javascript_summary(content):
     """Extract enhanced JavaScript/TypeScript code summary"""
-    summary_parts = []
-
-    try:
-        lines = content.split('\n')
-        imports = []
-        functions = []
-        classes = []
-        interfaces = []
-        types = []
-        components = []
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith('//') or line.startswith('/*'):
-                continue
-
-            # Extract imports with better parsing
-            if line.startswith('import ') and len(imports) < 5:
-                if 'from ' in line:
-                    module = line.split('from ')[1].strip().strip("';\"")
-                    imports.append(module)
-                elif '{' in line and '}' in line:
-                    # Named imports: import { useState, useEffect } from 'react'
-                    module_part = line.split('} from ')[-1] if '} from ' in line else ""
-                    if module_part:
-                        imports.append(module_part.strip().strip("';\""))
-
-            # Extract type definitions
-            elif line.startswith(('type ', 'interface ')) and len(types) < 3:
-                if line.startswith('interface '):
-                    interface_name = line.split('interface ')[1].split()[0]
-                    interfaces.append(interface_name)
-                elif line.startswith('type '):
-                    type_name = line.split('type ')[1].split('=')[0].strip()
-                    types.append(type_name)
-
-            # Extract function definitions
-            elif ('function ' in line or '=> ' in line or 'const ' in line) and len(functions) < 4:
-                if 'function ' in line:
-                    func_name = line.split('function ')[1].split('(')[0].strip()
-                    functions.append(f"{func_name}()")
-                elif '=> ' in line and 'const ' in line:
-                    # Arrow function: const funcName = () => {}
-                    func_name = line.split('const ')[1].split('=')[0].strip()
-                    functions.append(f"{func_name}=>")
-                elif 'const ' in line and '=>' in line:
-                    # Alternative arrow function pattern
-                    func_name = line.split('const ')[1].split('=')[0].strip()
-                    functions.append(f"{func_name}=>")
-
-            # Extract class definitions
-            elif line.startswith('class ') and len(classes) < 3:
-                class_name = line.split('class ')[1].split()[0]
-                classes.append(class_name)
-
-            # Detect React components
-            elif ('function ' in line or 'const ' in line) and len(components) < 2:
-                if any(keyword in line.upper() for keyword in ['COMPONENT', 'JSX', 'REACT']):
-                    if 'function ' in line:
-                        comp_name = line.split('function ')[1].split('(')[0].strip()
-                        components.append(f"FC:{comp_name}")
-                    elif 'const ' in line and ('(' in line or '<' in line):
-                        comp_name = line.split('const ')[1].split('=')[0].strip()
-                        components.append(f"Comp:{comp_name}")
-
-        # Build summary with priorities
-        if imports:
-            summary_parts.append(f"Imports: {', '.join(imports[:5])}")
-        if components:
-            summary_parts.append(f"Components: {', '.join(components)}")
-        if classes:
-            summary_parts.append(f"Classes: {', '.join(classes)}")
-        if functions:
-            summary_parts.append(f"Functions: {', '.join(functions[:4])}")
-        if interfaces:
-            summary_parts.append(f"Interfaces: {', '.join(interfaces)}")
-        if types:
-            summary_parts.append(f"Types: {', '.join(types)}")
-
-        # Add framework indicators
-        if any('react' in imp.lower() for imp in imports):
-            summary_parts.append("React")
-        if any('vue' in imp.lower() for imp in imports):
-            summary_parts.append("Vue")
-        if any('angular' in imp.lower() for imp in imports):
-            summary_parts.append("Angular")
-        if any('express' in imp.lower() for imp in imports):
-            summary_parts.append("Express")
-        if any('typescript' in l.lower() for l in lines):
-            summary_parts.append("TypeScript")
-
-    except Exception as e:
-        return f"JavaScript/TypeScript file (parsing error: {str(e)[:30]})"
-
-    return ' | '.join(summary_parts) if summary_parts else "JavaScript/TypeScript module"
+    return summarize_symbols(extract_symbols(content, '.js'))
 
 def extract_compiled_summary(content):
     """Extract enhanced summary for compiled languages (Java, C++, C#, etc.)"""
-    summary_parts = []
-
-    try:
-        lines = content.split('\n')
-        includes = []
-        usings = []
-        imports = []
-        classes = []
-        functions = []
-        namespaces = []
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith('//') or line.startswith('/*'):
-                continue
-
-            # Extract includes (C/C++)
-            if line.startswith('#include ') and len(includes) < 4:
-                if '<' in line and '>' in line:
-                    header = line.split('<')[1].split('>')[0]
-                    includes.append(header)
-                elif '"' in line:
-                    header = line.split('"')[1]
-                    includes.append(header)
-
-            # Extract using statements (C#)
-            elif line.startswith('using ') and len(usings) < 4:
-                namespace = line.split('using ')[1].split(';')[0]
-                usings.append(namespace)
-
-            # Extract imports (Java)
-            elif line.startswith('import ') and len(imports) < 4:
-                package = line.split('import ')[1].split(';')[0]
-                imports.append(package)
-
-            # Extract namespace/package declarations
-            elif line.startswith(('namespace ', 'package ')) and len(namespaces) < 2:
-                ns = line.split()[1].split(';')[0]
-                namespaces.append(ns)
-
-            # Extract class definitions with modifiers
-            elif ('class ' in line or 'interface ' in line) and len(classes) < 3:
-                # Look for access modifiers
-                modifiers = []
-                if 'public ' in line:
-                    modifiers.append('public')
-                if 'private ' in line:
-                    modifiers.append('private')
-                if 'protected ' in line:
-                    modifiers.append('protected')
-                if 'static ' in line:
-                    modifiers.append('static')
-
-                if 'class ' in line:
-                    class_name = line.split('class ')[1].split()[0]
-                    classes.append(f"{' '.join(modifiers)} class {class_name}")
-                elif 'interface ' in line:
-                    interface_name = line.split('interface ')[1].split()[0]
-                    classes.append(f"{' '.join(modifiers)} interface {interface_name}")
-
-            # Extract function/method definitions
-            elif ('(' in line and ')' in line and '{' in line) and len(functions) < 4:
-                # Skip control structures
-                if any(keyword in line for keyword in ['if ', 'for ', 'while ', 'switch ']):
-                    continue
-
-                # Extract function name
-                func_part = line.split('(')[0].strip()
-                func_name = func_part.split()[-1]
-
-                # Extract return type and modifiers
-                remaining = func_part.split()
-                return_type = remaining[-2] if len(remaining) > 1 else "void"
-                modifiers = remaining[:-2] if len(remaining) > 2 else []
-
-                if func_name and not func_name.startswith(('if', 'for', 'while')):
-                    functions.append(f"{' '.join(modifiers)} {return_type} {func_name}()")
-
-        # Build summary based on language patterns
-        all_deps = includes + usings + imports
-        if all_deps:
-            summary_parts.append(f"Dependencies: {', '.join(all_deps[:5])}")
-
-        if namespaces:
-            summary_parts.append(f"Namespaces: {', '.join(namespaces)}")
-
-        if classes:
-            summary_parts.append(f"Types: {', '.join(classes)}")
-
-        if functions:
-            summary_parts.append(f"Functions: {', '.join(functions[:4])}")
-
-        # Language-specific indicators
-        if includes:
-            summary_parts.append("C/C++")
-        if usings:
-            summary_parts.append("C#")
-        if any('System.' in str(imports) for imp in imports):
-            summary_parts.append(".NET")
-        if any('java.' in str(imports) for imp in imports):
-            summary_parts.append("Java")
-
-    except Exception as e:
-        return f"Compiled language file (parsing error: {str(e)[:30]})"
-
-    return ' | '.join(summary_parts) if summary_parts else "Compiled language module"
+    return summarize_symbols(extract_symbols(content, '.java'))
 
 def extract_config_summary(content):
     """Extract concise summary for config files (JSON, YAML)"""
@@ -559,225 +322,33 @@ def extract_docs_summary(content):
 
 def extract_go_summary(content):
     """Extract summary for Go language files"""
-    summary_parts = []
-
-    try:
-        lines = content.split('\n')
-        imports = []
-        functions = []
-        structs = []
-        interfaces = []
-        packages = []
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith('//'):
-                continue
-
-            # Extract package declaration
-            if line.startswith('package ') and len(packages) < 1:
-                pkg = line.split('package ')[1]
-                packages.append(pkg)
-
-            # Extract imports
-            elif line.startswith('import ') and len(imports) < 4:
-                if '(' in line:  # Multi-line imports
-                    # Handle multi-line imports
-                    j = i + 1
-                    while j < len(lines) and not lines[j].strip().startswith(')'):
-                        imp_line = lines[j].strip().strip('"')
-                        if imp_line and not imp_line.startswith('//'):
-                            imports.append(imp_line)
-                        j += 1
-                else:
-                    imp = line.split('"')[1] if '"' in line else ""
-                    if imp:
-                        imports.append(imp)
-
-            # Extract function definitions
-            elif line.startswith('func ') and len(functions) < 4:
-                func_line = line.split('func ')[1]
-                if '(' in func_line:  # Method or function with receiver
-                    func_name = func_line.split('(')[0].strip()
-                    functions.append(f"func {func_name}")
-                else:
-                    func_name = func_line.split('(')[0].strip()
-                    functions.append(f"func {func_name}")
-
-            # Extract type definitions
-            elif line.startswith('type ') and len(structs) < 3:
-                type_line = line.split('type ')[1]
-                type_name = type_line.split()[0]
-                type_kind = type_line.split()[1] if len(type_line.split()) > 1 else ""
-
-                if 'struct' in type_kind:
-                    structs.append(f"struct {type_name}")
-                elif 'interface' in type_kind:
-                    interfaces.append(f"interface {type_name}")
-
-        # Build summary
-        if packages:
-            summary_parts.append(f"Package: {packages[0]}")
-        if imports:
-            summary_parts.append(f"Imports: {', '.join(imports[:4])}")
-        if functions:
-            summary_parts.append(f"Functions: {', '.join(functions[:4])}")
-        if structs:
-            summary_parts.append(f"Structs: {', '.join(structs)}")
-        if interfaces:
-            summary_parts.append(f"Interfaces: {', '.join(interfaces)}")
-
-        summary_parts.append("Go")
-
-    except Exception as e:
-        return f"Go file (parsing error: {str(e)[:30]})"
-
-    return ' | '.join(summary_parts) if summary_parts else "Go module"
+    return summarize_symbols(extract_symbols(content, '.go'))
 
 def extract_rust_summary(content):
     """Extract summary for Rust language files"""
-    summary_parts = []
-
-    try:
-        lines = content.split('\n')
-        mods = []
-        functions = []
-        structs = []
-        enums = []
-        traits = []
-        uses = []
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith('//'):
-                continue
-
-            # Extract use statements
-            if line.startswith('use ') and len(uses) < 4:
-                use_path = line.split('use ')[1].split(';')[0]
-                uses.append(use_path)
-
-            # Extract module declarations
-            elif line.startswith('mod ') and len(mods) < 3:
-                mod_name = line.split('mod ')[1].split(';')[0].split()[0]
-                mods.append(mod_name)
-
-            # Extract function definitions
-            elif line.startswith(('fn ', 'pub fn ')) and len(functions) < 4:
-                fn_line = line.replace('pub ', '').split('fn ')[1]
-                fn_name = fn_line.split('(')[0].strip()
-                functions.append(f"fn {fn_name}")
-
-            # Extract struct definitions
-            elif line.startswith(('struct ', 'pub struct ')) and len(structs) < 3:
-                struct_line = line.replace('pub ', '').split('struct ')[1]
-                struct_name = struct_line.split()[0]
-                structs.append(f"struct {struct_name}")
-
-            # Extract enum definitions
-            elif line.startswith(('enum ', 'pub enum ')) and len(enums) < 3:
-                enum_line = line.replace('pub ', '').split('enum ')[1]
-                enum_name = enum_line.split()[0]
-                enums.append(f"enum {enum_name}")
-
-            # Extract trait definitions
-            elif line.startswith(('trait ', 'pub trait ')) and len(traits) < 2:
-                trait_line = line.replace('pub ', '').split('trait ')[1]
-                trait_name = trait_line.split()[0]
-                traits.append(f"trait {trait_name}")
-
-        # Build summary
-        if uses:
-            summary_parts.append(f"Uses: {', '.join(uses[:4])}")
-        if mods:
-            summary_parts.append(f"Modules: {', '.join(mods)}")
-        if functions:
-            summary_parts.append(f"Functions: {', '.join(functions[:4])}")
-        if structs:
-            summary_parts.append(f"Structs: {', '.join(structs)}")
-        if enums:
-            summary_parts.append(f"Enums: {', '.join(enums)}")
-        if traits:
-            summary_parts.append(f"Traits: {', '.join(traits)}")
-
-        summary_parts.append("Rust")
-
-    except Exception as e:
-        return f"Rust file (parsing error: {str(e)[:30]})"
-
-    return ' | '.join(summary_parts) if summary_parts else "Rust module"
+    return summarize_symbols(extract_symbols(content, '.rs'))
 
 def extract_php_summary(content):
     """Extract summary for PHP language files"""
-    summary_parts = []
+    return summarize_symbols(extract_symbols(content, '.php'))
 
-    try:
-        lines = content.split('\n')
-        namespaces = []
-        uses = []
-        classes = []
-        functions = []
-        interfaces = []
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith('//') or line.startswith('#'):
-                continue
+def get_file_metadata(file_path, stat_result=None, buffer=None, dependencies=None, rel_path=None):
+    """Get lightweight file metadata optimized for AI context windows (~500 chars max additional)
 
-            # Extract namespace
-            if line.startswith('namespace ') and len(namespaces) < 1:
-                ns = line.split('namespace ')[1].split(';')[0]
-                namespaces.append(ns)
-
-            # Extract use statements
-            elif line.startswith('use ') and len(uses) < 4:
-                use_path = line.split('use ')[1].split(';')[0]
-                uses.append(use_path)
-
-            # Extract class definitions
-            elif line.startswith(('class ', 'abstract class ', 'final class ')) and len(classes) < 3:
-                class_line = line.replace('abstract ', '').replace('final ', '').split('class ')[1]
-                class_name = class_line.split()[0]
-                classes.append(f"class {class_name}")
-
-            # Extract function definitions
-            elif line.startswith(('function ', 'public function ', 'private function ', 'protected function ')) and len(functions) < 4:
-                func_line = line.replace('public ', '').replace('private ', '').replace('protected ', '').split('function ')[1]
-                func_name = func_line.split('(')[0].strip()
-                functions.append(f"function {func_name}")
-
-            # Extract interface definitions
-            elif line.startswith('interface ') and len(interfaces) < 2:
-                interface_name = line.split('interface ')[1].split()[0]
-                interfaces.append(f"interface {interface_name}")
-
-        # Build summary
-        if namespaces:
-            summary_parts.append(f"Namespace: {namespaces[0]}")
-        if uses:
-            summary_parts.append(f"Uses: {', '.join(uses[:4])}")
-        if classes:
-            summary_parts.append(f"Classes: {', '.join(classes)}")
-        if functions:
-            summary_parts.append(f"Functions: {', '.join(functions[:4])}")
-        if interfaces:
-            summary_parts.append(f"Interfaces: {', '.join(interfaces)}")
-
-        summary_parts.append("PHP")
-
-    except Exception as e:
-        return f"PHP file (parsing error: {str(e)[:30]})"
-
-    return ' | '.join(summary_parts) if summary_parts else "PHP module"
-
-def get_file_metadata(file_path):
-    """Get lightweight file metadata optimized for AI context windows (~500 chars max additional)"""
+    stat_result may be passed in by the directory walk so the file is not stat'ed again, and
+    buffer (the file's bytes, see extract_file_record) so it is not read again. When a
+    dependencies dict is passed, the imports/exports of the decoded text are stored in it;
+    rel_path (the file's path in the repository) is what relative imports resolve against.
+    The code summary and the imports/exports come from the same symbol record.
+    """
     try:
         file_name = os.path.basename(file_path)
         file_ext = os.path.splitext(file_path)[-1].lower()
+        if stat_result is None:
+            stat_result = os.stat(file_path)
 
         metadata = {
-            "modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
+            "modified": datetime.fromtimestamp(stat_result.st_mtime).isoformat(),
             "type": file_ext,
             "ai_description": get_ai_description(file_path, file_name),
             "extracted_description": "",
@@ -786,55 +357,28 @@ def get_file_metadata(file_path):
         }
 
         # Get file size
-        try:
-            size = os.path.getsize(file_path)
-            metadata["size_bytes"] = size
-            if size == 0:
-                metadata["extracted_description"] = "(Empty file)"
-                return metadata
-        except:
-            metadata["extracted_description"] = "(Error reading file)"
+        size = stat_result.st_size
+        metadata["size_bytes"] = size
+        if size == 0:
+            metadata["extracted_description"] = "(Empty file)"
             return metadata
 
-        if is_text_file(file_path):
-            try:
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
-
-                    # Extract first meaningful line for description
-                    lines = content.split('\n')
-                    for line in lines[:5]:  # Check first 5 lines
-                        line = line.strip()
-                        if line and not line.startswith('#') and not line.startswith('//'):
-                            metadata["extracted_description"] = line[:80]  # Shorter preview
-                            break
-
-                    # Generate concise code summary for AI agents
-                    if file_ext == '.py':
-                        metadata["code_summary"] = extract_python_summary(content)
-                    elif file_ext in ['.js', '.jsx', '.ts', '.tsx']:
-                        metadata["code_summary"] = extract_javascript_summary(content)
-                    elif file_ext in ['.java', '.cs', '.cpp', '.c']:
-                        metadata["code_summary"] = extract_compiled_summary(content)
-                    elif file_ext == '.go':
-                        metadata["code_summary"] = extract_go_summary(content)
-                    elif file_ext == '.rs':
-                        metadata["code_summary"] = extract_rust_summary(content)
-                    elif file_ext == '.php':
-                        metadata["code_summary"] = extract_php_summary(content)
-                    elif file_ext in ['.json', '.yaml', '.yml']:
-                        metadata["code_summary"] = extract_config_summary(content)
-                    elif file_ext in ['.md', '.txt']:
-                        metadata["code_summary"] = extract_docs_summary(content)
-
-                    # Ensure summary stays within ~300 character limit
-                    if len(metadata["code_summary"]) > 300:
-                        metadata["code_summary"] = metadata["code_summary"][:297] + "..."
-
-            except Exception as e:
-                metadata["extracted_description"] = f"(Error reading: {str(e)[:50]})"
-        else:
+        if not is_text_candidate(file_path, size):
             metadata["extracted_description"] = "(Binary file)"
+            return metadata
+
+        try:
+            if buffer is None:
+                with open_file_buffer(file_path, size) as file_buffer:
+                    symbols = summarize_text_buffer(file_buffer, file_ext, metadata, rel_path or file_path)
+            else:
+                symbols = summarize_text_buffer(buffer, file_ext, metadata, rel_path or file_path)
+        except Exception as e:
+            metadata["extracted_description"] = f"(Error reading: {str(e)[:50]})"
+            return metadata
+
+        if dependencies is not None and symbols is not None:
+            dependencies.update(imports=symbols.dependencies, exports=symbols.exports)
 
         return metadata
     except Exception as e:
@@ -847,98 +391,483 @@ def get_file_metadata(file_path):
             "code_summary": ""
         }
 
-def generate_repo_schema(base_dir, gitignore_spec):
-    schema = {
+def summarize_text_buffer(buffer, file_ext, metadata, file_path=None):
+    """Sniff, decode and summarize a text-candidate file's buffer into metadata.
+
+    Returns the symbol record of a source file (see source_symbols), the one parse its code
+    summary and imports/exports are derived from, or None if the buffer is binary or not source.
+    """
+    if not sniff_text(buffer):
+        metadata["extracted_description"] = "(Binary file)"
+        return None
+
+    content = decode_text(buffer)
+    symbols = None
+
+    # Extract first meaningful line for description
+    lines = content.split('\n')
+    for line in lines[:5]:  # Check first 5 lines
+        line = line.strip()
+        if line and not line.startswith('#') and not line.startswith('//'):
+            metadata["extracted_description"] = line[:80]  # Shorter preview
+            break
+
+    # Generate concise code summary for AI agents
+    if file_ext in SYMBOL_EXTENSIONS:
+        symbols = extract_symbols(content, file_ext, file_path)
+        metadata["code_summary"] = summarize_symbols(symbols)
+    elif file_ext in ['.json', '.yaml', '.yml']:
+        metadata["code_summary"] = extract_config_summary(content)
+    elif file_ext in ['.md', '.txt']:
+        metadata["code_summary"] = extract_docs_summary(content)
+
+    # Ensure summary stays within ~300 character limit
+    if len(metadata["code_summary"]) > 300:
+        metadata["code_summary"] = metadata["code_summary"][:297] + "..."
+
+    return symbols
+
+def is_dependency_source(file_path):
+    """Check if the dependency analyzer extracts imports/exports from this file type"""
+    if not DEPENDENCY_GRAPH_AVAILABLE:
+        return False
+    return os.path.splitext(file_path)[1].lower() in DependencyAnalyzer.SUPPORTED_EXTENSIONS
+
+def extract_file_record(file_path, with_hash=False, stat_result=None, with_dependencies=False, rel_path=None):
+    """Extract the per-file record: (metadata, content_hash, dependencies).
+
+    content_hash is set when with_hash (a manifest will record it). dependencies is the
+    file's imports/exports for the dependency stage when with_dependencies and the file is a
+    source file the analyzer supports, otherwise None. The file is read at most once: the
+    same buffer is sniffed, decoded, summarized, analyzed and hashed. Files that need
+    neither a summary, an analysis nor a hash are not opened at all. rel_path is the file's
+    path in the repository, for the analysis (default: file_path).
+    """
+    dependencies = None
+    if with_dependencies and is_dependency_source(file_path):
+        # Empty and binary sources have nothing to analyze; text fills these in below
+        dependencies = {"imports": [], "exports": []}
+
+    try:
+        if stat_result is None:
+            stat_result = os.stat(file_path)
+    except OSError:
+        return get_file_metadata(file_path), None, None  # Reports the error in the metadata
+
+    size = stat_result.st_size
+    if not with_hash and dependencies is None:
+        return get_file_metadata(file_path, stat_result), None, None
+    if size == 0:
+        return get_file_metadata(file_path, stat_result), hash_bytes(b"") if with_hash else None, dependencies
+    if not is_text_candidate(file_path, size):
+        # Nothing to summarize; hash without holding the whole file in memory
+        content_hash = compute_content_hash(file_path) if with_hash else None
+        return get_file_metadata(file_path, stat_result), content_hash, dependencies
+
+    try:
+        with open_file_buffer(file_path, size) as buffer:
+            metadata = get_file_metadata(file_path, stat_result, buffer, dependencies, rel_path)
+            return metadata, hash_bytes(buffer) if with_hash else None, dependencies
+    except OSError as e:
+        logging.warning(f"Could not read {file_path}: {e}")
+        return get_file_metadata(file_path, stat_result), None, None
+
+def _extract_file_record_task(with_hash, with_dependencies, file_path, stat_result, rel_path):
+    """Pool task wrapper: executor.map passes file_path, stat_result and rel_path positionally"""
+    return extract_file_record(file_path, with_hash=with_hash, stat_result=stat_result,
+                               with_dependencies=with_dependencies, rel_path=rel_path)
+
+def extract_metadata_parallel(file_paths, workers, worker_type='process', with_hash=False, stat_results=None,
+                              executor=None, with_dependencies=False, rel_paths=None):
+    """Run extract_file_record over file_paths on a worker pool, returning results in input order.
+
+    Pass an executor to reuse one pool across batches; otherwise a pool is created for this call.
+    """
+    if stat_results is None:
+        stat_results = [None] * len(file_paths)
+    if rel_paths is None:
+        rel_paths = [None] * len(file_paths)
+    # Larger chunks amortize inter-process overhead; keep enough chunks to balance the load
+    chunksize = max(1, len(file_paths) // (workers * 16)) if worker_type == 'process' else 1
+    extract = partial(_extract_file_record_task, with_hash, with_dependencies)
+    if executor is not None:
+        return list(executor.map(extract, file_paths, stat_results, rel_paths, chunksize=chunksize))
+
+    executor_class = WORKER_TYPES.get(worker_type, ProcessPoolExecutor)
+    with executor_class(max_workers=workers) as executor:
+        return list(executor.map(extract, file_paths, stat_results, rel_paths, chunksize=chunksize))
+
+def _collect_file(schema, entry, file_name, file_path, rel_path, pending_files, parallel, manifest, blob_sha=None,
+                  stat_result=None, dependency_records=None):
+    """Add a processed file to its folder entry, reusing manifest metadata or scheduling extraction.
+
+    stat_result is the walk's stat of the file; when missing the file is stat'ed here, once.
+    dependency_records, when given, collects source files' imports/exports by rel_path for the
+    dependency stage, from the manifest or from the read that extracts the metadata.
+    """
+    schema["files_processed"] += 1
+    if schema["files_processed"] % 10 == 0:
+        sys.stdout.write(f"\rFiles Scanned: {schema['files_scanned']} | Files Processed: {schema['files_processed']}...")
+        sys.stdout.flush()
+
+    file_info = {
+        "name": file_name,
+        "path": rel_path,
+        "metadata": None
+    }
+    entry["files"].append(file_info)
+    with_dependencies = dependency_records is not None
+    require_dependencies = with_dependencies and is_dependency_source(file_path)
+
+    if manifest is not None and blob_sha is not None:
+        # Git source: an unchanged blob SHA means the cached metadata is still valid, no stat needed
+        file_info["metadata"] = manifest.lookup_hash(rel_path, blob_sha, require_dependencies)
+        if file_info["metadata"] is not None:
+            if require_dependencies:
+                dependency_records[rel_path] = manifest.cached_dependencies(rel_path)
+            return
+
+    if stat_result is None:
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            pass  # e.g. broken symlink; get_file_metadata reports the error
+
+    if manifest is not None and stat_result is not None:
+        # Incremental mode: reuse cached metadata for files whose stat or hash is unchanged
+        if blob_sha is None:
+            file_info["metadata"] = manifest.lookup(rel_path, stat_result, file_path, require_dependencies)
+            if file_info["metadata"] is not None:
+                if require_dependencies:
+                    dependency_records[rel_path] = manifest.cached_dependencies(rel_path)
+                return
+        if not parallel:
+            metadata, content_hash, dependencies = extract_file_record(
+                file_path, with_hash=blob_sha is None, stat_result=stat_result, with_dependencies=with_dependencies,
+                rel_path=rel_path)
+            manifest.record(rel_path, stat_result, blob_sha or content_hash, metadata, dependencies)
+            file_info["metadata"] = metadata
+            if dependencies is not None:
+                dependency_records[rel_path] = dependencies
+        else:
+            pending_files.append((entry, file_info, file_path, stat_result, blob_sha, True))
+    elif parallel:
+        pending_files.append((entry, file_info, file_path, stat_result, None, False))
+    else:
+        metadata, _, dependencies = extract_file_record(file_path, stat_result=stat_result,
+                                                        with_dependencies=with_dependencies, rel_path=rel_path)
+        file_info["metadata"] = metadata
+        if dependencies is not None:
+            dependency_records[rel_path] = dependencies
+
+def _resolve_pending_metadata(pending_files, workers, worker_type, manifest, executor=None, dependency_records=None):
+    """Extract metadata for files deferred by _collect_file on a worker pool.
+
+    Returns True if the user interrupted extraction.
+    """
+    with_dependencies = dependency_records is not None
+    if executor is None:
+        print(f"\nExtracting metadata for {len(pending_files)} files with {workers} {worker_type} workers...")
+    interrupted = False
+    try:
+        results = extract_metadata_parallel([pending[2] for pending in pending_files], workers, worker_type,
+                                            with_hash=manifest is not None,
+                                            stat_results=[pending[3] for pending in pending_files],
+                                            executor=executor, with_dependencies=with_dependencies,
+                                            rel_paths=[pending[1]["path"] for pending in pending_files])
+        for (_, file_info, _, stat_result, blob_sha, tracked), (metadata, content_hash, dependencies) in zip(pending_files, results):
+            file_info["metadata"] = metadata
+            if tracked:
+                manifest.record(file_info["path"], stat_result, blob_sha or content_hash, metadata, dependencies)
+            if dependencies is not None:
+                dependency_records[file_info["path"]] = dependencies
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\nMetadata extraction interrupted by user")
+        logging.warning("Metadata extraction interrupted by user")
+    except Exception as e:
+        print(f"Error during parallel metadata extraction: {e}")
+        logging.error(f"Error during parallel metadata extraction: {e}", exc_info=True)
+
+    for entry, file_info, file_path, stat_result, blob_sha, tracked in pending_files:
+        if file_info["metadata"] is not None:
+            continue
+        if interrupted:
+            # Keep partial results consistent: drop files that never got metadata
+            entry["files"].remove(file_info)
+        else:
+            # Pool failed (e.g. worker crash); fall back to serial extraction
+            metadata, content_hash, dependencies = extract_file_record(
+                file_path, with_hash=manifest is not None, stat_result=stat_result, with_dependencies=with_dependencies,
+                rel_path=file_info["path"])
+            if tracked:
+                manifest.record(file_info["path"], stat_result, blob_sha or content_hash, metadata, dependencies)
+            file_info["metadata"] = metadata
+            if dependencies is not None:
+                dependency_records[file_info["path"]] = dependencies
+    return interrupted
+
+def scan_tree(base_dir):
+    """Walk base_dir top-down with os.scandir, in sorted depth-first order.
+
+    Yields (root, rel_prefix, dirs, files) where rel_prefix is root relative to base_dir with
+    '/' separators and a trailing '/' ("" for base_dir itself), and dirs/files are os.DirEntry
+    lists sorted by name. DirEntry caches its type and stat data, so classifying an entry costs
+    no syscall and stat-ing it costs at most one. Like os.walk, removing entries from dirs
+    prunes them, and symlinked directories are listed but not followed.
+    """
+    stack = [(base_dir, "")]
+    while stack:
+        root, rel_prefix = stack.pop()
+        try:
+            with os.scandir(root) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            logging.warning(f"Cannot scan directory {root}: {e}")
+            continue
+
+        dirs, files = [], []
+        for dir_entry in entries:
+            try:
+                is_dir = dir_entry.is_dir()
+            except OSError:
+                is_dir = False
+            (dirs if is_dir else files).append(dir_entry)
+
+        yield root, rel_prefix, dirs, files
+
+        # Push in reverse so subdirectories are visited in name order
+        for dir_entry in reversed(dirs):
+            if not dir_entry.is_symlink():
+                stack.append((dir_entry.path, rel_prefix + dir_entry.name + '/'))
+
+def new_schema(base_dir):
+    """Create the top-level schema dict; taxonomy is filled in by the scan.
+
+    A scan that stops early (interrupt or error) and keeps its partial results sets
+    schema["interrupted"] = True.
+    """
+    return {
         "project": os.path.basename(os.path.abspath(base_dir)),
         "version": "1.0",
         "taxonomy": [],
         "files_scanned": 0,
         "files_processed": 0
     }
-    
+
+def generate_repo_schema(base_dir, gitignore_spec, workers=1, worker_type='process', manifest=None,
+                         dependency_records=None):
+    schema = new_schema(base_dir)
+    schema["taxonomy"] = list(iter_repo_schema(base_dir, gitignore_spec, schema, workers=workers,
+                                               worker_type=worker_type, manifest=manifest,
+                                               dependency_records=dependency_records))
+    return schema
+
+def iter_repo_schema(base_dir, gitignore_spec, schema, workers=1, worker_type='process', manifest=None,
+                     batch_size=None, dependency_records=None):
+    """Walk base_dir and yield folder entries, in walk order, as soon as their metadata is complete.
+
+    The files_scanned/files_processed counters of schema are updated as the walk proceeds, so
+    they are final once the generator is exhausted. With workers > 1, files are extracted on
+    one pool in batches of batch_size (default: a single batch after the walk); entries whose
+    files are still pending are held back until their batch is resolved. dependency_records
+    (a dict) is filled with source files' imports/exports, see _collect_file.
+    """
     print(f"Scanning directory: {os.path.abspath(base_dir)}")
 
-    total_files_scanned = 0
-    total_files_processed = 0
+    # With workers > 1 the walk and ignore pruning stay on this thread; metadata extraction
+    # is deferred and fanned out to a pool once a batch of files is known.
+    parallel = workers > 1
+    pending_files = []
+    held_entries = []
+    executor = None
+    # Matchers for directories below a nested .gitignore, keyed by the directory path
+    dir_specs = {}
 
     try:
-        for root, dirs, files_in_dir in os.walk(base_dir, topdown=True):
-            if DEBUG: print(f"DEBUG_OS_WALK: Processing directory (root): {root}")
-
-            # Prune ignored directories from os.walk's list for future traversal
-            dirs_to_prune_from_walk = []
-            if DEBUG: print(f"DEBUG_PRUNING: Checking subdirectories for pruning in '{os.path.relpath(root, base_dir) or '.'}'. Original subdirs for os.walk: {dirs}")
-            for d_name in list(dirs): # Iterate over a copy of dirs
-                dir_path_to_check = os.path.join(root, d_name)
-                if is_ignored(dir_path_to_check, base_dir, gitignore_spec):
-                    if DEBUG: print(f"DEBUG_PRUNING: Subdirectory '{d_name}' in '{os.path.relpath(root, base_dir) or '.'}' IS marked as ignored. Adding to os.walk prune list.")
-                    dirs_to_prune_from_walk.append(d_name)
-                elif DEBUG and d_name == "vendor" and root == base_dir:
-                     print(f"DEBUG_PRUNING_VENDOR_NOT_IGNORED: Top-level 'vendor' subdir was NOT marked as ignored by is_ignored() for os.walk pruning.")
-                # elif DEBUG: # Too verbose otherwise
-                    # print(f"DEBUG_PRUNING: Subdirectory '{d_name}' in '{os.path.relpath(root, base_dir) or '.'}' is NOT ignored.")
-
-            if dirs_to_prune_from_walk:
-                for d_remove in dirs_to_prune_from_walk:
-                    if d_remove in dirs: # Ensure it's still in the list to avoid error
-                        dirs.remove(d_remove) # Modifies dirs IN PLACE, affecting os.walk
-                if DEBUG: print(f"DEBUG_PRUNING: Pruned {len(dirs_to_prune_from_walk)} subdir(s) ({dirs_to_prune_from_walk}) from os.walk list in '{os.path.relpath(root, base_dir) or '.'}'. Subdirs remaining for os.walk: {dirs}")
-            elif DEBUG:
-                print(f"DEBUG_PRUNING: No subdirs were pruned from os.walk list in '{os.path.relpath(root, base_dir) or '.'}'. Subdirs for os.walk processing: {dirs}")
-
-            current_dir_relative = os.path.relpath(root, base_dir)
-            if current_dir_relative == ".":
-                entry = {
-                    "folder": "./",
-                    "files": [],
-                    "subfolders": sorted([d for d in dirs])
-                }
-            else:
-                entry = {
-                    "folder": current_dir_relative,
-                    "files": [],
-                    "subfolders": sorted([d for d in dirs])
-                }
-
-            files_in_current_dir = 0
-            for file in files_in_dir:
-                file_path = os.path.join(root, file)
+        for root, rel_prefix, dirs, files_in_dir in scan_tree(base_dir):
+            if DEBUG: print(f"DEBUG_SCAN: Processing directory (root): {root}")
+
+            current_dir_relative = rel_prefix[:-1].replace('/', os.sep) if rel_prefix else "."
+
+            # Matcher inherited from the parent directory, extended by this directory's .gitignore
+            dir_spec = dir_specs.pop(root, gitignore_spec)
+            if rel_prefix and any(f.name == ".gitignore" for f in files_in_dir):
+                dir_spec = load_nested_ignore(dir_spec, root, rel_prefix[:-1])
+
+            # Prune ignored directories in place so scan_tree never descends into them
+            dirs[:] = [d for d in dirs
+                       if not is_ignored(d.path, base_dir, dir_spec, is_dir=True, rel_path=rel_prefix + d.name)]
+            if dir_spec is not gitignore_spec:
+                for d in dirs:
+                    dir_specs[d.path] = dir_spec
+            if DEBUG: print(f"DEBUG_PRUNING: Subdirs remaining in '{current_dir_relative}': {[d.name for d in dirs]}")
+
+            entry = {
+                "folder": "./" if current_dir_relative == "." else current_dir_relative,
+                "files": [],
+                "subfolders": [d.name for d in dirs]
+            }
+
+            for file_entry in files_in_dir:
                 schema["files_scanned"] += 1
-                total_files_scanned += 1
 
-                if is_ignored(file_path, base_dir, gitignore_spec):
+                rel_path = rel_prefix + file_entry.name
+                if is_ignored(file_entry.path, base_dir, dir_spec, rel_path=rel_path):
                     continue
 
-                schema["files_processed"] += 1
-                total_files_processed += 1
-                files_in_current_dir += 1
+                try:
+                    stat_result = file_entry.stat()
+                except OSError:
+                    stat_result = None  # e.g. broken symlink; get_file_metadata reports the error
+                _collect_file(schema, entry, file_entry.name, file_entry.path, rel_path, pending_files, parallel,
+                              manifest, stat_result=stat_result, dependency_records=dependency_records)
 
-                if schema["files_processed"] % 10 == 0:
-                    sys.stdout.write(f"\rFiles Scanned: {schema['files_scanned']} | Files Processed: {schema['files_processed']}...")
-                    sys.stdout.flush()
-
-                rel_path = os.path.relpath(file_path, base_dir)
-                entry["files"].append({
-                    "name": file,
-                    "path": rel_path.replace('\\\\', '/'),
-                    "metadata": get_file_metadata(file_path)
-                })
-
-            if files_in_current_dir > 0 or (current_dir_relative == '.' and entry["subfolders"]):
-                entry["files"].sort(key=lambda x: x['name'].lower())
-                schema["taxonomy"].append(entry)
+            if not (entry["files"] or (current_dir_relative == '.' and entry["subfolders"])):
+                continue
+            entry["files"].sort(key=lambda x: x['name'].lower())
+            if not held_entries and not pending_files:
+                yield entry
+                continue
+            held_entries.append(entry)
+
+            if batch_size and len(pending_files) >= batch_size:
+                if executor is None:
+                    executor = WORKER_TYPES.get(worker_type, ProcessPoolExecutor)(max_workers=workers)
+                interrupted = _resolve_pending_metadata(pending_files, workers, worker_type, manifest, executor,
+                                                        dependency_records)
+                pending_files = []
+                yield from held_entries
+                held_entries = []
+                if interrupted:
+                    schema["interrupted"] = True
+                    break
     except KeyboardInterrupt:
         print("\nFile scanning interrupted by user")
-        logging.warning("File scanning interrupted by user during os.walk")
+        logging.warning("File scanning interrupted by user during directory walk")
         # Continue with partial results
+        schema["interrupted"] = True
     except Exception as e:
         print(f"Error during file scanning: {e}")
         logging.error(f"Error during file scanning: {e}", exc_info=True)
         # Continue with partial results
-    
+        schema["interrupted"] = True
+
+    try:
+        if pending_files and _resolve_pending_metadata(pending_files, workers, worker_type, manifest, executor,
+                                                       dependency_records):
+            schema["interrupted"] = True
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    yield from held_entries
+
+    print("\n")
+
+def generate_repo_schema_from_git(base_dir, gitignore_spec, git_files, workers=1, worker_type='process', manifest=None,
+                                  dependency_records=None):
+    """Build the schema from a git file listing instead of walking the directory tree.
+
+    git_files maps base_dir-relative paths (tracked and untracked-not-ignored) to their index
+    blob SHA, or None when the working tree copy differs from the index or is untracked.
+    git has already applied every .gitignore, so gitignore_spec should hold only the
+    .repoignore/custom patterns (load_gitignore_patterns(..., include_gitignore=False)).
+
+    Subfolders list every directory git lists a file below that the spec does not prune, as
+    the walk does, except that git lists nothing for empty directories or directories that
+    only hold git-ignored files, which the walk still names.
+    """
+    schema = new_schema(base_dir)
+
+    print(f"Scanning git file list: {os.path.abspath(base_dir)}")
+
+    parallel = workers > 1
+    pending_files = []
+    entries = {}
+    listed_folders = set()
+
+    try:
+        for rel_path in sorted(git_files):
+            schema["files_scanned"] += 1
+            folder, file_name = os.path.split(rel_path)
+            listed_folders.add(folder)
+            file_path = os.path.join(base_dir, rel_path)
+            if is_ignored(file_path, base_dir, gitignore_spec, rel_path=rel_path):
+                continue
+
+            folder_key = folder.replace('/', os.sep) if folder else '.'
+            entry = entries.get(folder_key)
+            if entry is None:
+                entry = entries[folder_key] = {
+                    "folder": folder_key if folder else "./",
+                    "files": [],
+                    "subfolders": []
+                }
+            _collect_file(schema, entry, file_name, file_path, rel_path, pending_files, parallel, manifest,
+                          blob_sha=git_files[rel_path], dependency_records=dependency_records)
+    except KeyboardInterrupt:
+        print("\nFile scanning interrupted by user")
+        logging.warning("File scanning interrupted by user during git listing")
+        schema["interrupted"] = True
+
+    if pending_files and _resolve_pending_metadata(pending_files, workers, worker_type, manifest,
+                                                   dependency_records=dependency_records):
+        schema["interrupted"] = True
+
+    # Register every listed folder with its ancestors' subfolder lists, stopping at a pruned directory
+    subfolders = {}
+    for folder in listed_folders:
+        parent = '.'
+        rel_dir = ''
+        for name in folder.split('/') if folder else ():
+            rel_dir = rel_dir + '/' + name if rel_dir else name
+            if is_ignored(rel_dir, base_dir, gitignore_spec, is_dir=True, rel_path=rel_dir):
+                break
+            subfolders.setdefault(parent, set()).add(name)
+            parent = rel_dir.replace('/', os.sep)
+
+    if '.' not in entries and subfolders.get('.'):
+        entries['.'] = {"folder": "./", "files": [], "subfolders": []}
+
+    for folder_key in sorted(entries, key=lambda key: [] if key == '.' else key.split(os.sep)):
+        entry = entries[folder_key]
+        entry["subfolders"] = sorted(subfolders.get(folder_key, ()))
+        entry["files"].sort(key=lambda x: x['name'].lower())
+        schema["taxonomy"].append(entry)
+
     print("\n")
     return schema
 
+def write_schema_json(output_path, schema, entries):
+    """Stream a schema to output_path, writing each folder entry as soon as it is produced.
+
+    schema supplies the top-level fields (its taxonomy is ignored) and entries the folder
+    entries, typically iter_repo_schema(). The counters are read after entries is exhausted.
+    The output is byte-identical to json.dump(schema, f, indent=2) and is written to a
+    temporary file that replaces output_path when complete. Returns the number of entries.
+    A partial scan's "interrupted" flag, set while entries is consumed, is written last.
+    """
+    tmp_path = output_path + ".tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        f.write(f'  "project": {json.dumps(schema["project"])},\n')
+        f.write(f'  "version": {json.dumps(schema["version"])},\n')
+        f.write('  "taxonomy": [')
+        for entry in entries:
+            # Entries sit two levels deep, so each line of the entry is indented by four spaces
+            f.write(",\n    " if count else "\n    ")
+            f.write(json.dumps(entry, indent=2).replace("\n", "\n    "))
+            count += 1
+        f.write("\n  ],\n" if count else "],\n")
+        f.write(f'  "files_scanned": {json.dumps(schema["files_scanned"])},\n')
+        f.write(f'  "files_processed": {json.dumps(schema["files_processed"])}')
+        if "interrupted" in schema:
+            f.write(f',\n  "interrupted": {json.dumps(schema["interrupted"])}')
+        f.write("\n}")
+    os.replace(tmp_path, output_path)
+    return count
+
 def format_metadata(file, file_prefix):
     """Helper function to format file metadata"""
     metadata = file['metadata']
@@ -955,160 +884,151 @@ def format_metadata(file, file_prefix):
         meta_str += f"{indent}Content: {metadata['extracted_description']}\n"
     return meta_str
 
-def format_tree(entries, prefix="", base_dir=None, gitignore_spec=None):
-    tree = ""
-    base_indent = "    "  # Base indentation for all items
-
-    # Separate root files and folder entries
-    folder_map = {entry['folder']: entry for entry in entries if entry['folder'] != './'}
-    root_files_entry = next((entry for entry in entries if entry['folder'] == './'), None)
-
-    # Sort folder paths for deterministic order
-    sorted_folder_paths = sorted(folder_map.keys(), key=lambda x: x.lower())
-
-    # Helper function to build the tree recursively
-    def build_tree_recursive(folder_path, current_prefix=""):
-        if not folder_path: # Should be './' for root
-            return ""
-
-        # Get the entry for the current folder
-        folder_entry = folder_map.get(folder_path) if folder_path != './' else root_files_entry
-        if not folder_entry:
-            return "" # Should not happen if logic is correct
-
-        display_name = os.path.basename(folder_path) if folder_path != './' else './'
-        branch = "└── " if not folder_entry.get("subfolders") else "├── " # Placeholder, needs adjustment based on siblings
-
-        # Indentation based on depth
-        depth = folder_path.count(os.sep) if folder_path != './' else 0
-        indent = base_indent * depth
-        node_prefix = current_prefix + indent
-
-        line = f"{node_prefix}📁 {display_name}\n"
-
-        # Process files within this folder
-        files = sorted(folder_entry.get('files', []), key=lambda x: x['name'].lower())
-        file_indent = base_indent * (depth + 1)
-        file_node_prefix = current_prefix + file_indent
+def render_folder_entry(entry, write, prefix=""):
+    """Render one folder entry of the markdown tree (folder line, files and their metadata) via write"""
+    base_indent = "    "
+    folder_rel_path = entry['folder']
+    # Root is depth 0, top-level folders depth 1, and so on
+    depth = 0 if folder_rel_path == './' else folder_rel_path.count(os.sep) + 1
+
+    display_name = os.path.basename(folder_rel_path) if folder_rel_path != './' else './'
+    indent = base_indent * depth
+    write(f"{prefix}{indent}📁 {display_name}\n")
+
+    # Files are already sorted by name in the taxonomy
+    files = entry.get('files', [])
+    file_prefix = prefix + base_indent * (depth + 1)
+    num_files = len(files)
+    for i, file in enumerate(files):
+        is_last_file = i == num_files - 1
+        file_branch = "└── " if is_last_file else "├── "
+        write(f"{file_prefix}{file_branch}📄 {file['name']}\n")
+        try:
+            write(format_metadata(file, file_prefix))
+        except KeyboardInterrupt:
+            print("\nMetadata formatting interrupted by user")
+            logging.warning("Metadata formatting interrupted by user in render_folder_entry")
+            break
+        except Exception as e:
+            logging.error(f"Error formatting metadata for {file['name']}: {e}")
+            write(f"{file_prefix}    Error: {str(e)}\n")
 
-        num_files = len(files)
-        for i, file in enumerate(files):
-            is_last_file = i == num_files - 1
-            file_branch = "└── " if is_last_file else "├── "
-            line += f"{file_node_prefix}{file_branch}📄 {file['name']}\n"
-            # Use the helper function for metadata formatting
-            try:
-                line += format_metadata(file, file_node_prefix) # Pass the correct prefix
-            except KeyboardInterrupt:
-                print("\nMetadata formatting interrupted by user")
-                logging.warning("Metadata formatting interrupted by user")
-                break
-            except Exception as e:
-                logging.error(f"Error formatting metadata for {file['name']}: {e}")
-                line += f"{file_node_prefix}    Error: {str(e)}\n"
-
-        # Recursively process subfolders
-        subfolders = sorted(folder_entry.get("subfolders", []), key=str.lower)
-        num_subfolders = len(subfolders)
-        for i, subfolder_name in enumerate(subfolders):
-            subfolder_rel_path = os.path.join(folder_path, subfolder_name) if folder_path != './' else subfolder_name
-            # Check if subfolder is ignored (using correct base_dir and spec)
-            if base_dir and gitignore_spec and is_ignored(os.path.join(base_dir, subfolder_rel_path), base_dir, gitignore_spec):
-                continue
+def write_markdown_tree(entries, out, prefix=""):
+    """Write the markdown tree for taxonomy entries to out (a file handle or io.StringIO).
 
-            # Determine the prefix for the recursive call (handling tree lines)
-            # This part is complex to get right visually, might need refinement
-            # is_last_sub = i == num_subfolders - 1
-            # pipe_prefix = "|   " if not is_last_sub else "    "
-            # line += build_tree_recursive(subfolder_rel_path, current_prefix + pipe_prefix)
-            try:
-                line += build_tree_recursive(subfolder_rel_path, current_prefix) # Simpler recursion for now
-            except KeyboardInterrupt:
-                print("\nTree building interrupted by user")
-                logging.warning("Tree building interrupted by user")
-                break
-            except Exception as e:
-                logging.error(f"Error building tree for {subfolder_rel_path}: {e}")
-                line += f"{current_prefix}    Error processing {subfolder_name}\n"
-
-        return line
-
-    # Start building the tree from the root
-    # tree += build_tree_recursive('./') # Start with root
-
-    # Simpler iterative approach based on sorted paths for now, rebuild format_tree if needed
-    processed_folders = set()
-
-    def add_folder_entry(entry, depth):
-        nonlocal tree
-        folder_rel_path = entry['folder']
-        if folder_rel_path in processed_folders: return
-        processed_folders.add(folder_rel_path)
-
-        display_name = os.path.basename(folder_rel_path) if folder_rel_path != './' else './'
-        indent = base_indent * depth
-        tree += f"{prefix}{indent}📁 {display_name}\n"
-
-        files = sorted(entry.get('files', []), key=lambda x: x['name'].lower())
-        file_prefix = prefix + base_indent * (depth + 1)
-        num_files = len(files)
-        for i, file in enumerate(files):
-            is_last_file = i == num_files - 1
-            file_branch = "└── " if is_last_file else "├── "
-            tree += f"{file_prefix}{file_branch}📄 {file['name']}\n"
-            try:
-                tree += format_metadata(file, file_prefix)
-            except KeyboardInterrupt:
-                print("\nMetadata formatting interrupted by user")
-                logging.warning("Metadata formatting interrupted by user in add_folder_entry")
-                break
-            except Exception as e:
-                logging.error(f"Error formatting metadata for {file['name']}: {e}")
-                tree += f"{file_prefix}    Error: {str(e)}\n"
-
-    # Process root first if it exists
-    if root_files_entry:
+    One pass in taxonomy order: the scan already yields folders depth-first with each parent
+    before its children and files sorted, so nothing is re-sorted or re-checked here.
+    """
+    for entry in entries:
         try:
-            add_folder_entry(root_files_entry, 0)
+            render_folder_entry(entry, out.write, prefix)
         except KeyboardInterrupt:
-            print("\nRoot folder processing interrupted by user")
-            logging.warning("Root folder processing interrupted by user")
+            print("\nFolder processing interrupted by user")
+            logging.warning("Folder processing interrupted by user")
+            break
         except Exception as e:
-            logging.error(f"Error processing root folder: {e}")
-
-    # Process other folders based on depth
-    for folder_rel_path in sorted_folder_paths:
-         depth = folder_rel_path.count(os.sep)
-         entry = folder_map[folder_rel_path]
-         # Basic check - ensure parent was processed (simplistic, assumes top-down iteration)
-         parent = os.path.dirname(folder_rel_path) if folder_rel_path != '.' else '.'
-         parent_key = parent if parent != '.' else './'
-         # This check is flawed, os.walk guarantees parent first. Add entry directly.
-         try:
-             add_folder_entry(entry, depth + 1) # +1 because root is depth 0
-         except KeyboardInterrupt:
-             print("\nFolder processing interrupted by user")
-             logging.warning("Folder processing interrupted by user")
-             break
-         except Exception as e:
-             logging.error(f"Error processing folder {folder_rel_path}: {e}")
-
-    return tree
-
-def generate_markdown(schema, base_dir, gitignore_spec):
+            logging.error(f"Error processing folder {entry.get('folder')}: {e}")
+
+def format_tree(entries, prefix=""):
+    """Render the markdown tree for taxonomy entries as a string"""
+    out = io.StringIO()
+    write_markdown_tree(entries, out, prefix)
+    return out.getvalue()
+
+def markdown_header(schema, base_dir):
+    """Markdown preamble up to the opening of the tree code block"""
     markdown = f"# {schema['project']} v{schema['version']}\n\n"
     markdown += f"Scanned Path: {os.path.abspath(base_dir)}\n"
     markdown += f"Files Scanned: {schema.get('files_scanned', 0)}\n"
     markdown += f"Files Processed (after ignores): {schema.get('files_processed', 0)}\n\n"
     markdown += "## Project Structure with Details\n\n```\n"
+    return markdown
+
+# Closes the tree code block opened by markdown_header
+MARKDOWN_FOOTER = "\n```\n"
 
+def write_markdown(schema, base_dir, out):
+    """Write the complete markdown document for a schema to out"""
+    out.write(markdown_header(schema, base_dir))
     # Generate the tree structure with embedded metadata
-    markdown += format_tree(schema['taxonomy'], base_dir=base_dir, gitignore_spec=gitignore_spec)
-    markdown += "\n```\n"
+    write_markdown_tree(schema['taxonomy'], out)
+    out.write(MARKDOWN_FOOTER)
+
+def generate_markdown(schema, base_dir):
+    out = io.StringIO()
+    write_markdown(schema, base_dir, out)
+    return out.getvalue()
+
+def _update_previous_dependency_graph(graph_generator, graph_path, manifest, schema, workers=1, base_dir=None,
+                                     dependency_records=None):
+    """Bring the previous run's dependency graph up to date with the files this scan changed.
+
+    Only files the manifest reports as added, modified or removed are re-analyzed and
+    re-resolved. Returns None, so the caller builds the graph from scratch, when the saved
+    graph cannot be loaded or may not reflect the previous manifest (e.g. that run skipped
+    the dependency stage). Without a schema (streaming mode), changed files' nodes get
+    empty metadata.
+    """
+    try:
+        graph = graph_generator.load_graph(graph_path)
+    except Exception as e:
+        logging.warning(f"Could not load previous dependency graph {graph_path}: {e}")
+        return None
+    if graph.nodes.keys() != manifest.previous.keys() or any(
+            'dependencies' not in record for rel_path, record in manifest.previous.items()
+            if is_dependency_source(rel_path)):
+        logging.info("Previous dependency graph does not match the manifest, rebuilding it")
+        return None
 
-    return markdown
+    changed = manifest.changed_paths()
+    changed_set = set(changed)
+    if schema is None:
+        metadata = {file_path: {} for file_path in changed}
+    else:
+        metadata = {file_info["path"]: file_info.get("metadata", {})
+                    for entry in schema.get("taxonomy", []) for file_info in entry.get("files", [])
+                    if file_info.get("path") in changed_set}
+    return graph_generator.update(changed, manifest.removed_paths(), workers=workers, base_dir=base_dir,
+                                  file_records=dependency_records, metadata=metadata)
+
+def _open_qdrant_collection(qdrant_url, qdrant_api_key, project_name, base_dir, results):
+    """Connect to Qdrant and make sure the project's collection exists; returns (manager, collection_name)"""
+    logging.info("Initializing Qdrant client...")
+    qdrant_manager = QdrantManager(url=qdrant_url, api_key=qdrant_api_key)
+
+    # Generate collection name
+    collection_name = qdrant_manager.generate_collection_name(project_name, base_dir)
+    logging.info(f"Using collection name: {collection_name}")
+
+    # Create collection if it doesn't exist
+    if not qdrant_manager.collection_exists(collection_name):
+        if qdrant_manager.create_collection(collection_name):
+            logging.info(f"Created new collection: {collection_name}")
+        else:
+            logging.error("Failed to create collection")
+            results["message"] += " Warning: Failed to create Qdrant collection."
+    return qdrant_manager, collection_name
+
+# Placeholder vector (we don't have embeddings yet), shared by every point
+_PLACEHOLDER_VECTOR = [0.0] * 1536  # Standard embedding size
+
+def _qdrant_points(entry):
+    """Knowledge graph points for the files of one folder entry, for store_knowledge_graph_batch"""
+    for file_info in entry.get('files', []):
+        metadata = file_info.get('metadata') or {}
+        yield {
+            "file_path": file_info.get('path', ''),
+            "vector": _PLACEHOLDER_VECTOR,
+            "knowledge_graph": {
+                "fileType": metadata.get('type', ''),
+                "aiDescription": metadata.get('ai_description', ''),
+                "extractedDescription": metadata.get('extracted_description', ''),
+                "modified": metadata.get('modified', ''),
+                "folder": entry.get('folder', '')
+            }
+        }
 
-def run_schema_generation(base_dir, output_dir, ignore_file_path=None, qdrant_url=None, qdrant_api_key=None, project_name=None, store_qdrant=False, generate_dependency_graph_flag=True):
+def run_schema_generation(base_dir, output_dir, ignore_file_path=None, qdrant_url=None, qdrant_api_key=None, project_name=None, store_qdrant=False, generate_dependency_graph_flag=True, workers=1, worker_type='process', incremental=True, source='walk', stream=False, qdrant_batch_size=QDRANT_BATCH_SIZE, qdrant_parallel=1):
     """Core logic to generate schema, callable as a function."""
     logging.info(f"Starting schema generation for base_dir: {base_dir}, output_dir: {output_dir}, ignore_file: {ignore_file_path}")
 
@@ -1150,91 +1070,176 @@ def run_schema_generation(base_dir, output_dir, ignore_file_path=None, qdrant_ur
         if ignore_file_path:
             print(f"Using custom ignore file: {ignore_file_path}")
 
-        # Load ignore patterns using the correct base_dir and optional custom file
-        gitignore_spec = load_gitignore_patterns(base_dir, ignore_file_path)
+        # Load the manifest of the previous run so unchanged files are not re-analyzed
+        manifest = None
+        manifest_path = os.path.join(output_schema_dir, MANIFEST_FILENAME)
+        if incremental:
+            manifest = FileManifest.load(manifest_path, base_dir)
+            if manifest.previous:
+                print(f"Incremental scan: {len(manifest.previous)} files in manifest")
+
+        # Take the file list from the git index when requested, falling back to a directory walk
+        git_files = None
+        if source == 'git':
+            git_files = list_git_files(base_dir) if is_git_checkout(base_dir) else None
+            if git_files is None:
+                print("Warning: --source git requested but base directory is not a usable git checkout; walking the tree instead")
+                logging.warning(f"Git source unavailable for {base_dir}, falling back to directory walk")
+
+        # Load ignore patterns using the correct base_dir and optional custom file. git has
+        # already applied every .gitignore to its listing, so only the walk loads them.
+        gitignore_spec = load_gitignore_patterns(base_dir, ignore_file_path, include_gitignore=git_files is None)
         logging.info(f"Loaded ignore patterns from .repoignore and optional .gitignore")
 
-        # Generate schema using the correct base_dir and ignore spec
-        schema = generate_repo_schema(base_dir, gitignore_spec)
-        results["files_scanned"] = schema.get('files_scanned', 0)
-        results["files_processed"] = schema.get('files_processed', 0)
+        # The scan extracts each source file's imports/exports from the same read as its metadata,
+        # so the dependency stage does not read the repository again
+        dependency_records = {} if generate_dependency_graph_flag and DEPENDENCY_GRAPH_AVAILABLE else None
+
+        # Generate schema using the correct base_dir and ignore spec. In streaming mode the walk
+        # yields folder entries that are written out as they arrive instead of being collected.
+        streaming = stream and git_files is None
+        if stream and git_files is not None:
+            # The git listing groups files into folders only once every path is known
+            print("Warning: --stream is not supported with --source git; building the schema in memory instead")
+            logging.warning("Streaming requested with the git source, building the schema in memory")
+        if streaming and manifest is not None:
+            manifest.spool(manifest_path)
+        if git_files is not None:
+            schema = generate_repo_schema_from_git(base_dir, gitignore_spec, git_files, workers=workers,
+                                                   worker_type=worker_type, manifest=manifest,
+                                                   dependency_records=dependency_records)
+            entries = schema['taxonomy']
+        elif streaming:
+            schema = new_schema(base_dir)
+            entries = iter_repo_schema(base_dir, gitignore_spec, schema, workers=workers, worker_type=worker_type,
+                                       manifest=manifest, batch_size=workers * STREAM_BATCH_FILES_PER_WORKER,
+                                       dependency_records=dependency_records)
+        else:
+            schema = generate_repo_schema(base_dir, gitignore_spec, workers=workers, worker_type=worker_type,
+                                          manifest=manifest, dependency_records=dependency_records)
+            entries = schema['taxonomy']
 
         # Store in Qdrant if requested
+        qdrant_target = None
+        qdrant_existing = None
         if store_qdrant and QDRANT_AVAILABLE:
             try:
-                logging.info("Initializing Qdrant client...")
-                qdrant_manager = QdrantManager(url=qdrant_url, api_key=qdrant_api_key)
-
-                # Determine project name
-                if not project_name:
-                    project_name = schema.get('project', 'unknown_project')
-
-                # Generate collection name
-                collection_name = qdrant_manager.generate_collection_name(project_name, base_dir)
-                logging.info(f"Using collection name: {collection_name}")
-
-                # Create collection if it doesn't exist
-                if not qdrant_manager.collection_exists(collection_name):
-                    if qdrant_manager.create_collection(collection_name):
-                        logging.info(f"Created new collection: {collection_name}")
-                    else:
-                        logging.error("Failed to create collection")
-                        results["message"] += " Warning: Failed to create Qdrant collection."
-
-                # Store schema data in Qdrant (without vectors for now)
-                stored_count = 0
-                for entry in schema.get('taxonomy', []):
-                    for file_info in entry.get('files', []):
-                        file_path = file_info.get('path', '')
-                        metadata = file_info.get('metadata', {})
-
-                        # Create knowledge graph payload
-                        knowledge_graph = {
-                            "fileType": metadata.get('type', ''),
-                            "aiDescription": metadata.get('ai_description', ''),
-                            "extractedDescription": metadata.get('extracted_description', ''),
-                            "modified": metadata.get('modified', ''),
-                            "folder": entry.get('folder', '')
-                        }
-
-                        # Use dummy vector for now (since we don't have embeddings)
-                        dummy_vector = [0.0] * 1536  # Standard embedding size
-
-                        if qdrant_manager.store_knowledge_graph(
-                            collection_name=collection_name,
-                            file_path=file_path,
-                            vector=dummy_vector,
-                            knowledge_graph=knowledge_graph
-                        ):
-                            stored_count += 1
-
-                logging.info(f"Stored {stored_count} files in Qdrant collection: {collection_name}")
-                results["qdrant_collection"] = collection_name
-                results["qdrant_stored_count"] = stored_count
-
+                qdrant_target = _open_qdrant_collection(qdrant_url, qdrant_api_key, project_name or schema.get('project', 'unknown_project'), base_dir, results)
             except Exception as e:
                 logging.error(f"Qdrant storage failed: {e}")
                 results["message"] += f" Warning: Qdrant storage failed: {e}"
         elif store_qdrant and not QDRANT_AVAILABLE:
             logging.warning("Qdrant storage requested but qdrant-client not available")
             results["message"] += " Warning: Qdrant client not available."
+        if qdrant_target is not None:
+            # Content hashes of the points already stored: unchanged files are skipped, removed ones deleted
+            try:
+                qdrant_existing = qdrant_target[0].stored_content_hashes(qdrant_target[1])
+            except Exception as e:
+                logging.warning(f"Could not read stored Qdrant points, storing every file: {e}")
+
+        # Per-entry consumers: Qdrant, the markdown body (streaming mode) and the dependency stage
+        stored_count = 0
+        skipped_count = 0
+        qdrant_failed = []
+        qdrant_pending = []
+        qdrant_seen = set()
+        markdown_spool = None
+        dependency_files = []
+
+        def flush_qdrant(min_points=1):
+            # Send the pending points once there are enough to fill every in-flight batch
+            nonlocal stored_count, skipped_count, qdrant_target
+            if qdrant_target is None or len(qdrant_pending) < min_points:
+                return
+            try:
+                report = qdrant_target[0].store_knowledge_graph_batch(
+                    qdrant_target[1], qdrant_pending, batch_size=qdrant_batch_size, parallel=qdrant_parallel,
+                    existing=qdrant_existing)
+                stored_count += report["stored"]
+                skipped_count += report["skipped"]
+                qdrant_failed.extend(report["failed"])
+            except Exception as e:
+                logging.error(f"Qdrant storage failed: {e}")
+                results["message"] += f" Warning: Qdrant storage failed: {e}"
+                qdrant_target = None
+            qdrant_pending.clear()
+
+        def consume_entries(entries):
+            for entry in entries:
+                if qdrant_target is not None:
+                    points = list(_qdrant_points(entry))
+                    qdrant_seen.update(point["file_path"] for point in points)
+                    qdrant_pending.extend(points)
+                    flush_qdrant(max(1, qdrant_batch_size) * max(1, qdrant_parallel))
+                if markdown_spool is not None:
+                    write_markdown_tree((entry,), markdown_spool)
+                if streaming and dependency_records is not None:
+                    # The dependency stage only needs the paths; imports/exports are in dependency_records
+                    dependency_files.extend(file_info["path"] for file_info in entry["files"])
+                yield entry
 
         # Generate JSON output to the specified path
         print(f"\nWriting JSON output to: {output_json_path}")
         try:
-            with open(output_json_path, "w", encoding="utf-8") as f:
-                json.dump(schema, f, indent=2)
+            if streaming:
+                markdown_spool = open(output_md_path + ".tmp", "w", encoding="utf-8")
+            write_schema_json(output_json_path, schema, consume_entries(entries))
         except Exception as e:
             results["message"] = f"Error writing JSON file: {e}"
             return results
+        finally:
+            if markdown_spool is not None:
+                markdown_spool.close()
+        results["files_scanned"] = schema.get('files_scanned', 0)
+        results["files_processed"] = schema.get('files_processed', 0)
+
+        flush_qdrant()
+        if qdrant_target is not None:
+            deleted_count = 0
+            if qdrant_existing and schema.get("interrupted"):
+                # Files the partial scan never reached are not gone, so keep their points
+                print("Warning: scan was incomplete; not removing stale Qdrant points")
+                logging.warning("Scan incomplete, skipped deleting Qdrant points for unseen files")
+            elif qdrant_existing:
+                removed = [path for path in qdrant_existing if path not in qdrant_seen]
+                deleted_count = qdrant_target[0].delete_knowledge_graphs(qdrant_target[1], removed,
+                                                                         batch_size=qdrant_batch_size)
+            logging.info(f"Stored {stored_count} files in Qdrant collection: {qdrant_target[1]} "
+                         f"({skipped_count} unchanged, {deleted_count} removed)")
+            results["qdrant_collection"] = qdrant_target[1]
+            results["qdrant_stored_count"] = stored_count
+            results["qdrant_unchanged_count"] = skipped_count
+            results["qdrant_deleted_count"] = deleted_count
+            if qdrant_failed:
+                results["qdrant_failed"] = qdrant_failed
+                results["message"] += f" Warning: {len(qdrant_failed)} files could not be stored in Qdrant."
+
+        if manifest is not None:
+            try:
+                manifest.save(manifest_path)
+                results["manifest_path"] = manifest_path
+                results["files_reused"] = manifest.stats["reused"] + manifest.stats["rehashed"]
+                results["files_extracted"] = manifest.stats["extracted"]
+                logging.info(f"Manifest stats: {manifest.stats}, removed: {len(manifest.removed_paths())}")
+            except Exception as e:
+                logging.error(f"Error writing manifest: {e}")
+                results["message"] += f" Warning: Manifest could not be saved: {e}"
 
         # Generate Markdown output to the specified path
         print(f"Writing Markdown output to: {output_md_path}")
         try:
-            # Pass base_dir and spec needed for formatting/checking within generate_markdown/format_tree
-            markdown_content = generate_markdown(schema, base_dir, gitignore_spec)
-            with open(output_md_path, "w", encoding="utf-8") as f:
-                f.write(markdown_content)
+            if streaming:
+                # The tree body was spooled during the scan; the header needs the final counters
+                with open(output_md_path, "w", encoding="utf-8") as f, \
+                        open(output_md_path + ".tmp", "r", encoding="utf-8") as body:
+                    f.write(markdown_header(schema, base_dir))
+                    shutil.copyfileobj(body, f)
+                    f.write(MARKDOWN_FOOTER)
+                os.remove(output_md_path + ".tmp")
+            else:
+                with open(output_md_path, "w", encoding="utf-8") as f:
+                    write_markdown(schema, base_dir, f)
         except KeyboardInterrupt:
             print("\nMarkdown generation interrupted by user")
             logging.warning("Markdown generation interrupted by user")
@@ -1251,21 +1256,50 @@ def run_schema_generation(base_dir, output_dir, ignore_file_path=None, qdrant_ur
             print("Generating dependency graph...")
             try:
                 dependency_graph_path = os.path.join(output_schema_dir, "dependency-graph.json")
+                snapshot_path = os.path.join(output_schema_dir, "dependency-graph.snapshot")
                 results["dependency_graph_path"] = dependency_graph_path
 
-                # Generate dependency graph from the schema
+                # Update the previous run's graph with the changed files, or generate it from the schema.
+                # The snapshot holds the whole graph, the JSON only what fit its size limit.
                 graph_generator = DependencyGraphGenerator()
-                dependency_graph = graph_generator.generate_from_schema(schema)
+                dependency_graph = None
+                previous_graph_path = next((path for path in (snapshot_path, dependency_graph_path)
+                                            if os.path.exists(path)), None)
+                if manifest is not None and manifest.previous and previous_graph_path:
+                    dependency_graph = _update_previous_dependency_graph(
+                        graph_generator, previous_graph_path, manifest, None if streaming else schema,
+                        workers=workers, base_dir=base_dir, dependency_records=dependency_records)
+                    if dependency_graph is not None:
+                        results["dependency_graph_updated"] = True
+                if dependency_graph is None:
+                    graph_generator = DependencyGraphGenerator()
+                    if streaming:
+                        # Streamed entries are gone; their nodes are built without file metadata
+                        dependency_graph = graph_generator.generate_from_files(
+                            ((file_path, {}) for file_path in dependency_files), workers=workers,
+                            base_dir=base_dir, file_records=dependency_records)
+                    else:
+                        dependency_graph = graph_generator.generate_from_schema(schema, workers=workers,
+                                                                                base_dir=base_dir,
+                                                                                file_records=dependency_records)
+
+                # Everything below only reads the graph: switch to the compact form once and drop the
+                # dict-of-sets graph, rather than holding it next to the compact copies that the
+                # snapshot and the cycle/layer queries would otherwise each build from it
+                dependency_graph = graph_generator.graph = dependency_graph.compact()
 
-                # Save the dependency graph
+                # Save the dependency graph, plus a binary snapshot for fast reloading
                 graph_generator.save_graph(dependency_graph_path)
+                graph_generator.save_graph(snapshot_path, snapshot=True)
+                results["dependency_graph_snapshot_path"] = snapshot_path
 
                 # Add dependency graph statistics to results
                 cycles = dependency_graph.detect_cycles()
                 results["dependency_graph_stats"] = {
                     "nodes": len(dependency_graph.nodes),
                     "edges": len(dependency_graph.edges),
-                    "cycles": len(cycles)
+                    "cycles": len(cycles),
+                    "build_layers": len(dependency_graph.build_layers())
                 }
 
                 if cycles:
@@ -1300,12 +1334,16 @@ def run_schema_generation(base_dir, output_dir, ignore_file_path=None, qdrant_ur
     print(f"  Base Directory: {base_dir}")
     print(f"  Files Scanned: {results['files_scanned']}")
     print(f"  Files Processed (after ignores): {results['files_processed']}")
+    if 'files_reused' in results:
+        print(f"  Files Re-analyzed: {results['files_extracted']} (unchanged, reused: {results['files_reused']})")
     print(f"  Output Schema Dir: {output_schema_dir}")
     print(f"    - {os.path.basename(output_json_path)}")
     print(f"    - {os.path.basename(output_md_path)}")
 
     if 'dependency_graph_path' in results:
         print(f"    - {os.path.basename(results['dependency_graph_path'])}")
+    if 'dependency_graph_snapshot_path' in results:
+        print(f"    - {os.path.basename(results['dependency_graph_snapshot_path'])}")
         if 'dependency_graph_stats' in results:
             stats = results['dependency_graph_stats']
             print(f"  Dependency Graph: {stats['nodes']} nodes, {stats['edges']} edges")
@@ -1341,8 +1379,15 @@ def main():
     parser.add_argument('--qdrant-api-key', help='Qdrant API key')
     parser.add_argument('--project-name', help='Project name for collection naming')
     parser.add_argument('--store-qdrant', action='store_true', help='Store schema data in Qdrant vector database')
+    parser.add_argument('--qdrant-batch-size', type=int, default=QDRANT_BATCH_SIZE, help=f'Points per Qdrant upsert request (default: {QDRANT_BATCH_SIZE})')
+    parser.add_argument('--qdrant-parallel', type=int, default=1, help='Qdrant upsert requests in flight at once (default: 1)')
     parser.add_argument('--generate-dependency-graph', action='store_true', default=True, help='Generate dependency graph (default: True)')
     parser.add_argument('--no-dependency-graph', action='store_true', help='Disable dependency graph generation')
+    parser.add_argument('--source', choices=['walk', 'git'], default='walk', help='Build the file list by walking the directory tree (default) or from the git index (tracked plus untracked-not-ignored files)')
+    parser.add_argument('--no-incremental', action='store_true', help=f'Re-analyze every file instead of reusing unchanged results from {MANIFEST_FILENAME}')
+    parser.add_argument('--workers', type=int, default=1, help='Number of parallel workers for file metadata extraction (default: 1, serial)')
+    parser.add_argument('--worker-type', choices=sorted(WORKER_TYPES), default='process', help='Worker pool type used when --workers > 1 (default: process)')
+    parser.add_argument('--stream', action='store_true', help='Write folder entries to the outputs as the walk produces them instead of holding the whole schema in memory. Only file paths, imports/exports and the previous manifest are kept; dependency graph nodes then carry no file metadata. Not supported with --source git')
     args = parser.parse_args()
 
     base_dir_to_use = args.base_dir
@@ -1353,6 +1398,11 @@ def main():
     project_name = args.project_name
     store_qdrant = args.store_qdrant
     generate_dependency_graph_flag = args.generate_dependency_graph and not args.no_dependency_graph
+    incremental = not args.no_incremental
+    source = args.source
+    workers = max(1, args.workers)
+    worker_type = args.worker_type
+    stream = args.stream
 
     logging.info(f"Base directory: {base_dir_to_use}")
     logging.info(f"Output directory: {output_dir_to_use}")
@@ -1362,6 +1412,10 @@ def main():
     logging.info(f"Project name: {project_name}")
     logging.info(f"Store in Qdrant: {store_qdrant}")
     logging.info(f"Generate dependency graph: {generate_dependency_graph_flag}")
+    logging.info(f"Incremental: {incremental}")
+    logging.info(f"File source: {source}")
+    logging.info(f"Workers: {workers} ({worker_type})")
+    logging.info(f"Streaming output: {stream}")
 
     # Determine script's directory and suggested project root
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -1431,7 +1485,14 @@ def main():
         qdrant_api_key,
         project_name,
         store_qdrant,
-        generate_dependency_graph_flag
+        generate_dependency_graph_flag,
+        workers,
+        worker_type,
+        incremental,
+        source,
+        stream,
+        args.qdrant_batch_size,
+        args.qdrant_parallel
     )
 
     # Exit with error code if failed
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test suite for the benchmark harness
+
+Checks synthetic repository generation and the shape of the results document.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+import contextlib
+import io
+from unittest import mock
+
+import benchmark
+
+class TestSyntheticRepo(unittest.TestCase):
+    """Test synthetic repository generation"""
+
+    def test_generate_synthetic_repo(self):
+        """Test that the generator honours file count, depth, languages and ignore patterns"""
+        with tempfile.TemporaryDirectory() as base_dir:
+            repo = benchmark.generate_synthetic_repo(base_dir, 60, depth=2, languages="py=1,md=1",
+                                                     ignore_patterns=10, seed=1)
+
+            generated = []
+            for root, _, files in os.walk(base_dir):
+                rel_root = os.path.relpath(root, base_dir)
+                if rel_root.split(os.sep)[0] == "node_modules":
+                    continue
+                generated.extend(os.path.join(rel_root, f) for f in files if f.startswith("mod"))
+
+            self.assertEqual(len(generated), 60)
+            self.assertTrue(all(os.path.splitext(p)[1] in (".py", ".md") for p in generated))
+            self.assertTrue(all(p.count(os.sep) <= 2 for p in generated))
+            with open(os.path.join(base_dir, ".gitignore"), encoding="utf-8") as f:
+                self.assertEqual(f.read().splitlines(), benchmark.generate_ignore_patterns(10) + ["node_modules/"])
+            self.assertGreater(repo["ignored_files"], 0)
+
+    def test_generation_is_deterministic(self):
+        """Test that the same seed produces the same tree"""
+        trees = []
+        for _ in range(2):
+            with tempfile.TemporaryDirectory() as base_dir:
+                benchmark.generate_synthetic_repo(base_dir, 40, seed=7)
+                trees.append(sorted(os.path.relpath(os.path.join(root, f), base_dir)
+                                    for root, _, files in os.walk(base_dir) for f in files))
+        self.assertEqual(trees[0], trees[1])
+
+class TestRunBenchmark(unittest.TestCase):
+    """Test the benchmark results document"""
+
+    def test_results_cover_every_stage(self):
+        """Test that each stage is timed (or explicitly skipped) and results are JSON"""
+        with contextlib.redirect_stderr(io.StringIO()):
+            document = benchmark.run_benchmark([40], repeat=1, ignore_patterns=5)
+
+        json.dumps(document)
+        self.assertEqual(document["benchmark_version"], benchmark.BENCHMARK_VERSION)
+        stages = document["results"][0]["stages"]
+        self.assertEqual(set(stages), set(benchmark.STAGES))
+        for stage in ("walk", "ignore_matching", "metadata_extraction", "json_write", "markdown_write"):
+            self.assertIn("median_seconds", stages[stage])
+        self.assertTrue(all("median_seconds" in s or "skipped" in s for s in stages.values()))
+
+    def test_compare_flags_regressions(self):
+        """Test that a slower stage is reported against the baseline"""
+        baseline = {"benchmark_version": benchmark.BENCHMARK_VERSION,
+                    "results": [{"repo": {"files": 10}, "stages": {"walk": {"median_seconds": 1.0}}}]}
+        current = {"benchmark_version": benchmark.BENCHMARK_VERSION,
+                   "results": [{"repo": {"files": 10}, "stages": {"walk": {"median_seconds": 1.5},
+                                                                 "json_write": {"median_seconds": 0.1}}}]}
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            regressions = benchmark.compare(current, baseline)
+        self.assertEqual([r["stage"] for r in regressions], ["walk"])
+        self.assertIn("json_write", stderr.getvalue())
+        self.assertIn("missing from the baseline", stderr.getvalue())
+
+    def test_compare_rejects_other_versions(self):
+        """Test that results from a different benchmark version are not compared"""
+        baseline = {"benchmark_version": benchmark.BENCHMARK_VERSION - 1,
+                    "results": [{"repo": {"files": 10}, "stages": {"walk": {"median_seconds": 1.0}}}]}
+        current = {"benchmark_version": benchmark.BENCHMARK_VERSION,
+                   "results": [{"repo": {"files": 10}, "stages": {"walk": {"median_seconds": 1.5}}}]}
+        with self.assertRaises(ValueError):
+            benchmark.compare(current, baseline)
+        del baseline["benchmark_version"]
+        with self.assertRaises(ValueError):
+            benchmark.compare(current, baseline)
+
+    def test_only_generated_patterns_apply(self):
+        """Test the stages use the generated .gitignore, not the tool's own .repoignore"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = os.path.join(temp_dir, "repo")
+            output_dir = os.path.join(temp_dir, "output")
+            os.makedirs(output_dir)
+            benchmark.generate_synthetic_repo(base_dir, 30, ignore_patterns=5)
+            with mock.patch.object(benchmark.repo_schema, "load_gitignore_patterns",
+                                   side_effect=AssertionError(".repoignore loaded")), \
+                    contextlib.redirect_stderr(io.StringIO()):
+                stages = benchmark.run_stages(base_dir, output_dir)
+        # The 30 modules and the .gitignore; node_modules/ is pruned by the generated .gitignore alone
+        self.assertEqual(stages["metadata_extraction"]["items"], 31)
+
+    def test_stdout_holds_only_results_json(self):
+        """Test that without --output the results JSON on stdout can be parsed"""
+        stdout = io.StringIO()
+        argv = ["benchmark.py", "--files", "20", "--repeat", "1", "--ignore-patterns", "2"]
+        with mock.patch("sys.argv", argv), contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(io.StringIO()):
+            benchmark.main()
+        document = json.loads(stdout.getvalue())
+        self.assertEqual(document["results"][0]["repo"]["files"], 20)
+        self.assertIn("median_seconds", document["results"][0]["stages"]["metadata_extraction"])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
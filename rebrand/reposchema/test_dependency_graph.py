@@ -15,10 +15,15 @@ import sys
 # Add the utils directory to the path for testing
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
 
+from dataclasses import asdict
+
 from dependency_graph import (
     DependencyNode, DependencyEdge, DependencyGraph,
     DependencyAnalyzer, DependencyGraphGenerator, generate_dependency_graph
 )
+from compact_graph import CompactDependencyGraph
+from python_imports import extract_python_imports, imports_as_written
+from source_symbols import extract_symbols, summarize_symbols
 
 class TestDependencyNode(unittest.TestCase):
     """Test DependencyNode dataclass"""
@@ -84,6 +89,22 @@ class TestDependencyGraph(unittest.TestCase):
         self.assertIn("src/main.py", self.graph.nodes)
         self.assertEqual(self.graph.nodes["src/main.py"], self.node1)
 
+    def test_readded_node_replaces_cached_data(self):
+        """Test that re-adding a node refreshes the compact view and the module mappings"""
+        self.graph.add_node(self.node2)
+        self.graph.add_edge(DependencyEdge("src/utils.py", "src/config.py", "import"))
+        self.assertEqual(self.graph.compact(keep_metadata=False).nodes["src/utils.py"].imports, [])
+        self.assertEqual(self.graph.transitive_dependencies("src/utils.py"), ["src/config.py"])
+
+        self.graph.add_node(DependencyNode("src/utils.py", ".py", ["config"]))
+        self.assertEqual(self.graph.compact(keep_metadata=False).nodes["src/utils.py"].imports, ["config"])
+        self.assertEqual(self.graph.transitive_dependencies("src/utils.py"), ["src/config.py"])
+
+        self.graph.add_node(DependencyNode("src/utils.py", ".txt"))
+        self.assertEqual(self.graph.compact(keep_metadata=False).nodes["src/utils.py"].file_type, ".txt")
+        self.assertNotIn("src/utils.py", self.graph.module_suffix_map.get("utils", ()))
+        self.assertNotIn("src/utils.py", self.graph.file_to_module_map)
+
     def test_add_edge(self):
         """Test adding edges to graph"""
         self.graph.add_edge(self.edge1)
@@ -109,6 +130,29 @@ class TestDependencyGraph(unittest.TestCase):
         self.assertEqual(len(deps), 1)
         self.assertEqual(deps[0], self.edge1)
 
+    def test_duplicate_edges_are_merged(self):
+        """Test that repeated edges merge their imported items"""
+        self.graph.add_edge(self.edge1)
+        self.graph.add_edge(DependencyEdge("src/main.py", "src/utils.py", "import", ["helper", "other"]))
+
+        self.assertEqual(len(self.graph.edges), 1)
+        self.assertEqual(self.graph.edges[0].imported_items, ["helper", "other"])
+        self.assertEqual(self.graph.out_degree("src/main.py"), 1)
+        self.assertEqual(self.graph.in_degree("src/utils.py"), 1)
+        self.assertEqual(self.graph.in_degree("src/main.py"), 0)
+
+    def test_get_subgraph(self):
+        """Test extracting a subgraph keeps only edges between selected files"""
+        for node in (self.node1, self.node2, self.node3):
+            self.graph.add_node(node)
+        self.graph.add_edge(self.edge1)
+        self.graph.add_edge(self.edge2)
+
+        subgraph = self.graph.get_subgraph(["src/main.py", "src/utils.py"])
+        self.assertEqual(set(subgraph.nodes), {"src/main.py", "src/utils.py"})
+        self.assertEqual(subgraph.edges, [self.edge1])
+        self.assertEqual(subgraph.get_dependents("src/utils.py"), [self.edge1])
+
     def test_detect_cycles_no_cycles(self):
         """Test cycle detection with acyclic graph"""
         self.graph.add_node(self.node1)
@@ -129,8 +173,100 @@ class TestDependencyGraph(unittest.TestCase):
         self.graph.add_edge(edge4)       # config -> main
 
         cycles = self.graph.detect_cycles()
-        # Without NetworkX, cycle detection returns empty list
-        self.assertIsInstance(cycles, list)
+        self.assertEqual(cycles, [["src/config.py", "src/main.py", "src/utils.py"]])
+        self.assertEqual(self.graph.find_cycles(), [["src/config.py", "src/main.py", "src/utils.py"]])
+
+    def test_find_cycles(self):
+        """Test representative cycles are reported once per rotation and bounded"""
+        # Two cycles sharing main: main -> utils -> main and main -> config -> main
+        self.graph.add_edge(self.edge1)
+        self.graph.add_edge(self.edge2)
+        self.graph.add_edge(DependencyEdge("src/utils.py", "src/main.py", "import"))
+        self.graph.add_edge(DependencyEdge("src/config.py", "src/main.py", "import"))
+        self.graph.add_edge(DependencyEdge("src/self.py", "src/self.py", "import"))
+
+        self.assertEqual(self.graph.detect_cycles(), [
+            ["src/config.py", "src/main.py", "src/utils.py"],
+            ["src/self.py"],
+        ])
+        self.assertEqual(self.graph.find_cycles(), [
+            ["src/config.py", "src/main.py"],
+            ["src/main.py", "src/utils.py"],
+            ["src/self.py"],
+        ])
+        self.assertEqual(len(self.graph.find_cycles(max_cycles=1)), 1)
+
+    def test_remove_nodes(self):
+        """Test removing a file drops its edges and index entries"""
+        self.graph.add_node(self.node1)
+        self.graph.add_node(self.node2)
+        self.graph.add_edge(self.edge1)
+        self.graph.add_edge(DependencyEdge("src/utils.py", "src/main.py", "import"))
+
+        self.graph.remove_nodes(["src/utils.py"])
+
+        self.assertEqual(list(self.graph.nodes), ["src/main.py"])
+        self.assertEqual(self.graph.edges, [])
+        self.assertEqual(self.graph.get_dependencies("src/main.py"), [])
+        self.assertEqual(self.graph.in_degree("src/main.py"), 0)
+        self.assertNotIn("utils", self.graph.module_suffix_map)
+        self.assertEqual(self.graph.detect_cycles(), [])
+
+    def test_transitive_queries(self):
+        """Test transitive dependents/dependencies with cycles, depth limits and batches"""
+        # app -> main -> utils <-> config -> lib
+        self.graph.add_edge(DependencyEdge("src/app.py", "src/main.py", "import"))
+        self.graph.add_edge(self.edge1)
+        self.graph.add_edge(DependencyEdge("src/utils.py", "src/config.py", "import"))
+        self.graph.add_edge(DependencyEdge("src/config.py", "src/utils.py", "import"))
+        self.graph.add_edge(DependencyEdge("src/config.py", "src/lib.py", "import"))
+
+        self.assertEqual(self.graph.transitive_dependents("src/lib.py"),
+                         ["src/app.py", "src/config.py", "src/main.py", "src/utils.py"])
+        self.assertEqual(self.graph.transitive_dependents("src/utils.py"),
+                         ["src/app.py", "src/config.py", "src/main.py"])
+        self.assertEqual(self.graph.transitive_dependents("src/lib.py", max_depth=2),
+                         ["src/config.py", "src/utils.py"])
+        self.assertEqual(self.graph.transitive_dependencies("src/main.py"),
+                         ["src/config.py", "src/lib.py", "src/utils.py"])
+        self.assertEqual(self.graph.transitive_dependencies("src/main.py", max_depth=1), ["src/utils.py"])
+        self.assertEqual(self.graph.transitive_dependents(["src/main.py", "src/config.py"]),
+                         ["src/app.py", "src/utils.py"])
+        self.assertEqual(self.graph.transitive_dependents(["src/missing.py"]), [])
+        # Memoized results are reused, and dropped with the snapshot when the graph changes
+        self.assertEqual(self.graph.transitive_dependents("src/lib.py")[0], "src/app.py")
+        self.graph.add_edge(DependencyEdge("src/tests.py", "src/app.py", "import"))
+        self.assertIn("src/tests.py", self.graph.transitive_dependents("src/lib.py"))
+
+    def test_pagerank(self):
+        """Test the most imported file ranks highest and scores sum to one"""
+        for node in (self.node1, self.node2, self.node3):
+            self.graph.add_node(node)
+        self.graph.add_edge(self.edge1)
+        self.graph.add_edge(self.edge2)
+        self.graph.add_edge(DependencyEdge("src/config.py", "src/utils.py", "import"))
+
+        scores = self.graph.pagerank()
+        self.assertEqual(max(scores, key=scores.get), "src/utils.py")
+        self.assertLess(scores["src/main.py"], scores["src/config.py"])
+        self.assertAlmostEqual(sum(scores.values()), 1.0)
+
+    def test_cycle_cache_invalidated_on_mutation(self):
+        """Test cached cycle results are recomputed after an edge is added"""
+        self.graph.add_edge(self.edge1)
+        self.assertEqual(self.graph.detect_cycles(), [])
+        self.graph.add_edge(DependencyEdge("src/utils.py", "src/main.py", "import"))
+        self.assertEqual(self.graph.detect_cycles(), [["src/main.py", "src/utils.py"]])
+
+    def test_strongly_connected_components_deep_chain(self):
+        """Test SCC detection on a chain deeper than the recursion limit"""
+        depth = sys.getrecursionlimit() + 100
+        for i in range(depth):
+            self.graph.add_edge(DependencyEdge(f"m{i}.py", f"m{i + 1}.py", "import"))
+        self.graph.add_edge(DependencyEdge(f"m{depth}.py", "m0.py", "import"))
+
+        self.assertEqual(len(self.graph.strongly_connected_components()), 1)
+        self.assertEqual(len(self.graph.detect_cycles()[0]), depth + 1)
 
     def test_topological_sort(self):
         """Test topological sorting"""
@@ -139,12 +275,109 @@ class TestDependencyGraph(unittest.TestCase):
         self.graph.add_edge(self.edge1)
 
         sorted_files = self.graph.topological_sort()
-        self.assertIn("src/main.py", sorted_files)
-        self.assertIn("src/utils.py", sorted_files)
+        self.assertEqual(sorted_files, ["src/main.py", "src/utils.py"])
 
-        # Without NetworkX, order is not guaranteed to be topological
-        # Just check that both files are present
-        self.assertEqual(len(sorted_files), 2)
+    def test_build_layers(self):
+        """Test build layers put dependencies first and keep cycles together"""
+        for node in (self.node1, self.node2, self.node3):
+            self.graph.add_node(node)
+        self.graph.add_node(DependencyNode("src/app.py", ".py"))
+        self.graph.add_edge(self.edge1)  # main -> utils
+        self.graph.add_edge(self.edge2)  # main -> config
+        self.graph.add_edge(DependencyEdge("src/utils.py", "src/config.py", "import"))
+        self.graph.add_edge(DependencyEdge("src/config.py", "src/utils.py", "import"))
+        self.graph.add_edge(DependencyEdge("src/app.py", "src/main.py", "import"))
+
+        self.assertEqual(self.graph.build_layers(), [
+            ["src/config.py", "src/utils.py"],
+            ["src/main.py"],
+            ["src/app.py"],
+        ])
+        self.assertEqual(self.graph.topological_sort(),
+                         ["src/app.py", "src/main.py", "src/config.py", "src/utils.py"])
+
+class TestCompactDependencyGraph(unittest.TestCase):
+    """Test the integer-indexed CompactDependencyGraph"""
+
+    def setUp(self):
+        """Set up a graph with a cycle, an edge-only endpoint and metadata"""
+        self.graph = DependencyGraph()
+        self.graph.add_node(DependencyNode("src/main.py", ".py", ["utils", "config"], ["function:main"],
+                                           {"size": 10}))
+        self.graph.add_node(DependencyNode("src/utils.py", ".py", ["config"]))
+        self.graph.add_node(DependencyNode("src/config.py", ".py", ["utils"]))
+        self.graph.add_edge(DependencyEdge("src/main.py", "src/utils.py", "import", ["utils"]))
+        self.graph.add_edge(DependencyEdge("src/main.py", "src/config.py", "import", ["config"], 3))
+        self.graph.add_edge(DependencyEdge("src/utils.py", "src/config.py", "import", ["config"]))
+        self.graph.add_edge(DependencyEdge("src/config.py", "src/utils.py", "import", ["utils"]))
+        self.graph.add_edge(DependencyEdge("src/config.py", "vendor/lib.py", "import", ["lib"]))
+        self.compact = self.graph.compact()
+
+    def test_views_match_dependency_graph(self):
+        """Test nodes, edges and neighbor queries match the dataclass graph"""
+        self.assertEqual(list(self.compact.nodes), list(self.graph.nodes))
+        for file_path, node in self.graph.nodes.items():
+            self.assertEqual(self.compact.nodes[file_path].to_dict(), asdict(node))
+        self.assertNotIn("vendor/lib.py", self.compact.nodes)
+
+        self.assertEqual([edge.to_dict() for edge in self.compact.edges],
+                         [asdict(edge) for edge in self.graph.edges])
+        for file_path in [*self.graph.nodes, "vendor/lib.py", "missing.py"]:
+            self.assertEqual([e.to_dict() for e in self.compact.get_dependencies(file_path)],
+                             [asdict(e) for e in self.graph.get_dependencies(file_path)])
+            self.assertEqual([e.to_dict() for e in self.compact.get_dependents(file_path)],
+                             [asdict(e) for e in self.graph.get_dependents(file_path)])
+            self.assertEqual(self.compact.in_degree(file_path), self.graph.in_degree(file_path))
+            self.assertEqual(self.compact.out_degree(file_path), self.graph.out_degree(file_path))
+
+    def test_algorithms_and_subgraph(self):
+        """Test cycle groups, layers and subgraph extraction on the compact graph"""
+        self.assertEqual(self.compact.detect_cycles(), [["src/config.py", "src/utils.py"]])
+        self.assertEqual(self.compact.build_layers(),
+                         [["vendor/lib.py"], ["src/config.py", "src/utils.py"], ["src/main.py"]])
+
+        subgraph = self.compact.get_subgraph(["src/main.py", "src/utils.py"])
+        self.assertIsInstance(subgraph, CompactDependencyGraph)
+        self.assertEqual(list(subgraph.nodes), ["src/main.py", "src/utils.py"])
+        self.assertEqual([(e.source_file, e.target_file) for e in subgraph.edges],
+                         [("src/main.py", "src/utils.py")])
+        self.assertEqual(subgraph.nodes["src/main.py"].metadata, {"size": 10})
+
+    def test_views_use_slots(self):
+        """Test node and edge views carry no per-instance dict"""
+        self.assertFalse(hasattr(self.compact.nodes["src/main.py"], "__dict__"))
+        self.assertFalse(hasattr(self.compact.edges[0], "__dict__"))
+        self.assertEqual(self.compact.out_targets.typecode, "i")
+
+    def test_compact_snapshot_tracks_mutation(self):
+        """Test the graph's cached compact snapshot is rebuilt after mutation"""
+        self.assertEqual(self.graph.build_layers()[-1], ["src/main.py"])
+        self.graph.add_edge(DependencyEdge("src/app.py", "src/main.py", "import"))
+        self.assertEqual(self.graph.build_layers()[-1], ["src/app.py"])
+
+    def test_binary_snapshot_roundtrip(self):
+        """Test a saved snapshot loads into an equivalent memory-mapped graph"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot_path = os.path.join(temp_dir, "graph.snapshot")
+            self.compact.save(snapshot_path)
+            loaded = CompactDependencyGraph.load(snapshot_path)
+
+            self.assertIsInstance(loaded.out_targets, memoryview)
+            self.assertEqual(list(loaded.nodes), list(self.compact.nodes))
+            self.assertEqual([n.to_dict() for n in loaded.nodes.values()],
+                             [n.to_dict() for n in self.compact.nodes.values()])
+            self.assertEqual([e.to_dict() for e in loaded.edges], [e.to_dict() for e in self.compact.edges])
+            self.assertEqual(loaded.get_dependents("vendor/lib.py")[0].source_file, "src/config.py")
+            self.assertEqual(loaded.detect_cycles(), self.compact.detect_cycles())
+            self.assertEqual(loaded.build_layers(), self.compact.build_layers())
+
+            self.graph.compact(keep_metadata=False).save(snapshot_path)
+            self.assertEqual(CompactDependencyGraph.load(snapshot_path).nodes["src/main.py"].metadata, {})
+
+            with open(snapshot_path, "w") as f:
+                f.write("{}")
+            with self.assertRaises(ValueError):
+                CompactDependencyGraph.load(snapshot_path)
 
 class TestDependencyAnalyzer(unittest.TestCase):
     """Test DependencyAnalyzer class"""
@@ -219,6 +452,50 @@ public class MyClass {
         self.assertTrue(len(node.imports) >= 0)  # At least empty list
         self.assertIn("class:MyClass", node.exports)
 
+    def test_node_and_summary_share_symbols(self):
+        """Test the graph node and the code summary come from the same symbol record"""
+        go_code = (
+            'package server\n\n'
+            'import (\n'
+            '    "fmt"\n'
+            '    web "github.com/acme/web"\n'
+            ')\n\n'
+            'type Server struct {}\n'
+            'func (s *Server) Start() {}\n'
+            'func helper() {}\n'
+        )
+        symbols = extract_symbols(go_code, ".go")
+        node = self.analyzer.analyze_file("server.go", go_code)
+
+        self.assertEqual(node.imports, ["fmt", "github.com/acme/web"])
+        self.assertEqual(node.imports, symbols.dependencies)
+        self.assertEqual(node.exports, ["type:Server", "function:Start"])
+        self.assertEqual(summarize_symbols(symbols),
+                         "Package: server | Imports: fmt, github.com/acme/web | "
+                         "Functions: func Start, func helper | Structs: struct Server | Go")
+        self.assertIsNone(extract_symbols("plain text", ".txt"))
+
+    def test_javascript_summary_keeps_section_order(self):
+        """Test JS lines fill summary sections as the per-language summaries always did"""
+        js_code = (
+            "import React from 'react';\n"
+            "import { api } from '@acme/api';\n"
+            "const ReactView = (props) => <div/>;\n"
+            "export class Store {}\n"
+            "class Cache {}\n"
+            "function a() {}\nfunction b() {}\nfunction c() {}\n"
+            "function MyComponent() {}\n"
+        )
+        symbols = extract_symbols(js_code, ".jsx")
+
+        # React-looking arrow functions are functions until the function list is full
+        self.assertEqual(summarize_symbols(symbols),
+                         "Imports: react, @acme/api | Components: FC:MyComponent | Classes: Cache | "
+                         "Functions: ReactView=>, a(), b(), c() | React")
+        # The graph still sees every export and linked import
+        self.assertEqual(symbols.exports, ["class:Store"])
+        self.assertEqual(symbols.dependencies, ["@acme/api"])
+
 class TestDependencyGraphGenerator(unittest.TestCase):
     """Test DependencyGraphGenerator class"""
 
@@ -266,6 +543,59 @@ class TestDependencyGraphGenerator(unittest.TestCase):
         self.assertGreater(len(graph.nodes), 0)
         self.assertGreater(len(graph.edges), 0)
 
+    def test_resolve_import_to_files(self):
+        """Test module suffix and JS name resolution, by the importing file's language"""
+        for path in ["app/__init__.py", "app/utils/helpers.py", "app/models.py",
+                     "helpers.py", "web/button.jsx", "web/models.ts", "Models.java"]:
+            self.generator.graph.add_node(DependencyNode(path, os.path.splitext(path)[1]))
+
+        resolve = self.generator._resolve_import_to_files
+        self.assertEqual(resolve("app.utils.helpers", "main.py"), ["app/utils/helpers.py"])
+        self.assertEqual(resolve("app", "main.py"), ["app/__init__.py"])
+        self.assertEqual(resolve("utils.helpers", "app/views.py"), ["app/utils/helpers.py"])
+        self.assertEqual(resolve("helpers", "main.py"), ["app/utils/helpers.py", "helpers.py"])
+        self.assertEqual(resolve("models", "app/views.py"), ["app/models.py"])
+        self.assertEqual(resolve("models", "web/index.js"), ["web/models.ts"])
+        self.assertEqual(resolve("button", "web/index.js"), ["web/button.jsx"])
+        # Only whole dotted components match, not arbitrary string suffixes
+        self.assertEqual(resolve("myhelpers", "main.py"), [])
+        self.assertEqual(resolve("missing", "main.py"), [])
+
+    def test_python_import_extraction(self):
+        """Test multi-line, relative and conditional imports, ignoring strings and comments"""
+        content = (
+            "import os, app.config as config\n"
+            "from app.models import (\n"
+            "    User,\n"
+            "    Group,\n"
+            ")\n"
+            "from . import views\n"
+            "from ..core.db import session\n"
+            "try:\n"
+            "    import yaml\n"
+            "except ImportError:\n"
+            "    yaml = None\n"
+            "# import commented\n"
+            "DOC = '''\n"
+            "import in_string\n"
+            "'''\n"
+        )
+        self.assertEqual(extract_python_imports(content, "app/api/handlers.py"),
+                         ["app.config", "app.models", "app.api.views", "app.core.db", "yaml"])
+        self.assertEqual(extract_python_imports(content, "app/api/handlers.py", include_stdlib=True)[0], "os")
+        # Relative imports need the file's package, and cannot leave the repository
+        self.assertEqual(extract_python_imports("from .. import x\n", "top.py"), [])
+        self.assertEqual(extract_python_imports("from .sibling import x\n"), [])
+        # Relative imports inside a package named like a stdlib module are the repository's own
+        self.assertEqual(extract_python_imports("from .core import x\nimport email\n", "platform/api.py"),
+                         ["platform.core"])
+        self.assertEqual(imports_as_written(content)[:3], ["os", "app.config", "app.models"])
+
+    def test_python_import_fallback(self):
+        """Test sources the parser rejects still yield their imports"""
+        content = "import requests\nfrom app import (\n  a,\n  b)\nprint 'import nothing'\n"
+        self.assertEqual(extract_python_imports(content), ["requests", "app"])
+
     def test_serialize_graph(self):
         """Test graph serialization"""
         # Create a simple graph
@@ -280,6 +610,134 @@ class TestDependencyGraphGenerator(unittest.TestCase):
         self.assertIn("edges", data)
         self.assertIn("metadata", data)
 
+    def test_parallel_analysis_matches_serial(self):
+        """Test process pool analysis yields the same graph, in the same order, as serial"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files = []
+            for i in range(40):
+                path = os.path.join(temp_dir, f"mod{i}.py")
+                with open(path, "w") as f:
+                    f.write(f"import mod{(i + 1) % 40}\nimport mod{(i * 7) % 40}\n\ndef func{i}():\n    pass\n")
+                files.append({"name": f"mod{i}.py", "path": path, "metadata": {"index": i}})
+            schema = {"taxonomy": [{"folder": "./", "files": files}]}
+
+            serial = DependencyGraphGenerator()
+            serial.generate_from_schema(schema)
+            parallel = DependencyGraphGenerator()
+            with patch('dependency_graph.logger') as mock_logger:
+                parallel.generate_from_schema(schema, workers=2)
+            mock_logger.warning.assert_not_called()
+
+        self.assertEqual([asdict(n) for n in parallel.graph.nodes.values()],
+                         [asdict(n) for n in serial.graph.nodes.values()])
+        self.assertEqual([asdict(e) for e in parallel.graph.edges], [asdict(e) for e in serial.graph.edges])
+        self.assertEqual(len(serial.graph.edges), 80)
+
+    def test_serialize_compact_graph(self):
+        """Test a compact graph serializes like the dataclass graph"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "utils.py"), "w") as f:
+                f.write("def helper():\n    pass\n")
+            with open(os.path.join(temp_dir, "main.py"), "w") as f:
+                f.write("import utils\n")
+            schema = {"taxonomy": [{"folder": "./", "files": [
+                {"name": name, "path": os.path.join(temp_dir, name), "metadata": {"type": ".py"}}
+                for name in ("main.py", "utils.py")]}]}
+
+            plain = DependencyGraphGenerator()
+            plain.generate_from_schema(schema)
+            compact = DependencyGraphGenerator()
+            graph = compact.generate_from_schema(schema, compact=True)
+
+        self.assertIsInstance(graph, CompactDependencyGraph)
+        plain_data = json.loads(plain.serialize_graph())
+        compact_data = json.loads(compact.serialize_graph())
+        self.assertEqual(compact_data["nodes"], plain_data["nodes"])
+        self.assertEqual(compact_data["edges"], plain_data["edges"])
+        self.assertEqual(len(compact_data["edges"]), 1)
+
+    def test_update_matches_full_rebuild(self):
+        """Test an incremental update of a saved graph yields the graph a full rebuild gives"""
+        def schema_for(records):
+            return {"taxonomy": [{"folder": "./", "files": [
+                {"name": os.path.basename(path), "path": path, "metadata": {"type": ".py"}} for path in records]}]}
+
+        def edge_set(graph):
+            return {(e.source_file, e.target_file, tuple(sorted(e.imported_items))) for e in graph.edges}
+
+        records = {
+            "app/main.py": {"imports": ["app.models", "app.cache"], "exports": []},
+            "app/models.py": {"imports": ["app.db"], "exports": []},
+            "app/db.py": {"imports": [], "exports": []},
+            "app/views.py": {"imports": ["models", "db"], "exports": []},
+            "web/index.js": {"imports": ["button"], "exports": []},
+        }
+        original = DependencyGraphGenerator()
+        original.generate_from_schema(schema_for(records), file_records=records)
+
+        # Change an import, add files that existing imports now resolve to, remove a target
+        records["app/models.py"] = {"imports": ["app.views"], "exports": []}
+        records["app/cache.py"] = {"imports": ["app.db"], "exports": []}
+        records["web/button.jsx"] = {"imports": [], "exports": []}
+        del records["app/db.py"]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            graph_path = os.path.join(temp_dir, "dependency-graph.json")
+            snapshot_path = os.path.join(temp_dir, "dependency-graph.snapshot")
+            original.save_graph(graph_path)
+            original.save_graph(snapshot_path, snapshot=True)
+            from_snapshot = DependencyGraphGenerator()
+            self.assertEqual(edge_set(from_snapshot.load_graph(snapshot_path)), edge_set(original.graph))
+            self.assertIsInstance(from_snapshot.load_graph(snapshot_path, compact=True), CompactDependencyGraph)
+            updated = DependencyGraphGenerator()
+            updated.load_graph(graph_path)
+
+        with patch('dependency_graph._read_source', side_effect=AssertionError("re-read")):
+            graph = updated.update(["app/models.py", "app/cache.py", "web/button.jsx"], ["app/db.py"],
+                                   file_records=records)
+        rebuilt = DependencyGraphGenerator()
+        rebuilt.generate_from_schema(schema_for(records), file_records=records)
+
+        self.assertEqual(set(graph.nodes), set(rebuilt.graph.nodes))
+        self.assertEqual(edge_set(graph), edge_set(rebuilt.graph))
+        self.assertIn(("web/index.js", "web/button.jsx", ("button",)), edge_set(graph))
+        self.assertEqual(graph.get_dependents("app/db.py"), [])
+        self.assertEqual(graph.detect_cycles(), [["app/models.py", "app/views.py"]])
+
+    def test_serialize_graph_keeps_most_important_files(self):
+        """Test an oversized graph is pruned to the files most imported, within the size limit"""
+        graph = self.generator.graph
+        for i in range(200):
+            graph.add_node(DependencyNode(f"pkg/mod{i}.py", ".py", metadata={"summary": "x" * 40}))
+        for i in range(1, 200):
+            graph.add_edge(DependencyEdge(f"pkg/mod{i}.py", "pkg/mod0.py", "import", ["mod0"]))
+            graph.add_edge(DependencyEdge(f"pkg/mod{i}.py", f"pkg/mod{i % 5 + 1}.py", "import"))
+
+        json_str = self.generator.serialize_graph(max_size_kb=4)
+        self.assertLessEqual(len(json_str.encode("utf-8")), 4 * 1024)
+        data = json.loads(json_str)
+        kept = [node["file_path"] for node in data["nodes"]]
+        self.assertEqual(kept[0], "pkg/mod0.py")
+        self.assertEqual(set(kept[1:6]), {f"pkg/mod{i}.py" for i in range(1, 6)})
+        self.assertTrue(all(e["source_file"] in kept and e["target_file"] in kept for e in data["edges"]))
+        kept_set = set(kept)
+        self.assertEqual(len(data["edges"]), sum(1 for e in graph.edges
+                                                 if e.source_file in kept_set and e.target_file in kept_set))
+        self.assertTrue(data["metadata"]["truncated"])
+        self.assertEqual(data["metadata"]["serialized_nodes"], len(kept))
+        self.assertEqual(data["metadata"]["total_nodes"], 200)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            arrows_path = os.path.join(temp_dir, "arrows.json")
+            self.generator.export_to_arrows_app(arrows_path, max_size_kb=4)
+            self.assertLessEqual(os.path.getsize(arrows_path), 4 * 1024)
+            with open(arrows_path, encoding="utf-8") as f:
+                arrows = json.load(f)
+        self.assertEqual(arrows["nodes"][0]["properties"]["file_path"], "pkg/mod0.py")
+        node_ids = {node["id"] for node in arrows["nodes"]}
+        self.assertTrue(all(r["startNodeId"] in node_ids and r["endNodeId"] in node_ids
+                            for r in arrows["relationships"]))
+
     def test_serialize_graph_size_constraint(self):
         """Test graph serialization with size constraints"""
         # Create many nodes to test size limits
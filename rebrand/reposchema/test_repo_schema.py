@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+Test suite for repo-schema.py
+
+Tests file scanning, metadata extraction and output generation.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+import importlib.util
+import contextlib
+import io
+import shutil
+import subprocess
+import sys
+from unittest import mock
+
+from utils.file_buffer import MMAP_THRESHOLD, open_file_buffer, decode_text
+from utils.file_manifest import FileManifest, compute_content_hash
+from utils.git_source import list_git_files
+from utils.ignore_matcher import IgnoreMatcher
+
+# repo-schema.py is not importable by name, so load it from its file path
+_spec = importlib.util.spec_from_file_location(
+    "repo_schema", os.path.join(os.path.dirname(os.path.abspath(__file__)), "repo-schema.py"))
+repo_schema = importlib.util.module_from_spec(_spec)
+# Registered so process pool workers can unpickle references to its functions
+sys.modules["repo_schema"] = repo_schema
+_spec.loader.exec_module(repo_schema)
+
+def create_sample_repo(base_dir):
+    """Create a small repository tree used by the scanning tests"""
+    files = {
+        "main.py": "import os\nfrom utils import helper\n\ndef main():\n    helper()\n",
+        "utils.py": "def helper():\n    pass\n\nclass Utility:\n    pass\n",
+        "README.md": "# Sample\n\n## Usage\n",
+        "config.json": '{"name": "sample", "debug": true}',
+        "src/app.js": "import React from 'react';\nexport function App() {}\n",
+        "src/lib/core.go": "package core\n\nfunc Run() {}\n",
+        "src/lib/empty.txt": "",
+        "node_modules/pkg/index.js": "module.exports = {};\n",
+        "image.png": "not really a png",
+    }
+    for rel_path, content in files.items():
+        full_path = os.path.join(base_dir, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+def scan(base_dir, **kwargs):
+    """Run generate_repo_schema with stdout suppressed"""
+    spec = repo_schema.load_gitignore_patterns(base_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return repo_schema.generate_repo_schema(base_dir, spec, **kwargs)
+
+class TestGenerateRepoSchema(unittest.TestCase):
+    """Test repository scanning"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = self.temp_dir.name
+        create_sample_repo(self.base_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_ignored_files_are_skipped(self):
+        """Test that .repoignore patterns exclude files"""
+        schema = scan(self.base_dir)
+        paths = [f["path"] for entry in schema["taxonomy"] for f in entry["files"]]
+
+        self.assertIn("main.py", paths)
+        self.assertNotIn("image.png", paths)
+        self.assertFalse(any(p.startswith("node_modules") for p in paths))
+
+    def test_parallel_matches_serial(self):
+        """Test that worker pools produce byte-identical JSON to a serial run"""
+        serial = json.dumps(scan(self.base_dir), indent=2)
+
+        for worker_type in ("process", "thread"):
+            # A failing pool falls back to serial extraction and logs an error; that must not happen here
+            with mock.patch.object(repo_schema.logging, "error") as log_error:
+                parallel = json.dumps(scan(self.base_dir, workers=3, worker_type=worker_type), indent=2)
+            log_error.assert_not_called()
+            self.assertEqual(serial, parallel, f"{worker_type} pool output differs from serial")
+
+    def test_markdown_follows_taxonomy_order(self):
+        """Test that the markdown tree lists folders in taxonomy order, nested by depth"""
+        for rel_path in ("src/pkg/mod.py", "src-extra/tool.py"):
+            os.makedirs(os.path.join(self.base_dir, os.path.dirname(rel_path)), exist_ok=True)
+            with open(os.path.join(self.base_dir, rel_path), "w", encoding="utf-8") as f:
+                f.write("x = 1\n")
+
+        schema = scan(self.base_dir)
+        markdown = repo_schema.generate_markdown(schema, self.base_dir)
+        folder_lines = [line for line in markdown.splitlines() if "📁" in line]
+
+        self.assertEqual(folder_lines, ["📁 ./", "    📁 src", "        📁 pkg", "    📁 src-extra"])
+        self.assertEqual(markdown.count("📄 mod.py"), 1)
+        self.assertTrue(markdown.endswith("\n```\n"))
+
+    def test_walk_reuses_dir_entry_stat(self):
+        """Test that the walk stats each file once via DirEntry and never through os.stat"""
+        expected = json.dumps(scan(self.base_dir), indent=2)
+        spec = repo_schema.load_gitignore_patterns(self.base_dir)
+        with mock.patch.object(repo_schema.os, "stat", side_effect=AssertionError("os.stat called")), \
+                mock.patch.object(repo_schema.os.path, "getsize", side_effect=AssertionError("getsize called")), \
+                contextlib.redirect_stdout(io.StringIO()):
+            schema = repo_schema.generate_repo_schema(self.base_dir, spec)
+        self.assertEqual(json.dumps(schema, indent=2), expected)
+
+    def test_nested_gitignore_is_scoped_to_its_directory(self):
+        """Test that a nested .gitignore applies only below its own directory"""
+        files = {
+            "pkg/.gitignore": "artifacts/\n*.gen.py\n!keep.gen.py\n/local.py\n",
+            "pkg/artifacts/bundle.js": "x",
+            "pkg/models.gen.py": "x = 1\n",
+            "pkg/keep.gen.py": "x = 1\n",
+            "pkg/local.py": "x = 1\n",
+            "pkg/sub/local.py": "x = 1\n",
+            "other/models.gen.py": "x = 1\n",
+            "other/artifacts/bundle.js": "x",
+        }
+        for rel_path, content in files.items():
+            full_path = os.path.join(self.base_dir, rel_path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+        schema = scan(self.base_dir)
+        paths = {f["path"] for entry in schema["taxonomy"] for f in entry["files"]}
+
+        self.assertNotIn("pkg/artifacts/bundle.js", paths)
+        self.assertNotIn("pkg/models.gen.py", paths)
+        self.assertNotIn("pkg/local.py", paths)
+        self.assertIn("pkg/keep.gen.py", paths)
+        self.assertIn("pkg/sub/local.py", paths)
+        self.assertIn("other/models.gen.py", paths)
+        self.assertIn("other/artifacts/bundle.js", paths)
+
+    def test_nested_negation_cannot_override_repoignore(self):
+        """Test that a nested .gitignore re-includes only what the root .gitignore excluded"""
+        files = {
+            ".gitignore": "*.scratch\n",
+            "sub/.gitignore": "!*.png\n!.env\n!*.scratch\n",
+            "sub/a.png": "not really a png",
+            "sub/.env": "SECRET=1\n",
+            "sub/notes.scratch": "x",
+        }
+        for rel_path, content in files.items():
+            full_path = os.path.join(self.base_dir, rel_path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+        # main() passes the auto-detected .gitignore as the custom ignore file as well
+        spec = repo_schema.load_gitignore_patterns(self.base_dir, os.path.join(self.base_dir, ".gitignore"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            schema = repo_schema.generate_repo_schema(self.base_dir, spec)
+        paths = {f["path"] for entry in schema["taxonomy"] for f in entry["files"]}
+
+        self.assertNotIn("sub/a.png", paths)
+        self.assertNotIn("sub/.env", paths)
+        self.assertIn("sub/notes.scratch", paths)
+
+class TestStreamingOutput(unittest.TestCase):
+    """Test streaming schema output"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = os.path.join(self.temp_dir.name, "repo")
+        os.makedirs(self.base_dir)
+        create_sample_repo(self.base_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_generation(self, name, **kwargs):
+        output_dir = os.path.join(self.temp_dir.name, name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = repo_schema.run_schema_generation(
+                self.base_dir, output_dir, generate_dependency_graph_flag=False, incremental=False, **kwargs)
+        self.assertTrue(results["success"], results["message"])
+        return results
+
+    def test_streamed_json_matches_json_dump(self):
+        """Test that streaming writes the same JSON and markdown as a normal run"""
+        normal = self.run_generation("normal")
+        for workers in (1, 2):
+            streamed = self.run_generation(f"streamed{workers}", stream=True, workers=workers, worker_type="thread")
+
+            with open(normal["json_output_path"], encoding="utf-8") as a, \
+                    open(streamed["json_output_path"], encoding="utf-8") as b:
+                self.assertEqual(a.read(), b.read())
+            with open(normal["md_output_path"], encoding="utf-8") as a, \
+                    open(streamed["md_output_path"], encoding="utf-8") as b:
+                self.assertEqual(a.read(), b.read())
+            self.assertEqual(streamed["files_processed"], normal["files_processed"])
+
+    @unittest.skipUnless(repo_schema.DEPENDENCY_GRAPH_AVAILABLE, "dependency graph module not available")
+    def test_streamed_manifest_and_graph_match_normal_run(self):
+        """Test that streaming spools the same manifest and builds the same graph edges"""
+        def outputs(name, **kwargs):
+            output_dir = os.path.join(self.temp_dir.name, name)
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = repo_schema.run_schema_generation(self.base_dir, output_dir, **kwargs)
+            self.assertTrue(results["success"], results["message"])
+            with open(results["manifest_path"], encoding="utf-8") as f:
+                manifest = sorted(f)
+            with open(results["dependency_graph_path"], encoding="utf-8") as f:
+                graph = json.load(f)
+            return manifest, graph
+
+        normal_manifest, normal_graph = outputs("normal")
+        for _ in range(2):  # a fresh run, then an incremental one reusing the spooled manifest
+            manifest, graph = outputs("streamed", stream=True)
+            self.assertEqual(manifest, normal_manifest)
+            self.assertEqual(graph["edges"], normal_graph["edges"])
+            self.assertEqual([node["metadata"] for node in graph["nodes"]], [{}] * len(normal_graph["nodes"]))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "streamed", "repo-schema.manifest.tmp")))
+
+    def test_stream_with_git_source_warns(self):
+        """Test that --stream with the git source falls back to an in-memory schema and says so"""
+        if shutil.which("git") is None:
+            self.skipTest("git not available")
+        subprocess.run(["git", "init", "-q", self.base_dir], check=True)
+        with mock.patch.object(repo_schema.logging, "warning") as log_warning:
+            results = self.run_generation("git", stream=True, source="git")
+        self.assertGreater(results["files_processed"], 0)
+        self.assertTrue(any("Streaming requested" in call.args[0] for call in log_warning.call_args_list))
+
+    def test_write_schema_json_empty_taxonomy(self):
+        """Test that an empty taxonomy still produces json.dump's output"""
+        schema = repo_schema.new_schema(self.base_dir)
+        output_path = os.path.join(self.temp_dir.name, "empty.json")
+        repo_schema.write_schema_json(output_path, schema, iter([]))
+        with open(output_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(schema, indent=2))
+
+class TestDependencyStage(unittest.TestCase):
+    """Test that the dependency graph is built from the scan's per-file records"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = os.path.join(self.temp_dir.name, "repo")
+        os.makedirs(self.base_dir)
+        create_sample_repo(self.base_dir)
+        self.output_dir = os.path.join(self.temp_dir.name, "out")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_generation(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = repo_schema.run_schema_generation(self.base_dir, self.output_dir, **kwargs)
+        self.assertTrue(results["success"], results["message"])
+        with open(results["dependency_graph_path"], encoding="utf-8") as f:
+            graph = json.load(f)
+        return results, [(e["source_file"], e["target_file"]) for e in graph["edges"]]
+
+    @unittest.skipUnless(repo_schema.DEPENDENCY_GRAPH_AVAILABLE, "dependency graph module not available")
+    def test_graph_from_scan_records(self):
+        """Test edges resolve outside base_dir's CWD and repeat runs reuse cached imports"""
+        graph_module = sys.modules[repo_schema.DependencyGraphGenerator.__module__]
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            with mock.patch.object(graph_module, "_read_source", side_effect=AssertionError("re-read")):
+                for workers in (1, 2):
+                    results, edges = self.run_generation(workers=workers, worker_type="thread",
+                                                         incremental=False)
+                    self.assertEqual(edges, [("main.py", "utils.py")])
+
+                self.run_generation()
+                results, edges = self.run_generation()
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(results["files_extracted"], 0)
+        self.assertEqual(edges, [("main.py", "utils.py")])
+
+    @unittest.skipUnless(repo_schema.DEPENDENCY_GRAPH_AVAILABLE, "dependency graph module not available")
+    def test_relative_imports_resolve_against_repository_path(self):
+        """Test relative imports use the file's path in the repository, not on disk"""
+        package_dir = os.path.join(self.base_dir, "pkg")
+        os.makedirs(package_dir)
+        for name, content in (("__init__.py", ""), ("models.py", "class Model:\n    pass\n"),
+                              ("api.py", "from . import models\nfrom .models import Model\n")):
+            with open(os.path.join(package_dir, name), "w", encoding="utf-8") as f:
+                f.write(content)
+
+        for workers in (1, 2):
+            _, edges = self.run_generation(workers=workers, worker_type="thread", incremental=False)
+            self.assertIn(("pkg/api.py", "pkg/models.py"), edges)
+
+    @unittest.skipUnless(repo_schema.DEPENDENCY_GRAPH_AVAILABLE, "dependency graph module not available")
+    def test_rerun_updates_previous_graph(self):
+        """Test a rerun applies added, modified and removed files to the previous graph"""
+        results, _ = self.run_generation()
+        self.assertNotIn("dependency_graph_updated", results)
+
+        with open(os.path.join(self.base_dir, "extra.py"), "w", encoding="utf-8") as f:
+            f.write("import main\n")
+        with open(os.path.join(self.base_dir, "utils.py"), "w", encoding="utf-8") as f:
+            f.write("import extra\n")
+        results, edges = self.run_generation()
+        self.assertTrue(results["dependency_graph_updated"])
+        self.assertEqual(sorted(edges), [("extra.py", "main.py"), ("main.py", "utils.py"), ("utils.py", "extra.py")])
+
+        os.remove(os.path.join(self.base_dir, "extra.py"))
+        results, edges = self.run_generation()
+        self.assertTrue(results["dependency_graph_updated"])
+        self.assertEqual(edges, [("main.py", "utils.py")])
+
+class TestIgnoreMatcher(unittest.TestCase):
+    """Test the compiled ignore matcher"""
+
+    PATTERNS = [
+        "node_modules/", "*.pyc", "*.log", "!keep.log", "/build", "docs/**/*.tmp",
+        "upstream/*", "vendor", "*.min.js", "!src/app.min.js", "a?c.txt", "[Tt]humbs.db",
+        "**/b", "!b/", "gen/**", "[Cc]ache/",
+    ]
+    PATHS = [
+        "main.py", "cache.pyc", "src/cache.pyc", "debug.log", "keep.log", "src/keep.log",
+        "build/out.js", "src/build/out.js", "docs/a/b/c.tmp", "docs/c.txt", "upstream/x.py",
+        "upstream/a/b.py", "vendor/lib.js", "src/vendor/lib.js", "app.min.js", "src/app.min.js",
+        "abc.txt", "src/abc.txt", "Thumbs.db", "thumbs.db", "node_modules/pkg/index.js",
+        "doc/b/keep.log", "doc/b/x.py", "b", "src/b", "gen/x.py", "gen/sub/y.py", "Cache/z.py", "src/cache/z.py",
+    ]
+
+    def test_matches_pathspec(self):
+        """Test that file decisions agree with pathspec's GitIgnoreSpec for the same patterns"""
+        from pathspec import GitIgnoreSpec
+        reference = GitIgnoreSpec.from_lines(self.PATTERNS)
+        matcher = IgnoreMatcher(self.PATTERNS)
+
+        for path in self.PATHS:
+            self.assertEqual(matcher.match_file(path), reference.match_file(path), path)
+
+    def test_directory_patterns(self):
+        """Test that directory-only patterns match directories and prune their contents"""
+        matcher = IgnoreMatcher(["node_modules/", "logs/", "!logs/keep.txt"])
+
+        self.assertTrue(matcher.match("node_modules", is_dir=True))
+        self.assertTrue(matcher.match("src/node_modules", is_dir=True))
+        self.assertFalse(matcher.match("node_modules"))
+        # As in git, files below an ignored directory cannot be re-included
+        self.assertTrue(matcher.match("logs/keep.txt"))
+
+    def test_child_matcher_overrides_parent(self):
+        """Test that a stacked matcher scopes its patterns and falls back to its parent"""
+        root = IgnoreMatcher(["*.log", "tmp/"])
+        child = root.child("pkg", ["!debug.log", "/dist", "cache/"])
+
+        self.assertFalse(child.match("pkg/debug.log"))
+        self.assertTrue(child.match("pkg/other.log"))
+        self.assertTrue(child.match("pkg/dist", is_dir=True))
+        self.assertFalse(child.match("pkg/sub/dist", is_dir=True))
+        self.assertTrue(child.match("pkg/sub/cache/data.bin"))
+        self.assertTrue(child.match("pkg/tmp/data.bin"))
+
+    def test_outer_matcher_is_not_overridden(self):
+        """Test that stacked negations cannot re-include what the outer matcher ignores"""
+        root = IgnoreMatcher(["*.log"], outer=IgnoreMatcher(["*.png", "build/"]))
+        child = root.child("pkg", ["!*.png", "!build/", "!*.log"])
+
+        self.assertTrue(child.match("pkg/a.png"))
+        self.assertTrue(child.match("pkg/build", is_dir=True))
+        self.assertTrue(child.match("pkg/build/out.js"))
+        self.assertFalse(child.match("pkg/debug.log"))
+        self.assertTrue(root.match("debug.log"))
+
+    def test_git_directory_is_ignored(self):
+        """Test that .git is skipped even without patterns"""
+        self.assertTrue(repo_schema.is_ignored("/repo/.git", "/repo", None, is_dir=True))
+        self.assertTrue(repo_schema.is_ignored("/repo/.git/HEAD", "/repo", IgnoreMatcher([])))
+        self.assertFalse(repo_schema.is_ignored("/repo/.gitignore", "/repo", IgnoreMatcher([])))
+
+class TestFileBuffer(unittest.TestCase):
+    """Test the single-read file pipeline"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.base_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_decode_matches_text_mode_read(self):
+        """Test that decoding a buffer matches a text-mode read"""
+        path = self.write("mixed.txt", b"one\r\ntwo\rthree\n\xff\xfefour")
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            expected = f.read()
+        with open_file_buffer(path) as buffer:
+            self.assertEqual(decode_text(buffer), expected)
+
+    def test_large_files_are_mapped(self):
+        """Test that files above the threshold are mmap'd and hash like a streamed read"""
+        path = self.write("big.py", b"x = 1\n" * (MMAP_THRESHOLD // 6 + 1))
+        with open_file_buffer(path) as buffer:
+            self.assertNotIsInstance(buffer, bytes)
+
+        metadata, content_hash, _ = repo_schema.extract_file_record(path, with_hash=True)
+        self.assertEqual(content_hash, compute_content_hash(path))
+        self.assertEqual(metadata, repo_schema.get_file_metadata(path))
+
+    def test_file_is_read_once(self):
+        """Test that summary, imports/exports and hash come from a single open of the file"""
+        path = self.write("main.py", b"import os\nimport helpers\n\ndef main():\n    pass\n")
+        real_open = open
+        opened = []
+
+        def counting_open(file, *args, **kwargs):
+            if file == path:
+                opened.append(file)
+            return real_open(file, *args, **kwargs)
+
+        with mock.patch("builtins.open", side_effect=counting_open):
+            metadata, content_hash, dependencies = repo_schema.extract_file_record(
+                path, with_hash=True, with_dependencies=True)
+
+        self.assertEqual(len(opened), 1)
+        self.assertEqual(content_hash, compute_content_hash(path))
+        self.assertIn("Imports: os", metadata["code_summary"])
+        self.assertEqual(dependencies, {"imports": ["helpers"], "exports": ["function:main"]})
+
+class TestIncrementalManifest(unittest.TestCase):
+    """Test manifest-based incremental re-scans"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = self.temp_dir.name
+        create_sample_repo(self.base_dir)
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.output_dir.name, "repo-schema.manifest")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        self.output_dir.cleanup()
+
+    def rescan(self):
+        manifest = FileManifest.load(self.manifest_path, self.base_dir)
+        schema = scan(self.base_dir, manifest=manifest)
+        manifest.save(self.manifest_path)
+        return schema, manifest
+
+    def test_unchanged_tree_reuses_everything(self):
+        """Test that a second scan of an unchanged tree extracts nothing"""
+        first, manifest = self.rescan()
+        self.assertEqual(manifest.stats["reused"], 0)
+
+        second, manifest = self.rescan()
+        self.assertEqual(manifest.stats["extracted"], 0)
+        self.assertEqual(json.dumps(first, indent=2), json.dumps(second, indent=2))
+
+    def test_changed_and_removed_files(self):
+        """Test that only modified files are re-extracted and removed files are dropped"""
+        self.rescan()
+
+        with open(os.path.join(self.base_dir, "utils.py"), "a", encoding="utf-8") as f:
+            f.write("\ndef extra(a, b):\n    pass\n")
+        os.remove(os.path.join(self.base_dir, "README.md"))
+
+        schema, manifest = self.rescan()
+        self.assertEqual(manifest.stats["extracted"], 1)
+        self.assertEqual(manifest.removed_paths(), ["README.md"])
+
+        utils_entry = next(f for e in schema["taxonomy"] for f in e["files"] if f["path"] == "utils.py")
+        self.assertIn("extra(2p)", utils_entry["metadata"]["code_summary"])
+
+    def test_touched_file_is_rehashed_not_extracted(self):
+        """Test that an mtime-only change is detected via the content hash"""
+        self.rescan()
+        utils_path = os.path.join(self.base_dir, "utils.py")
+        stat_result = os.stat(utils_path)
+        os.utime(utils_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+
+        _, manifest = self.rescan()
+        self.assertEqual(manifest.stats["extracted"], 0)
+        self.assertEqual(manifest.stats["rehashed"], 1)
+
+    def test_content_hash_matches_git_blob(self):
+        """Test that content hashes use the git blob SHA-1 format"""
+        path = os.path.join(self.base_dir, "blob.txt")
+        with open(path, "wb") as f:
+            f.write(b"hello\n")
+        # `printf 'hello\n' | git hash-object --stdin`
+        self.assertEqual(compute_content_hash(path), "ce013625030ba8dba906f756967f9e9ca394464a")
+
+@unittest.skipUnless(shutil.which("git"), "git not installed")
+class TestGitSource(unittest.TestCase):
+    """Test building the file list from the git index"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = self.temp_dir.name
+        create_sample_repo(self.base_dir)
+        with open(os.path.join(self.base_dir, ".gitignore"), "w") as f:
+            f.write("*.scratch\n")
+        with open(os.path.join(self.base_dir, "notes.scratch"), "w") as f:
+            f.write("ignored by git\n")
+
+        def git(*args):
+            subprocess.run(["git", "-C", self.base_dir, "-c", "user.name=test", "-c", "user.email=test@example.com"]
+                           + list(args), check=True, capture_output=True)
+        git("init", "-q")
+        git("add", "main.py", "utils.py", "src", ".gitignore")
+        git("commit", "-q", "-m", "initial")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_list_git_files(self):
+        """Test tracked files carry blob SHAs and untracked ones do not"""
+        with open(os.path.join(self.base_dir, "main.py"), "a") as f:
+            f.write("# modified\n")
+
+        git_files = list_git_files(self.base_dir)
+
+        self.assertEqual(git_files["utils.py"], compute_content_hash(os.path.join(self.base_dir, "utils.py")))
+        self.assertIsNone(git_files["main.py"])  # modified in the working tree
+        self.assertIsNone(git_files["README.md"])  # untracked
+        self.assertNotIn("notes.scratch", git_files)  # git-ignored
+
+    def test_git_source_matches_walk(self):
+        """Test the git source yields the same files and folders as a walk"""
+        # A nested .gitignore re-including a root .gitignore exclusion, and one trying to
+        # re-include .repoignore exclusions (*.png, .env) that both sources must keep out
+        files = {
+            "pkg/.gitignore": "!keep.scratch\n!*.png\n!.env\n*.gen.py\n",
+            "pkg/keep.scratch": "kept\n",
+            "pkg/drop.scratch": "dropped\n",
+            "pkg/models.gen.py": "x = 1\n",
+            "pkg/mod.py": "x = 1\n",
+            "pkg/.env": "SECRET=1\n",
+            "pkg/assets/logo.png": "not really a png",
+        }
+        for rel_path, content in files.items():
+            full_path = os.path.join(self.base_dir, rel_path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+        spec = repo_schema.load_gitignore_patterns(self.base_dir, os.path.join(self.base_dir, ".gitignore"),
+                                                   include_gitignore=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            git_schema = repo_schema.generate_repo_schema_from_git(self.base_dir, spec, list_git_files(self.base_dir))
+        walk_schema = scan(self.base_dir)
+
+        def files(schema):
+            return {f["path"]: f["metadata"] for e in schema["taxonomy"] for f in e["files"]}
+        def folders(schema):
+            return [(e["folder"], e["subfolders"]) for e in schema["taxonomy"]]
+        self.assertEqual(files(git_schema), files(walk_schema))
+        self.assertEqual(folders(git_schema), folders(walk_schema))
+        self.assertIn("pkg/keep.scratch", files(git_schema))
+        self.assertNotIn("pkg/assets/logo.png", files(git_schema))
+        self.assertNotIn("pkg/.env", files(git_schema))
+        root = git_schema["taxonomy"][0]
+        self.assertEqual(root["folder"], "./")
+        self.assertEqual(root["subfolders"], ["pkg", "src"])
+
+@unittest.skipUnless(repo_schema.QDRANT_AVAILABLE, "qdrant-client not installed")
+class TestQdrantBatchStorage(unittest.TestCase):
+    """Test batched knowledge graph storage against qdrant-client's in-process mode"""
+
+    def setUp(self):
+        try:
+            self.manager = repo_schema.QdrantManager(location=":memory:")
+        except ImportError as e:
+            self.skipTest(str(e))
+        self.collection_name = "cir_test_batch"
+        self.manager.create_collection(self.collection_name, vector_size=4)
+
+    def test_batches_report_failed_points(self):
+        """Test points are stored in batches and a bad point does not abort its batch"""
+        points = [{"file_path": f"src/mod{i}.py", "vector": [0.1, 0.2, 0.3, float(i)],
+                   "knowledge_graph": {"fileType": ".py"}} for i in range(10)]
+        points[3]["vector"] = [0.1]  # wrong dimension
+        del points[7]["knowledge_graph"]
+
+        report = self.manager.store_knowledge_graph_batch(self.collection_name, iter(points),
+                                                          batch_size=4, parallel=2)
+
+        self.assertEqual(report["stored"], 8)
+        self.assertEqual(sorted(failure["file_path"] for failure in report["failed"]),
+                         ["src/mod3.py", "src/mod7.py"])
+        self.assertEqual(self.manager.client.count(self.collection_name).count, 8)
+
+    def test_stored_hashes_skip_unchanged_points(self):
+        """Test points whose stored content hash matches are not sent again"""
+        points = [{"file_path": f"src/mod{i}.py", "vector": [0.1, 0.2, 0.3, 0.4],
+                   "knowledge_graph": {"fileType": ".py", "version": 1}} for i in range(5)]
+        self.manager.store_knowledge_graph_batch(self.collection_name, points, wait=True)
+
+        existing = self.manager.stored_content_hashes(self.collection_name, page_size=2)
+        self.assertEqual(sorted(existing), [f"src/mod{i}.py" for i in range(5)])
+
+        points[1]["knowledge_graph"]["version"] = 2
+        report = self.manager.store_knowledge_graph_batch(self.collection_name, points, existing=existing)
+        self.assertEqual((report["stored"], report["skipped"]), (1, 4))
+
+        self.assertEqual(self.manager.delete_knowledge_graphs(self.collection_name, ["src/mod4.py"], wait=True), 1)
+        self.assertNotIn("src/mod4.py", self.manager.stored_content_hashes(self.collection_name))
+
+    def test_rerun_syncs_only_changes(self):
+        """Test a re-run of --store-qdrant upserts nothing for an unchanged tree and deletes removed files"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = os.path.join(temp_dir, "repo")
+            create_sample_repo(base_dir)
+
+            def run():
+                with mock.patch.object(repo_schema, "QdrantManager", return_value=self.manager), \
+                        contextlib.redirect_stdout(io.StringIO()):
+                    results = repo_schema.run_schema_generation(
+                        base_dir, os.path.join(temp_dir, "out"), store_qdrant=True,
+                        generate_dependency_graph_flag=False)
+                self.assertTrue(results["success"], results["message"])
+                return results
+
+            first = run()
+            second = run()
+            os.remove(os.path.join(base_dir, "README.md"))
+            third = run()
+
+        self.assertGreater(first["qdrant_stored_count"], 0)
+        self.assertEqual(second["qdrant_stored_count"], 0)
+        self.assertEqual(second["qdrant_unchanged_count"], first["qdrant_stored_count"])
+        self.assertEqual(third["qdrant_deleted_count"], 1)
+        self.assertEqual(self.manager.client.count(first["qdrant_collection"]).count,
+                         first["qdrant_stored_count"] - 1)
+
+    def test_interrupted_scan_keeps_unseen_points(self):
+        """Test a partial scan does not delete the points of files it never reached"""
+        real_scan_tree = repo_schema.scan_tree
+
+        def interrupted_scan_tree(base_dir):
+            tree = real_scan_tree(base_dir)
+            yield next(tree)  # only the top-level directory
+            raise KeyboardInterrupt
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = os.path.join(temp_dir, "repo")
+            create_sample_repo(base_dir)
+
+            def run():
+                with mock.patch.object(repo_schema, "QdrantManager", return_value=self.manager), \
+                        contextlib.redirect_stdout(io.StringIO()):
+                    return repo_schema.run_schema_generation(
+                        base_dir, os.path.join(temp_dir, "out"), store_qdrant=True,
+                        generate_dependency_graph_flag=False)
+
+            first = run()
+            count = self.manager.client.count(first["qdrant_collection"]).count
+            with mock.patch.object(repo_schema, "scan_tree", interrupted_scan_tree):
+                partial = run()
+            with open(os.path.join(temp_dir, "out", "repo-schema.json"), encoding="utf-8") as f:
+                partial_schema = json.load(f)
+
+        self.assertEqual(partial["qdrant_deleted_count"], 0)
+        self.assertEqual(self.manager.client.count(first["qdrant_collection"]).count, count)
+        self.assertTrue(partial_schema["interrupted"])
+        self.assertNotIn("src/app.js", {f["path"] for e in partial_schema["taxonomy"] for f in e["files"]})
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,794 @@
+#!/usr/bin/env python3
+"""
+Compact Dependency Graph for Repository Schema
+
+An immutable, integer-indexed form of the dependency graph for very large repositories.
+File paths are interned to integer IDs and edges are kept in CSR-style array('i') buffers
+(an offsets array per node plus a flat targets array), so a graph costs a few bytes per
+edge instead of a dataclass instance each. Nodes and edges are exposed through small
+__slots__ views that keep the DependencyNode/DependencyEdge attribute names.
+
+The graph algorithms (strongly connected components, cycle groups, build layers, PageRank)
+run on the integer adjacency here; DependencyGraph delegates to a compact snapshot of itself.
+
+A graph can be saved as a binary snapshot: a string table plus little-endian integer arrays
+laid out so that load() memory-maps the file and uses the arrays in place. Loading costs
+one decode of the string table, and processes loading the same snapshot share its pages.
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+from collections import deque
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+# Stored in the line number buffer for edges without a line number
+NO_LINE = -1
+
+SNAPSHOT_MAGIC = b'RSGRAPH\0'
+SNAPSHOT_VERSION = 1
+# Header: magic, version, section count; then one table entry per section
+_SNAPSHOT_HEADER = struct.Struct('<8sII')
+_SNAPSHOT_SECTION = struct.Struct('<16scxxxxxxxQQ')
+# Integer arrays used in place by the loaded graph
+_ADJACENCY_SECTIONS = ('out_offsets', 'out_targets', 'out_types', 'edge_sources', 'line_numbers',
+                       'in_offsets', 'in_edges')
+
+def is_snapshot(file_path: str) -> bool:
+    """Check whether a file is a binary graph snapshot written by CompactDependencyGraph.save"""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+    except OSError:
+        return False
+
+def _little_endian(typecode: str, values) -> bytes:
+    """Bytes of an integer buffer in the snapshot's (little-endian) byte order"""
+    data = array(typecode, values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+class CompactNode:
+    """Read-only view of a node in a CompactDependencyGraph"""
+
+    __slots__ = ('_graph', '_id')
+
+    def __init__(self, graph: 'CompactDependencyGraph', node_id: int):
+        self._graph = graph
+        self._id = node_id
+
+    @property
+    def node_id(self) -> int:
+        return self._id
+
+    @property
+    def file_path(self) -> str:
+        return self._graph.paths[self._id]
+
+    @property
+    def file_type(self) -> str:
+        return self._graph.file_types[self._id]
+
+    @property
+    def imports(self) -> List[str]:
+        return list(self._graph.imports[self._id])
+
+    @property
+    def exports(self) -> List[str]:
+        return list(self._graph.exports[self._id])
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        metadata = self._graph.metadata[self._id] if self._graph.metadata is not None else None
+        return metadata if metadata is not None else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same fields as dataclasses.asdict on a DependencyNode"""
+        return {
+            'file_path': self.file_path,
+            'file_type': self.file_type,
+            'imports': self.imports,
+            'exports': self.exports,
+            'metadata': dict(self.metadata),
+        }
+
+    def __repr__(self) -> str:
+        return f"CompactNode({self.file_path!r})"
+
+class CompactEdge:
+    """Read-only view of an edge in a CompactDependencyGraph"""
+
+    __slots__ = ('_graph', '_id')
+
+    def __init__(self, graph: 'CompactDependencyGraph', edge_id: int):
+        self._graph = graph
+        self._id = edge_id
+
+    @property
+    def source_file(self) -> str:
+        return self._graph.paths[self._graph.edge_sources[self._id]]
+
+    @property
+    def target_file(self) -> str:
+        return self._graph.paths[self._graph.out_targets[self._id]]
+
+    @property
+    def dependency_type(self) -> str:
+        return self._graph.edge_types[self._graph.out_types[self._id]]
+
+    @property
+    def imported_items(self) -> List[str]:
+        return list(self._graph.imported_items[self._id])
+
+    @property
+    def line_number(self) -> Optional[int]:
+        line = self._graph.line_numbers[self._id]
+        return None if line == NO_LINE else line
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same fields as dataclasses.asdict on a DependencyEdge"""
+        return {
+            'source_file': self.source_file,
+            'target_file': self.target_file,
+            'dependency_type': self.dependency_type,
+            'imported_items': self.imported_items,
+            'line_number': self.line_number,
+        }
+
+    def __repr__(self) -> str:
+        return f"CompactEdge({self.source_file!r} -> {self.target_file!r})"
+
+class _NodeView(Mapping):
+    """file_path -> CompactNode mapping over the graph's nodes"""
+
+    __slots__ = ('_graph',)
+
+    def __init__(self, graph: 'CompactDependencyGraph'):
+        self._graph = graph
+
+    def __getitem__(self, file_path: str) -> CompactNode:
+        node_id = self._graph.path_ids.get(file_path)
+        if node_id is None or not self._graph.is_node[node_id]:
+            raise KeyError(file_path)
+        return CompactNode(self._graph, node_id)
+
+    def __iter__(self) -> Iterator[str]:
+        graph = self._graph
+        return (path for node_id, path in enumerate(graph.paths) if graph.is_node[node_id])
+
+    def __len__(self) -> int:
+        return self._graph.node_count
+
+class _EdgeView(Sequence):
+    """Sequence of CompactEdge views, grouped by source file"""
+
+    __slots__ = ('_graph',)
+
+    def __init__(self, graph: 'CompactDependencyGraph'):
+        self._graph = graph
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [CompactEdge(self._graph, i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return CompactEdge(self._graph, index)
+
+    def __len__(self) -> int:
+        return len(self._graph.out_targets)
+
+class _StringTuples(Sequence):
+    """Per-item tuples of snapshot strings, built on access from CSR offsets and string IDs"""
+
+    __slots__ = ('_strings', '_offsets', '_ids')
+
+    def __init__(self, strings: List[str], offsets, ids):
+        self._strings = strings
+        self._offsets = offsets
+        self._ids = ids
+
+    def __getitem__(self, index: int) -> Tuple[str, ...]:
+        strings = self._strings
+        return tuple(strings[i] for i in self._ids[self._offsets[index]:self._offsets[index + 1]])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+class _JSONItems(Sequence):
+    """Per-item JSON documents of a snapshot, decoded on access (None for empty items)"""
+
+    __slots__ = ('_data', '_offsets')
+
+    def __init__(self, data, offsets):
+        self._data = data
+        self._offsets = offsets
+
+    def __getitem__(self, index: int) -> Optional[Dict[str, Any]]:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return json.loads(self._data[start:end].tobytes()) if end > start else None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+class CompactDependencyGraph:
+    """Immutable dependency graph with interned paths and CSR adjacency
+
+    Vertex IDs cover the graph's nodes followed by files that only appear as edge
+    endpoints. out_offsets[v]:out_offsets[v + 1] is the range of v's outgoing edge IDs in
+    out_targets; in_offsets/in_edges index the same edge IDs by target.
+    """
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self.path_ids: Dict[str, int] = {}
+        self.is_node = bytearray()
+        self.node_count = 0
+        self.file_types: List[str] = []
+        self.imports: List[Tuple[str, ...]] = []
+        self.exports: List[Tuple[str, ...]] = []
+        self.metadata: Optional[List[Optional[Dict[str, Any]]]] = []
+
+        self.out_offsets = array('i', [0])
+        self.out_targets = array('i')
+        self.out_types = array('i')
+        self.edge_sources = array('i')
+        self.line_numbers = array('i')
+        self.imported_items: List[Tuple[str, ...]] = []
+        self.edge_types: List[str] = []
+        self.in_offsets = array('i', [0])
+        self.in_edges = array('i')
+
+        self._components: Optional[List[List[int]]] = None
+        self._condensed: Optional[Tuple[array, List[List[int]], List[List[int]]]] = None
+        self._cycle_groups: Optional[List[List[str]]] = None
+        self._layers: Optional[List[List[str]]] = None
+        # Components reachable from a component, by direction (0: dependencies, 1: dependents)
+        self._reach_memo: Tuple[Dict[int, FrozenSet[int]], Dict[int, FrozenSet[int]]] = ({}, {})
+
+    @classmethod
+    def from_graph(cls, graph, keep_metadata: bool = True) -> 'CompactDependencyGraph':
+        """Build a compact copy of a DependencyGraph"""
+        return cls.build(graph.nodes.values(), graph.edges, keep_metadata)
+
+    @classmethod
+    def build(cls, nodes: Iterable[Any], edges: Iterable[Any],
+              keep_metadata: bool = True) -> 'CompactDependencyGraph':
+        """Build a graph from node and edge objects with the DependencyNode/DependencyEdge attributes
+
+        Metadata dicts are shared with the given nodes, not copied. With keep_metadata
+        False they are dropped and every node reports empty metadata.
+        """
+        graph = cls()
+        if not keep_metadata:
+            graph.metadata = None
+
+        for node in nodes:
+            if node.file_path in graph.path_ids:
+                continue
+            graph._intern(node.file_path)
+            graph.is_node.append(1)
+            graph.node_count += 1
+            graph.file_types.append(sys.intern(node.file_type))
+            graph.imports.append(tuple(sys.intern(item) for item in node.imports))
+            graph.exports.append(tuple(node.exports))
+            if keep_metadata:
+                graph.metadata.append(node.metadata or None)
+
+        edge_list = []
+        type_ids: Dict[str, int] = {}
+        for edge in edges:
+            source = graph._intern_endpoint(edge.source_file)
+            target = graph._intern_endpoint(edge.target_file)
+            type_id = type_ids.get(edge.dependency_type)
+            if type_id is None:
+                type_id = type_ids[edge.dependency_type] = len(graph.edge_types)
+                graph.edge_types.append(sys.intern(edge.dependency_type))
+            edge_list.append((source, target, type_id, edge))
+
+        # Edge IDs are assigned grouped by source (stable, so per-file order is kept)
+        edge_list.sort(key=lambda item: item[0])
+        vertex_count = len(graph.paths)
+        out_counts = [0] * vertex_count
+        in_counts = [0] * vertex_count
+        for source, target, type_id, edge in edge_list:
+            out_counts[source] += 1
+            in_counts[target] += 1
+            graph.edge_sources.append(source)
+            graph.out_targets.append(target)
+            graph.out_types.append(type_id)
+            graph.line_numbers.append(NO_LINE if edge.line_number is None else edge.line_number)
+            graph.imported_items.append(tuple(sys.intern(item) for item in edge.imported_items))
+
+        graph.out_offsets = cls._offsets(out_counts)
+        graph.in_offsets = cls._offsets(in_counts)
+        graph.in_edges = array('i', [0]) * len(edge_list)
+        fill = graph.in_offsets[:-1]
+        for edge_id, target in enumerate(graph.out_targets):
+            graph.in_edges[fill[target]] = edge_id
+            fill[target] += 1
+
+        return graph
+
+    def save(self, snapshot_path: str) -> None:
+        """Write the graph as a binary snapshot (atomically); see load"""
+        # String table: vertex paths first, so a vertex ID is also its path's string ID
+        strings: List[str] = list(self.paths)
+        string_ids: Dict[str, int] = {}
+
+        def string_id(value: str) -> int:
+            sid = string_ids.get(value)
+            if sid is None:
+                sid = string_ids[value] = len(strings)
+                strings.append(value)
+            return sid
+
+        def string_csr(items: Sequence) -> Tuple[List[int], List[int]]:
+            offsets, ids = [0], []
+            for item in items:
+                ids.extend(string_id(value) for value in item)
+                offsets.append(len(ids))
+            return offsets, ids
+
+        sections = [(name, 'i', _little_endian('i', getattr(self, name))) for name in _ADJACENCY_SECTIONS]
+        sections.append(('is_node', 'B', bytes(self.is_node)))
+        sections.append(('file_types', 'i', _little_endian('i', (string_id(t) for t in self.file_types))))
+        sections.append(('edge_types', 'i', _little_endian('i', (string_id(t) for t in self.edge_types))))
+        for name, items in (('imports', self.imports), ('exports', self.exports), ('items', self.imported_items)):
+            offsets, ids = string_csr(items)
+            sections.append((name + '_offsets', 'i', _little_endian('i', offsets)))
+            sections.append((name, 'i', _little_endian('i', ids)))
+        if self.metadata is not None:
+            encode = json.JSONEncoder(separators=(',', ':')).encode
+            documents = [encode(metadata).encode('utf-8') if metadata else b'' for metadata in self.metadata]
+            offsets = [0]
+            for document in documents:
+                offsets.append(offsets[-1] + len(document))
+            sections.append(('metadata_offsets', 'q', _little_endian('q', offsets)))
+            sections.append(('metadata', 'B', b''.join(documents)))
+
+        # Strings are stored as one UTF-8 text with offsets in characters, so loading takes
+        # a single decode and slices it
+        text = ''.join(strings)
+        offsets = [0]
+        for value in strings:
+            offsets.append(offsets[-1] + len(value))
+        sections.append(('string_offsets', 'q', _little_endian('q', offsets)))
+        sections.append(('strings', 'B', text.encode('utf-8')))
+
+        # Sections start on 8-byte boundaries so they can be used in place as typed arrays
+        table_size = _SNAPSHOT_HEADER.size + _SNAPSHOT_SECTION.size * len(sections)
+        position = (table_size + 7) & ~7
+        entries = []
+        for name, typecode, data in sections:
+            entries.append(_SNAPSHOT_SECTION.pack(name.encode('ascii'), typecode.encode('ascii'), position, len(data)))
+            position = (position + len(data) + 7) & ~7
+
+        tmp_path = snapshot_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(sections)))
+            f.write(b''.join(entries))
+            for _, _, data in sections:
+                f.write(b'\0' * (-f.tell() % 8))
+                f.write(data)
+        os.replace(tmp_path, snapshot_path)
+
+    @classmethod
+    def load(cls, snapshot_path: str) -> 'CompactDependencyGraph':
+        """Load a snapshot written by save, memory-mapping its arrays
+
+        The adjacency arrays are read-only views of the mapped file rather than copies.
+        Node imports/exports, edge imported items and node metadata are built on access.
+        Raises ValueError if the file is not a snapshot of a supported version.
+        """
+        with open(snapshot_path, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{snapshot_path} is not a dependency graph snapshot")
+        view = memoryview(buffer)
+        if len(view) < _SNAPSHOT_HEADER.size:
+            raise ValueError(f"{snapshot_path} is not a dependency graph snapshot")
+        magic, version, section_count = _SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{snapshot_path} is not a version {SNAPSHOT_VERSION} dependency graph snapshot")
+
+        sections = {}
+        for i in range(section_count):
+            name, typecode, offset, length = _SNAPSHOT_SECTION.unpack_from(
+                view, _SNAPSHOT_HEADER.size + i * _SNAPSHOT_SECTION.size)
+            typecode = typecode.decode('ascii')
+            section = view[offset:offset + length]
+            if typecode != 'B' and sys.byteorder != 'little':
+                section = array(typecode, section.tobytes())
+                section.byteswap()
+            else:
+                section = section.cast(typecode)
+            sections[name.rstrip(b'\0').decode('ascii')] = section
+
+        text = str(sections['strings'], 'utf-8')
+        string_offsets = sections['string_offsets']
+        strings = [text[string_offsets[i]:string_offsets[i + 1]] for i in range(len(string_offsets) - 1)]
+
+        graph = cls()
+        for name in _ADJACENCY_SECTIONS:
+            setattr(graph, name, sections[name])
+        graph.is_node = sections['is_node']
+        graph.node_count = graph.is_node.tobytes().count(1)
+        graph.paths = strings[:len(graph.is_node)]
+        graph.path_ids = {path: node_id for node_id, path in enumerate(graph.paths)}
+        graph.file_types = [strings[sid] for sid in sections['file_types']]
+        graph.edge_types = [strings[sid] for sid in sections['edge_types']]
+        graph.imports = _StringTuples(strings, sections['imports_offsets'], sections['imports'])
+        graph.exports = _StringTuples(strings, sections['exports_offsets'], sections['exports'])
+        graph.imported_items = _StringTuples(strings, sections['items_offsets'], sections['items'])
+        graph.metadata = (_JSONItems(sections['metadata'], sections['metadata_offsets'])
+                          if 'metadata' in sections else None)
+        return graph
+
+    @staticmethod
+    def _offsets(counts: List[int]) -> array:
+        offsets = array('i', [0])
+        total = 0
+        for count in counts:
+            total += count
+            offsets.append(total)
+        return offsets
+
+    def _intern(self, file_path: str) -> int:
+        node_id = len(self.paths)
+        self.paths.append(file_path)
+        self.path_ids[file_path] = node_id
+        return node_id
+
+    def _intern_endpoint(self, file_path: str) -> int:
+        """ID of an edge endpoint, adding it as a non-node vertex if it is not a node"""
+        node_id = self.path_ids.get(file_path)
+        if node_id is None:
+            node_id = self._intern(file_path)
+            self.is_node.append(0)
+            self.file_types.append('')
+            self.imports.append(())
+            self.exports.append(())
+            if self.metadata is not None:
+                self.metadata.append(None)
+        return node_id
+
+    @property
+    def nodes(self) -> _NodeView:
+        return _NodeView(self)
+
+    @property
+    def edges(self) -> _EdgeView:
+        return _EdgeView(self)
+
+    def successors(self, node_id: int) -> array:
+        """IDs of the files node_id imports"""
+        return self.out_targets[self.out_offsets[node_id]:self.out_offsets[node_id + 1]]
+
+    def predecessors(self, node_id: int) -> List[int]:
+        """IDs of the files that import node_id"""
+        sources = self.edge_sources
+        return [sources[edge_id] for edge_id in self.in_edges[self.in_offsets[node_id]:self.in_offsets[node_id + 1]]]
+
+    def get_dependencies(self, file_path: str) -> List[CompactEdge]:
+        """Get all dependencies for a specific file"""
+        node_id = self.path_ids.get(file_path)
+        if node_id is None:
+            return []
+        return [CompactEdge(self, edge_id) for edge_id in range(self.out_offsets[node_id], self.out_offsets[node_id + 1])]
+
+    def get_dependents(self, file_path: str) -> List[CompactEdge]:
+        """Get all files that depend on the specified file"""
+        node_id = self.path_ids.get(file_path)
+        if node_id is None:
+            return []
+        return [CompactEdge(self, edge_id) for edge_id in self.in_edges[self.in_offsets[node_id]:self.in_offsets[node_id + 1]]]
+
+    def out_degree(self, file_path: str) -> int:
+        """Number of files the specified file depends on"""
+        node_id = self.path_ids.get(file_path)
+        return 0 if node_id is None else self.out_offsets[node_id + 1] - self.out_offsets[node_id]
+
+    def in_degree(self, file_path: str) -> int:
+        """Number of files that depend on the specified file"""
+        node_id = self.path_ids.get(file_path)
+        return 0 if node_id is None else self.in_offsets[node_id + 1] - self.in_offsets[node_id]
+
+    def get_subgraph(self, file_paths: List[str]) -> 'CompactDependencyGraph':
+        """Extract a subgraph containing only specified files"""
+        selected = dict.fromkeys(file_paths)
+        nodes = self.nodes
+        edges = (CompactEdge(self, edge_id)
+                 for file_path in selected if file_path in self.path_ids
+                 for edge_id in range(self.out_offsets[self.path_ids[file_path]],
+                                      self.out_offsets[self.path_ids[file_path] + 1])
+                 if self.paths[self.out_targets[edge_id]] in selected)
+        return CompactDependencyGraph.build((nodes[path] for path in selected if path in nodes), edges,
+                                            keep_metadata=self.metadata is not None)
+
+    def _component_ids(self) -> List[List[int]]:
+        """Tarjan's strongly connected components over vertex IDs, in reverse topological order"""
+        if self._components is not None:
+            return self._components
+
+        offsets, targets = self.out_offsets, self.out_targets
+        vertex_count = len(self.paths)
+        index = [-1] * vertex_count
+        lowlink = [0] * vertex_count
+        on_stack = bytearray(vertex_count)
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+
+        # Iterative, so deep import chains cannot hit the recursion limit; each work item
+        # is a vertex and the position of the next outgoing edge to visit
+        for root in range(vertex_count):
+            if index[root] != -1:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [[root, offsets[root]]]
+
+            while work:
+                item = work[-1]
+                vertex, position = item
+                end = offsets[vertex + 1]
+                while position < end:
+                    target = targets[position]
+                    position += 1
+                    if index[target] == -1:
+                        break
+                    if on_stack[target] and index[target] < lowlink[vertex]:
+                        lowlink[vertex] = index[target]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if lowlink[vertex] < lowlink[parent]:
+                            lowlink[parent] = lowlink[vertex]
+                    if lowlink[vertex] == index[vertex]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            component.append(member)
+                            if member == vertex:
+                                break
+                        components.append(component)
+                    continue
+
+                item[1] = position
+                index[target] = lowlink[target] = counter
+                counter += 1
+                stack.append(target)
+                on_stack[target] = 1
+                work.append([target, offsets[target]])
+
+        self._components = components
+        return components
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Strongly connected components, listed so a component only depends on earlier ones"""
+        return [[self.paths[v] for v in component] for component in self._component_ids()]
+
+    def detect_cycles(self) -> List[List[str]]:
+        """Groups of mutually dependent files (including files importing themselves), sorted by path"""
+        if self._cycle_groups is None:
+            groups = []
+            for component in self._component_ids():
+                if len(component) > 1 or component[0] in self.successors(component[0]):
+                    groups.append(sorted(self.paths[v] for v in component))
+            self._cycle_groups = sorted(groups)
+        return [list(group) for group in self._cycle_groups]
+
+    def find_cycles(self, max_cycles: int = 100) -> List[List[str]]:
+        """Up to max_cycles representative cycles: the shortest cycle through each cycle group file
+
+        Rotations of cycles already found are skipped. The cost is bounded by max_cycles
+        breadth-first searches rather than the number of simple cycles.
+        """
+        cycles: List[List[str]] = []
+        seen: Set[Tuple[int, ...]] = set()
+
+        for group in self.detect_cycles():
+            members = {self.path_ids[path] for path in group}
+            for path in group:
+                if len(cycles) >= max_cycles:
+                    return cycles
+                cycle = self._shortest_cycle(self.path_ids[path], members)
+                if cycle is None:
+                    continue
+                pivot = cycle.index(min(cycle, key=self.paths.__getitem__))
+                canonical = tuple(cycle[pivot:] + cycle[:pivot])
+                if canonical not in seen:
+                    seen.add(canonical)
+                    cycles.append([self.paths[v] for v in cycle])
+
+        return cycles
+
+    def _shortest_cycle(self, start: int, members: Set[int]) -> Optional[List[int]]:
+        """Breadth-first search for the shortest cycle from start back to itself within members"""
+        parents: Dict[int, int] = {start: -1}
+        queue = deque([start])
+        while queue:
+            vertex = queue.popleft()
+            for target in self.successors(vertex):
+                if target == start:
+                    cycle = []
+                    while vertex != -1:
+                        cycle.append(vertex)
+                        vertex = parents[vertex]
+                    return cycle[::-1]
+                if target in members and target not in parents:
+                    parents[target] = vertex
+                    queue.append(target)
+        return None
+
+    def _condensation(self) -> Tuple[array, List[List[int]], List[List[int]]]:
+        """Component of each vertex, and the components each component imports and is imported by"""
+        if self._condensed is None:
+            components = self._component_ids()
+            component_of = array('i', [0]) * len(self.paths)
+            for i, component in enumerate(components):
+                for vertex in component:
+                    component_of[vertex] = i
+
+            successors: List[List[int]] = []
+            predecessors: List[List[int]] = [[] for _ in components]
+            for i, component in enumerate(components):
+                dependencies = {component_of[target] for vertex in component for target in self.successors(vertex)}
+                dependencies.discard(i)
+                successors.append(list(dependencies))
+                for dependency in dependencies:
+                    predecessors[dependency].append(i)
+            self._condensed = (component_of, successors, predecessors)
+        return self._condensed
+
+    def build_layers(self) -> List[List[str]]:
+        """Layers of files in dependency order; see DependencyGraph.build_layers"""
+        if self._layers is None:
+            components = self._component_ids()
+            _, successors, dependents = self._condensation()
+
+            # Kahn's algorithm over the condensation: a component is ready once every
+            # component it imports from has been placed
+            pending = [len(dependencies) for dependencies in successors]
+            layers = []
+            ready = [i for i, count in enumerate(pending) if count == 0]
+            while ready:
+                layers.append(sorted(self.paths[v] for i in ready for v in components[i]))
+                next_ready = []
+                for i in ready:
+                    for dependent in dependents[i]:
+                        pending[dependent] -= 1
+                        if pending[dependent] == 0:
+                            next_ready.append(dependent)
+                ready = next_ready
+            self._layers = layers
+
+        return [list(layer) for layer in self._layers]
+
+    def topological_sort(self) -> List[str]:
+        """Files ordered before the files they import, with import cycles kept together"""
+        return [file_path for layer in reversed(self.build_layers()) for file_path in layer]
+
+    def transitive_dependents(self, file_paths: Union[str, Iterable[str]],
+                              max_depth: Optional[int] = None) -> List[str]:
+        """Files that import any of file_paths, directly or transitively; see DependencyGraph"""
+        return self._transitive(file_paths, max_depth, reverse=True)
+
+    def transitive_dependencies(self, file_paths: Union[str, Iterable[str]],
+                                max_depth: Optional[int] = None) -> List[str]:
+        """Files any of file_paths import, directly or transitively; see DependencyGraph"""
+        return self._transitive(file_paths, max_depth, reverse=False)
+
+    def _transitive(self, file_paths: Union[str, Iterable[str]], max_depth: Optional[int],
+                    reverse: bool) -> List[str]:
+        if isinstance(file_paths, str):
+            file_paths = [file_paths]
+        seeds = list(dict.fromkeys(self.path_ids[path] for path in file_paths if path in self.path_ids))
+        if not seeds:
+            return []
+
+        if max_depth is None:
+            components = self._component_ids()
+            component_of = self._condensation()[0]
+            reached = self._reachable_components([component_of[v] for v in seeds], reverse)
+            vertices = [v for component in reached for v in components[component]]
+        else:
+            vertices = self._reachable_within(seeds, max_depth, reverse)
+
+        seed_set = set(seeds)
+        return sorted(self.paths[v] for v in vertices if v not in seed_set)
+
+    def _reachable_components(self, seeds: List[int], reverse: bool) -> Set[int]:
+        """Components reachable from the seed components (including them), by BFS over the condensation
+
+        The set reached from a single component is memoized, and a search reaching a
+        memoized component takes its set instead of expanding it.
+        """
+        _, successors, predecessors = self._condensation()
+        neighbors = predecessors if reverse else successors
+        memo = self._reach_memo[reverse]
+        seeds = list(dict.fromkeys(seeds))
+
+        reached: Set[int] = set()
+        queue = deque()
+        for component in seeds:
+            known = memo.get(component)
+            if known is not None:
+                reached |= known
+            elif component not in reached:
+                reached.add(component)
+                queue.append(component)
+
+        while queue:
+            for neighbor in neighbors[queue.popleft()]:
+                if neighbor in reached:
+                    continue
+                known = memo.get(neighbor)
+                if known is not None:
+                    reached |= known
+                else:
+                    reached.add(neighbor)
+                    queue.append(neighbor)
+
+        if len(seeds) == 1:
+            memo[seeds[0]] = frozenset(reached)
+        return reached
+
+    def _reachable_within(self, seeds: List[int], max_depth: int, reverse: bool) -> Set[int]:
+        """Vertices at most max_depth import hops from any seed (including the seeds), by BFS"""
+        step = self.predecessors if reverse else self.successors
+        reached = set(seeds)
+        frontier = seeds
+        for _ in range(max_depth):
+            next_frontier = []
+            for vertex in frontier:
+                for neighbor in step(vertex):
+                    if neighbor not in reached:
+                        reached.add(neighbor)
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return reached
+
+    def pagerank(self, damping: float = 0.85, max_iterations: int = 50,
+                 tolerance: float = 1e-6) -> Dict[str, float]:
+        """PageRank of each node, with rank flowing from importers to the files they import
+
+        Widely and transitively imported files score highest. Files importing nothing
+        spread their rank evenly over all files. Iterates until the total change drops
+        below tolerance or max_iterations is reached; scores sum to 1.
+        """
+        vertex_count = len(self.paths)
+        if vertex_count == 0:
+            return {}
+        offsets = self.out_offsets
+        out_degree = [offsets[v + 1] - offsets[v] for v in range(vertex_count)]
+        dangling = [v for v in range(vertex_count) if out_degree[v] == 0]
+        edges = list(zip(self.edge_sources, self.out_targets))
+
+        rank = [1.0 / vertex_count] * vertex_count
+        for _ in range(max_iterations):
+            leaked = sum(rank[v] for v in dangling)
+            share = [damping * rank[v] / out_degree[v] if out_degree[v] else 0.0 for v in range(vertex_count)]
+            next_rank = [((1.0 - damping) + damping * leaked) / vertex_count] * vertex_count
+            for source, target in edges:
+                next_rank[target] += share[source]
+            change = sum(abs(a - b) for a, b in zip(next_rank, rank))
+            rank = next_rank
+            if change < tolerance:
+                break
+
+        return {self.paths[v]: rank[v] for v in range(vertex_count) if self.is_node[v]}
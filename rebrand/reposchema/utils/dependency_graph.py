@@ -10,17 +10,18 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Set, Optional, Any, Tuple
+from typing import Dict, List, Set, Optional, Any, Tuple, Union, Iterable
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-# Optional import for NetworkX
 try:
-    import networkx as nx
-    NETWORKX_AVAILABLE = True
+    from .compact_graph import CompactDependencyGraph, CompactNode, CompactEdge, is_snapshot
+    from .source_symbols import SYMBOL_EXTENSIONS, extract_symbols
 except ImportError:
-    nx = None
-    NETWORKX_AVAILABLE = False
+    from compact_graph import CompactDependencyGraph, CompactNode, CompactEdge, is_snapshot
+    from source_symbols import SYMBOL_EXTENSIONS, extract_symbols
 
 logger = logging.getLogger(__name__)
 
@@ -60,92 +61,252 @@ class DependencyGraph:
     def __init__(self):
         self.nodes: Dict[str, DependencyNode] = {}
         self.edges: List[DependencyEdge] = []
+        # Edges by source and by target file, and by (source, target, type) for dedup
+        self.forward_adjacency: Dict[str, List[DependencyEdge]] = defaultdict(list)
+        self.reverse_adjacency: Dict[str, List[DependencyEdge]] = defaultdict(list)
+        self.edge_index: Dict[Tuple[str, str, str], DependencyEdge] = {}
+        self._compact_cache: Optional[CompactDependencyGraph] = None
         self.file_to_module_map: Dict[str, str] = {}
         self.module_to_files_map: Dict[str, List[str]] = defaultdict(list)
+        # Python files by each trailing part of their dotted module name ('a.b.c', 'b.c', 'c')
+        self.module_suffix_map: Dict[str, List[str]] = defaultdict(list)
 
     def add_node(self, node: DependencyNode) -> None:
-        """Add a node to the graph"""
+        """Add a node to the graph
+
+        Re-adding a file replaces its node. The compact view holds the node data, so it is
+        rebuilt, and the module mappings are moved if the file type changes its module name.
+        """
         self.nodes[node.file_path] = node
+        self._invalidate_caches()
 
         # Update module mappings
         module_name = self._extract_module_name(node.file_path, node.file_type)
+        previous_module = self.file_to_module_map.get(node.file_path)
+        if previous_module == module_name:
+            return
+        if previous_module is not None:
+            del self.file_to_module_map[node.file_path]
+            self._discard_from_index(self.module_to_files_map, previous_module, node.file_path)
+            for suffix in self._module_suffixes(previous_module):
+                self._discard_from_index(self.module_suffix_map, suffix, node.file_path)
         if module_name:
             self.file_to_module_map[node.file_path] = module_name
             self.module_to_files_map[module_name].append(node.file_path)
+            if node.file_type == '.py':
+                for suffix in self._module_suffixes(module_name):
+                    self.module_suffix_map[suffix].append(node.file_path)
 
     def add_edge(self, edge: DependencyEdge) -> None:
-        """Add an edge to the graph"""
+        """Add an edge to the graph
+
+        An edge repeating an existing source, target and dependency type is merged into
+        it, its imported items appended to the existing edge's.
+        """
+        key = (edge.source_file, edge.target_file, edge.dependency_type)
+        existing = self.edge_index.get(key)
+        if existing is not None:
+            for item in edge.imported_items:
+                if item not in existing.imported_items:
+                    existing.imported_items.append(item)
+            return
+
+        self.edge_index[key] = edge
         self.edges.append(edge)
+        self._invalidate_caches()
+        self.forward_adjacency[edge.source_file].append(edge)
+        self.reverse_adjacency[edge.target_file].append(edge)
+
+    def remove_nodes(self, file_paths: Iterable[str]) -> None:
+        """Remove files from the graph together with every edge to or from them"""
+        removed = [file_path for file_path in dict.fromkeys(file_paths) if file_path in self.nodes]
+        if not removed:
+            return
+
+        edges = []
+        for file_path in removed:
+            edges.extend(self.forward_adjacency.get(file_path, ()))
+            edges.extend(self.reverse_adjacency.get(file_path, ()))
+        self._discard_edges(edges)
+
+        for file_path in removed:
+            del self.nodes[file_path]
+            module_name = self.file_to_module_map.pop(file_path, None)
+            if module_name is not None:
+                self._discard_from_index(self.module_to_files_map, module_name, file_path)
+                for suffix in self._module_suffixes(module_name):
+                    self._discard_from_index(self.module_suffix_map, suffix, file_path)
+        self._invalidate_caches()
+
+    def remove_dependencies(self, file_paths: Iterable[str]) -> None:
+        """Remove the edges from the given files, keeping the files themselves"""
+        self._discard_edges([edge for file_path in dict.fromkeys(file_paths)
+                             for edge in self.forward_adjacency.get(file_path, ())])
+
+    def _discard_edges(self, edges: List[DependencyEdge]) -> None:
+        """Remove edges from the edge list and the adjacency and dedup indexes
+
+        Each affected adjacency list and the edge list are filtered once, however many
+        edges are removed.
+        """
+        dropped = {}
+        for edge in edges:
+            if self.edge_index.get((edge.source_file, edge.target_file, edge.dependency_type)) is edge:
+                del self.edge_index[(edge.source_file, edge.target_file, edge.dependency_type)]
+                dropped[id(edge)] = edge
+        if not dropped:
+            return
+
+        for adjacency, endpoints in ((self.forward_adjacency, {edge.source_file for edge in dropped.values()}),
+                                     (self.reverse_adjacency, {edge.target_file for edge in dropped.values()})):
+            for file_path in endpoints:
+                remaining = [edge for edge in adjacency[file_path] if id(edge) not in dropped]
+                if remaining:
+                    adjacency[file_path] = remaining
+                else:
+                    del adjacency[file_path]
+        self.edges[:] = [edge for edge in self.edges if id(edge) not in dropped]
+        self._invalidate_caches()
+
+    @staticmethod
+    def _module_suffixes(module_name: str) -> List[str]:
+        parts = module_name.split('.')
+        return ['.'.join(parts[i:]) for i in range(len(parts))]
+
+    @staticmethod
+    def _discard_from_index(index: Dict[str, List[str]], key: str, file_path: str) -> None:
+        files = index.get(key)
+        if files is not None and file_path in files:
+            files.remove(file_path)
+            if not files:
+                del index[key]
 
     def get_dependencies(self, file_path: str) -> List[DependencyEdge]:
         """Get all dependencies for a specific file"""
-        return [edge for edge in self.edges if edge.source_file == file_path]
+        return list(self.forward_adjacency.get(file_path, ()))
 
     def get_dependents(self, file_path: str) -> List[DependencyEdge]:
         """Get all files that depend on the specified file"""
-        return [edge for edge in self.edges if edge.target_file == file_path]
+        return list(self.reverse_adjacency.get(file_path, ()))
+
+    def out_degree(self, file_path: str) -> int:
+        """Number of files the specified file depends on"""
+        return len(self.forward_adjacency.get(file_path, ()))
+
+    def in_degree(self, file_path: str) -> int:
+        """Number of files that depend on the specified file"""
+        return len(self.reverse_adjacency.get(file_path, ()))
+
+    def compact(self, keep_metadata: bool = True) -> CompactDependencyGraph:
+        """Integer-indexed, read-only copy of the graph with the same query API
+
+        Useful for holding very large graphs in memory. The copy without metadata is the
+        one the graph algorithms below run on; it is cached until the graph is mutated.
+        """
+        if keep_metadata:
+            return CompactDependencyGraph.from_graph(self, keep_metadata=True)
+        if self._compact_cache is None:
+            self._compact_cache = CompactDependencyGraph.from_graph(self, keep_metadata=False)
+        return self._compact_cache
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Strongly connected components of the graph, using Tarjan's algorithm
+
+        Components are listed in reverse topological order: a component only depends on
+        components listed before it. Files that appear only as edge endpoints are
+        included.
+        """
+        return self.compact(keep_metadata=False).strongly_connected_components()
 
     def detect_cycles(self) -> List[List[str]]:
-        """Detect circular dependencies in the graph"""
-        if not NETWORKX_AVAILABLE:
-            logger.warning("NetworkX not available, skipping cycle detection")
-            return []
+        """Detect circular dependencies in the graph
+
+        Returns one group per set of mutually dependent files (a strongly connected
+        component with more than one file, or a file importing itself), each sorted by
+        path. Use find_cycles for concrete import cycles within the groups.
+        """
+        return self.compact(keep_metadata=False).detect_cycles()
 
-        # Create NetworkX graph for cycle detection
-        G = nx.DiGraph()
+    def find_cycles(self, max_cycles: int = 100) -> List[List[str]]:
+        """Find up to max_cycles representative import cycles
 
-        for edge in self.edges:
-            G.add_edge(edge.source_file, edge.target_file)
+        For each file of each cycle group, reports the shortest cycle through that file,
+        skipping rotations of cycles already found. Unlike enumerating every simple cycle,
+        the cost is bounded by max_cycles breadth-first searches.
+        """
+        return self.compact(keep_metadata=False).find_cycles(max_cycles)
 
-        try:
-            cycles = list(nx.simple_cycles(G))
-            return cycles
-        except Exception as e:
-            logger.error(f"Error detecting cycles: {e}")
-            return []
+    def _invalidate_caches(self) -> None:
+        """Drop results derived from the graph structure after a mutation"""
+        self._compact_cache = None
 
     def get_subgraph(self, file_paths: List[str]) -> 'DependencyGraph':
         """Extract a subgraph containing only specified files"""
         subgraph = DependencyGraph()
+        selected = dict.fromkeys(file_paths)
 
         # Add nodes
-        for file_path in file_paths:
+        for file_path in selected:
             if file_path in self.nodes:
                 subgraph.add_node(self.nodes[file_path])
 
-        # Add relevant edges
-        for edge in self.edges:
-            if edge.source_file in file_paths and edge.target_file in file_paths:
-                subgraph.add_edge(edge)
+        # Add relevant edges, walking only the selected files' outgoing edges
+        for file_path in selected:
+            for edge in self.forward_adjacency.get(file_path, ()):
+                if edge.target_file in selected:
+                    subgraph.add_edge(edge)
 
         return subgraph
 
-    def topological_sort(self) -> List[str]:
-        """Perform topological sort of the dependency graph"""
-        if not NETWORKX_AVAILABLE:
-            logger.warning("NetworkX not available, returning unsorted file list")
-            return list(self.nodes.keys())
-
-        G = nx.DiGraph()
+    def build_layers(self) -> List[List[str]]:
+        """Group files into layers that can be processed in dependency order
 
-        for edge in self.edges:
-            G.add_edge(edge.source_file, edge.target_file)
+        Each layer only depends on earlier layers, so the files within a layer can be
+        processed in parallel once the previous layers are done. Files that depend on
+        each other in a cycle are placed in the same layer. Layers are sorted by path.
+        """
+        return self.compact(keep_metadata=False).build_layers()
 
-        try:
-            return list(nx.topological_sort(G))
-        except Exception as e:
-            # Graph has cycles or other issues, return partial ordering
-            logger.warning(f"Topological sort failed: {e}")
-            return list(self.nodes.keys())
+    def topological_sort(self) -> List[str]:
+        """Perform topological sort of the dependency graph
+
+        Files are ordered before the files they import. Files in an import cycle are
+        kept next to each other rather than aborting the sort.
+        """
+        return self.compact(keep_metadata=False).topological_sort()
+
+    def transitive_dependents(self, file_paths: Union[str, Iterable[str]],
+                              max_depth: Optional[int] = None) -> List[str]:
+        """Files affected by a change to any of file_paths: those importing them, directly or transitively
+
+        file_paths is one path or a batch of paths. With max_depth, only files within that
+        many import hops are returned. The given files themselves are left out; the result
+        is sorted by path. Unlimited queries search the graph of import cycles collapsed to
+        single nodes, memoizing the result for each single file's cycle group.
+        """
+        return self.compact(keep_metadata=False).transitive_dependents(file_paths, max_depth)
+
+    def transitive_dependencies(self, file_paths: Union[str, Iterable[str]],
+                                max_depth: Optional[int] = None) -> List[str]:
+        """Files any of file_paths import, directly or transitively; see transitive_dependents"""
+        return self.compact(keep_metadata=False).transitive_dependencies(file_paths, max_depth)
+
+    def pagerank(self, damping: float = 0.85, max_iterations: int = 50,
+                 tolerance: float = 1e-6) -> Dict[str, float]:
+        """Importance score of each file, by PageRank over import edges
+
+        Files that are imported widely, directly or transitively, score highest. Scores
+        sum to 1.
+        """
+        return self.compact(keep_metadata=False).pagerank(damping, max_iterations, tolerance)
 
     def _extract_module_name(self, file_path: str, file_type: str) -> Optional[str]:
         """Extract module name from file path based on file type"""
         if file_type == '.py':
-            # Python: convert path to module name
-            path_parts = file_path.replace('.py', '').split(os.sep)
-            if path_parts[-1] == '__init__':
-                return '.'.join(path_parts[:-1])
-            return '.'.join(path_parts)
+            # Python: convert path to module name, a package is named by its directory
+            if os.path.basename(file_path) == '__init__.py':
+                return os.path.dirname(file_path).replace(os.sep, '.')
+            return file_path[:-3].replace(os.sep, '.')
         elif file_type in ['.js', '.jsx', '.ts', '.tsx']:
             # JavaScript/TypeScript: use file name without extension
             return os.path.splitext(os.path.basename(file_path))[0]
@@ -156,23 +317,14 @@ class DependencyGraph:
             return None
 
 class DependencyAnalyzer:
-    """Analyzes code files to extract dependency relationships"""
+    """Analyzes code files to extract dependency relationships
 
-    def __init__(self):
-        self.supported_extensions = {
-            '.py': self._analyze_python_file,
-            '.js': self._analyze_javascript_file,
-            '.jsx': self._analyze_javascript_file,
-            '.ts': self._analyze_javascript_file,
-            '.tsx': self._analyze_javascript_file,
-            '.java': self._analyze_java_file,
-            '.cs': self._analyze_csharp_file,
-            '.cpp': self._analyze_cpp_file,
-            '.c': self._analyze_cpp_file,
-            '.php': self._analyze_php_file,
-            '.go': self._analyze_go_file,
-            '.rs': self._analyze_rust_file
-        }
+    Imports and exports come from the file's symbol record (see source_symbols), the same
+    record the schema's code summary is derived from.
+    """
+
+    # File types with an analyzer; other files get nodes without imports or exports
+    SUPPORTED_EXTENSIONS = SYMBOL_EXTENSIONS
 
     def analyze_file(self, file_path: str, content: str) -> DependencyNode:
         """Analyze a file and extract its dependencies"""
@@ -186,416 +338,341 @@ class DependencyAnalyzer:
             metadata={}
         )
 
-        if file_type in self.supported_extensions:
-            analyzer_func = self.supported_extensions[file_type]
-            analyzer_func(content, node)
+        symbols = extract_symbols(content, file_type, file_path)
+        if symbols is not None:
+            node.imports = symbols.dependencies
+            node.exports = symbols.exports
 
         return node
 
-    def _analyze_python_file(self, content: str, node: DependencyNode) -> None:
-        """Analyze Python file for imports and dependencies"""
-        lines = content.split('\n')
-        imports = []
-        exports = []
-
-        # Python standard library modules (common ones) - reduced set for better internal dep detection
-        stdlib_modules = {
-            'os', 'sys', 'json', 're', 'time', 'datetime', 'pathlib', 'collections',
-            'itertools', 'functools', 'math', 'random', 'string', 'argparse', 'logging',
-            'subprocess', 'threading', 'asyncio', 'typing', 'tempfile', 'shutil', 'glob',
-            'pickle', 'copy', 'enum', 'abc', 'warnings', 'io', 'codecs', 'urllib',
-            'urllib.request', 'urllib.parse', 'xml', 'html', 'email', 'base64',
-            'struct', 'hashlib', 'ssl', 'socket', 'sqlite3', 'zlib', 'gzip', 'csv',
-            'configparser', 'plistlib', 'mmap', 'cgi', 'wsgiref', 'calendar', 'zoneinfo'
-        }
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            # Extract imports
-            if line.startswith('from '):
-                # Handle: from pathlib import Path
-                module = line.split('from ')[1].split(' import ')[0]
-                if module and not module.startswith('_'):
-                    # For dependency graphs, we want the module name, not individual imports
-                    # Only include non-stdlib modules and relative imports
-                    if module not in stdlib_modules and not module.startswith('.'):
-                        imports.append(module)
-            elif line.startswith('import '):
-                # Handle multi-import: import os, sys
-                parts = line.split('import ')[1].split(',')
-                for part in parts[:3]:  # Limit per line
-                    module = part.strip().split()[0]
-                    if module and not module.startswith('_'):
-                        # Only include non-stdlib modules and relative imports
-                        if module not in stdlib_modules and not module.startswith('.'):
-                            imports.append(module)
-
-            # Extract exports (simplified - could be enhanced)
-            elif line.startswith(('def ', 'class ')) and not line.startswith('    '):
-                if 'def ' in line:
-                    func_name = line.split('def ')[1].split('(')[0].strip()
-                    if not func_name.startswith('_'):
-                        exports.append(f"function:{func_name}")
-                elif 'class ' in line:
-                    class_name = line.split('class ')[1].split('(')[0].split(':')[0].strip()
-                    if not class_name.startswith('_'):
-                        exports.append(f"class:{class_name}")
-
-        node.imports = imports
-        node.exports = exports
-
-    def _analyze_javascript_file(self, content: str, node: DependencyNode) -> None:
-        """Analyze JavaScript/TypeScript file for imports and dependencies"""
-        lines = content.split('\n')
-        imports = []
-        exports = []
-
-        # Common external packages that should be filtered out
-        external_packages = {
-            'react', 'react-dom', 'vue', 'angular', 'jquery', 'lodash', 'underscore',
-            'axios', 'fetch', 'express', 'mongoose', 'mongodb', 'mysql', 'postgres',
-            'redis', 'socket.io', 'webpack', 'babel', 'typescript', 'eslint',
-            'prettier', 'jest', 'mocha', 'chai', 'sinon', 'enzyme', 'testing-library',
-            'redux', 'mobx', 'rxjs', 'rxjs/operators', 'immutable', 'moment',
-            'date-fns', 'ramda', 'bluebird', 'q', 'async', 'co', 'thunkify',
-            'fs', 'path', 'os', 'crypto', 'http', 'https', 'url', 'querystring',
-            'events', 'stream', 'buffer', 'util', 'child_process', 'cluster',
-            'zlib', 'readline', 'repl', 'vm', 'v8', 'webassembly'
-        }
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('//') or line.startswith('/*'):
-                continue
-
-            # Extract imports
-            if line.startswith('import '):
-                if 'from ' in line:
-                    module = line.split('from ')[1].strip().strip("';\"")
-                    # Only include non-relative imports that are not common external packages
-                    if (module and not module.startswith('./') and not module.startswith('../')
-                        and module not in external_packages and not module.startswith('@types/')):
-                        imports.append(module)
-                elif '{' in line and '}' in line:
-                    # Named imports: import { useState, useEffect } from 'react'
-                    module_part = line.split('} from ')[-1] if '} from ' in line else ""
-                    if module_part:
-                        module = module_part.strip().strip("';\"")
-                        # Only include non-relative imports that are not common external packages
-                        if (module and not module.startswith('./') and not module.startswith('../')
-                            and module not in external_packages and not module.startswith('@types/')):
-                            imports.append(module)
-
-            # Extract exports
-            elif line.startswith(('export ', 'module.exports')):
-                if 'export ' in line:
-                    if 'function ' in line:
-                        func_name = line.split('function ')[1].split('(')[0].strip()
-                        exports.append(f"function:{func_name}")
-                    elif 'class ' in line:
-                        class_name = line.split('class ')[1].split()[0]
-                        exports.append(f"class:{class_name}")
-                    elif 'const ' in line or 'let ' in line or 'var ' in line:
-                        var_name = line.split()[1].split('=')[0].strip()
-                        exports.append(f"variable:{var_name}")
-
-        node.imports = imports
-        node.exports = exports
-
-    def _analyze_java_file(self, content: str, node: DependencyNode) -> None:
-        """Analyze Java file for imports and dependencies"""
-        lines = content.split('\n')
-        imports = []
-        exports = []
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('//') or line.startswith('/*'):
-                continue
-
-            # Extract imports
-            if line.startswith('import '):
-                package = line.split('import ')[1].split(';')[0]
-                if not package.startswith('java.') and not package.startswith('javax.'):
-                    imports.append(package)
-
-            # Extract class declarations
-            elif line.startswith('public class ') or line.startswith('class '):
-                class_name = line.split('class ')[1].split()[0]
-                exports.append(f"class:{class_name}")
-
-        node.imports = imports
-        node.exports = exports
-
-    def _analyze_csharp_file(self, content: str, node: DependencyNode) -> None:
-        """Analyze C# file for imports and dependencies"""
-        lines = content.split('\n')
-        imports = []
-        exports = []
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('//') or line.startswith('/*'):
-                continue
-
-            # Extract using statements
-            if line.startswith('using '):
-                namespace = line.split('using ')[1].split(';')[0]
-                if not namespace.startswith('System.'):
-                    imports.append(namespace)
-
-            # Extract class declarations
-            elif line.startswith(('public class ', 'class ')):
-                class_name = line.split('class ')[1].split()[0]
-                exports.append(f"class:{class_name}")
-
-        node.imports = imports
-        node.exports = exports
-
-    def _analyze_cpp_file(self, content: str, node: DependencyNode) -> None:
-        """Analyze C/C++ file for includes and dependencies"""
-        lines = content.split('\n')
-        imports = []
-        exports = []
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('//') or line.startswith('/*'):
-                continue
-
-            # Extract includes
-            if line.startswith('#include '):
-                if '<' in line and '>' in line:
-                    header = line.split('<')[1].split('>')[0]
-                    imports.append(header)
-                elif '"' in line:
-                    header = line.split('"')[1]
-                    imports.append(header)
-
-        node.imports = imports
-        node.exports = exports
-
-    def _analyze_php_file(self, content: str, node: DependencyNode) -> None:
-        """Analyze PHP file for imports and dependencies"""
-        lines = content.split('\n')
-        imports = []
-        exports = []
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('//') or line.startswith('#'):
-                continue
-
-            # Extract use statements
-            if line.startswith('use '):
-                use_path = line.split('use ')[1].split(';')[0]
-                imports.append(use_path)
-
-            # Extract class/function declarations
-            elif line.startswith(('class ', 'function ', 'public function ')):
-                if 'class ' in line:
-                    class_name = line.split('class ')[1].split()[0]
-                    exports.append(f"class:{class_name}")
-                elif 'function ' in line:
-                    func_name = line.split('function ')[1].split('(')[0].strip()
-                    exports.append(f"function:{func_name}")
-
-        node.imports = imports
-        node.exports = exports
-
-    def _analyze_go_file(self, content: str, node: DependencyNode) -> None:
-        """Analyze Go file for imports and dependencies"""
-        lines = content.split('\n')
-        imports = []
-        exports = []
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('//'):
-                continue
-
-            # Extract imports
-            if line.startswith('import '):
-                if '(' in line:  # Multi-line imports
-                    # Handle multi-line imports
-                    j = lines.index(line) + 1
-                    while j < len(lines) and not lines[j].strip().startswith(')'):
-                        imp_line = lines[j].strip().strip('"')
-                        if imp_line and not imp_line.startswith('//'):
-                            imports.append(imp_line)
-                        j += 1
-                else:
-                    imp = line.split('"')[1] if '"' in line else ""
-                    if imp:
-                        imports.append(imp)
-
-            # Extract function/type declarations
-            elif line.startswith(('func ', 'type ')):
-                if 'func ' in line:
-                    func_name = line.split('func ')[1].split('(')[0].strip()
-                    if func_name[0].isupper():  # Exported in Go
-                        exports.append(f"function:{func_name}")
-                elif 'type ' in line:
-                    type_name = line.split('type ')[1].split()[0]
-                    if type_name[0].isupper():
-                        exports.append(f"type:{type_name}")
-
-        node.imports = imports
-        node.exports = exports
-
-    def _analyze_rust_file(self, content: str, node: DependencyNode) -> None:
-        """Analyze Rust file for imports and dependencies"""
-        lines = content.split('\n')
-        imports = []
-        exports = []
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('//'):
-                continue
-
-            # Extract use statements
-            if line.startswith('use '):
-                use_path = line.split('use ')[1].split(';')[0]
-                imports.append(use_path)
-
-            # Extract function/struct declarations
-            elif line.startswith(('fn ', 'struct ', 'pub fn ', 'pub struct ')):
-                if 'fn ' in line:
-                    fn_line = line.replace('pub ', '').split('fn ')[1]
-                    fn_name = fn_line.split('(')[0].strip()
-                    exports.append(f"function:{fn_name}")
-                elif 'struct ' in line:
-                    struct_line = line.replace('pub ', '').split('struct ')[1]
-                    struct_name = struct_line.split()[0]
-                    exports.append(f"struct:{struct_name}")
-
-        node.imports = imports
-        node.exports = exports
+def _read_source(file_path: str, base_dir: Optional[str] = None) -> str:
+    """Read a file's content for analysis, or '' if it is missing or unreadable"""
+    if base_dir is not None:
+        file_path = os.path.join(base_dir, file_path)
+    try:
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+    except Exception as e:
+        logger.warning(f"Could not read file {file_path}: {e}")
+    return ""
+
+def _analyze_source(analyzer: DependencyAnalyzer, file_path: str, base_dir: Optional[str]) -> DependencyNode:
+    """Analyze a file, only reading it if its type has an analyzer"""
+    if os.path.splitext(file_path)[1].lower() not in DependencyAnalyzer.SUPPORTED_EXTENSIONS:
+        return analyzer.analyze_file(file_path, "")
+    return analyzer.analyze_file(file_path, _read_source(file_path, base_dir))
+
+_worker_analyzer: Optional[DependencyAnalyzer] = None
+
+def _analyze_file_task(base_dir: Optional[str], file_path: str) -> DependencyNode:
+    """Process pool entry point: read and analyze one file with a per-process analyzer"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = DependencyAnalyzer()
+    return _analyze_source(_worker_analyzer, file_path, base_dir)
+
+def _as_dict(item: Any) -> Dict[str, Any]:
+    """asdict for dataclass nodes and edges, to_dict for compact graph views"""
+    if isinstance(item, (CompactNode, CompactEdge)):
+        return item.to_dict()
+    return asdict(item)
 
 class DependencyGraphGenerator:
     """Main class for generating dependency graphs from codebase"""
 
+    JS_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx')
+
     def __init__(self):
         self.analyzer = DependencyAnalyzer()
         self.graph = DependencyGraph()
-
-    def generate_from_schema(self, schema_data: Dict[str, Any]) -> DependencyGraph:
-        """Generate dependency graph from existing schema data"""
+        # Insertion position of each node, so resolved targets keep node order
+        self._node_order: Dict[str, int] = {}
+        self._next_position = 0
+        # Files by each import they make; built on the first update so it can find the
+        # files whose imports may resolve to an added file
+        self._importers: Optional[Dict[str, Set[str]]] = None
+
+    def generate_from_schema(self, schema_data: Dict[str, Any], compact: bool = False, workers: int = 1,
+                             base_dir: Optional[str] = None,
+                             file_records: Optional[Dict[str, Dict[str, List[str]]]] = None
+                             ) -> Union[DependencyGraph, CompactDependencyGraph]:
+        """Generate dependency graph from existing schema data
+
+        Schema paths are relative to base_dir (default: the current directory). file_records
+        maps schema paths to the imports/exports the scan already extracted; those files are
+        not read again. With workers > 1, the remaining files are read and analyzed on a
+        process pool. With compact, the finished graph is converted to a
+        CompactDependencyGraph (and the generator keeps only that), which is far smaller for
+        very large repositories.
+        """
         logger.info("Generating dependency graph from schema data")
-
-        # Process each file in the schema
-        for entry in schema_data.get('taxonomy', []):
-            for file_info in entry.get('files', []):
-                file_path = file_info.get('path', '')
-                metadata = file_info.get('metadata', {})
-
-                # Read file content if available
-                content = ""
-                try:
-                    if os.path.exists(file_path):
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                except Exception as e:
-                    logger.warning(f"Could not read file {file_path}: {e}")
-
-                # Analyze file
-                node = self.analyzer.analyze_file(file_path, content)
-                node.metadata = metadata
-                self.graph.add_node(node)
+        files = [(file_info.get('path', ''), file_info.get('metadata', {}))
+                 for entry in schema_data.get('taxonomy', [])
+                 for file_info in entry.get('files', [])]
+        return self.generate_from_files(files, compact=compact, workers=workers, base_dir=base_dir,
+                                        file_records=file_records)
+
+    def generate_from_files(self, files: Iterable[Tuple[str, Dict[str, Any]]], compact: bool = False,
+                            workers: int = 1, base_dir: Optional[str] = None,
+                            file_records: Optional[Dict[str, Dict[str, List[str]]]] = None
+                            ) -> Union[DependencyGraph, CompactDependencyGraph]:
+        """Generate dependency graph from (schema path, node metadata) pairs
+
+        Like generate_from_schema, without needing the schema: a streamed scan passes only
+        its file paths (with empty metadata) and the records it extracted.
+        """
+        file_records = file_records or {}
+
+        # Process each file, analyzing only files the scan has no record for
+        files = list(files)
+        unrecorded = [file_path for file_path, _ in files if file_path not in file_records]
+        analyzed = dict(zip(unrecorded, self.analyze_files(unrecorded, workers, base_dir)))
+        for file_path, metadata in files:
+            record = file_records.get(file_path)
+            node = self._node_from_record(file_path, record) if record is not None else analyzed[file_path]
+            node.metadata = metadata
+            self.graph.add_node(node)
 
         # Create edges based on import relationships
         self._create_dependency_edges()
 
+        if compact:
+            self.graph = self.graph.compact()
+
         logger.info(f"Generated dependency graph with {len(self.graph.nodes)} nodes and {len(self.graph.edges)} edges")
         return self.graph
 
-    def _create_dependency_edges(self) -> None:
-        """Create dependency edges based on import relationships"""
-        for file_path, node in self.graph.nodes.items():
-            for import_module in node.imports:
-                # Try to find matching files for this import
-                target_files = self._resolve_import_to_files(import_module, file_path)
-
-                for target_file in target_files:
-                    if target_file in self.graph.nodes:
-                        edge = DependencyEdge(
-                            source_file=file_path,
-                            target_file=target_file,
-                            dependency_type='import',
-                            imported_items=[import_module]
-                        )
-                        self.graph.add_edge(edge)
-
-    def _resolve_import_to_files(self, import_module: str, source_file: str) -> List[str]:
-        """Resolve an import module name to actual file paths"""
-        matching_files = []
-
-        # Get source file directory for relative path resolution
-        source_dir = os.path.dirname(source_file)
-
-        for file_path in self.graph.nodes.keys():
-            # Check if this file could satisfy the import
-            if self._module_matches_file(import_module, file_path, source_dir):
-                matching_files.append(file_path)
-
-        return matching_files
-
-    def _module_matches_file(self, import_module: str, file_path: str, source_dir: str) -> bool:
-        """Check if an import module could match a file"""
-        file_type = os.path.splitext(file_path)[1].lower()
-
-        if file_type == '.py':
-            # Python module matching
-            # Convert file path to module name
-            if file_path.endswith('__init__.py'):
-                module_name = file_path[:-12].replace(os.sep, '.')  # Remove __init__.py
+    def update(self, changed: Iterable[str], removed: Iterable[str] = (), workers: int = 1,
+               base_dir: Optional[str] = None,
+               file_records: Optional[Dict[str, Dict[str, List[str]]]] = None,
+               metadata: Optional[Dict[str, Dict[str, Any]]] = None) -> DependencyGraph:
+        """Apply added, modified and removed files to the current graph
+
+        changed holds added and modified schema paths. They are analyzed like in
+        generate_from_schema (from file_records when given, else read from base_dir) and
+        take their node metadata from metadata, or keep their previous metadata. Only the
+        changed files' own imports are re-resolved, plus the imports elsewhere that may
+        resolve to a newly added file; edges into removed files go with them. The first
+        update of a graph indexes its imports, after which the cost follows the size of
+        the change rather than the size of the repository.
+        """
+        graph = self.graph
+        if not isinstance(graph, DependencyGraph):
+            raise TypeError("Only a DependencyGraph can be updated, not a compact graph")
+        if self._importers is None:
+            self._index_imports()
+        file_records = file_records or {}
+        metadata = metadata or {}
+
+        changed = list(dict.fromkeys(changed))
+        changed_set = set(changed)
+        removed = [file_path for file_path in dict.fromkeys(removed)
+                   if file_path in graph.nodes and file_path not in changed_set]
+
+        # Drop removed files with all their edges, and modified files' outgoing edges
+        for file_path in removed:
+            self._unindex_imports(file_path, graph.nodes[file_path].imports)
+            self._node_order.pop(file_path, None)
+        graph.remove_nodes(removed)
+        graph.remove_dependencies(changed)
+
+        unrecorded = [file_path for file_path in changed if file_path not in file_records]
+        analyzed = dict(zip(unrecorded, self.analyze_files(unrecorded, workers, base_dir)))
+        added = []
+        for file_path in changed:
+            record = file_records.get(file_path)
+            node = self._node_from_record(file_path, record) if record is not None else analyzed[file_path]
+            previous = graph.nodes.get(file_path)
+            if previous is not None:
+                self._unindex_imports(file_path, previous.imports)
+                node.metadata = metadata.get(file_path, previous.metadata)
             else:
-                module_name = file_path[:-3].replace(os.sep, '.')  # Remove .py
-
-            # Check exact match
-            if module_name == import_module:
-                return True
-
-            # Check if import_module ends with this module name (handles partial matches)
-            if import_module.endswith(module_name):
-                return True
+                node.metadata = metadata.get(file_path, {})
+                added.append(file_path)
+                if self._node_order:
+                    self._node_order[file_path] = self._next_position
+                    self._next_position += 1
+            graph.add_node(node)
+            self._index_imports_of(file_path, node.imports)
+
+        self._create_dependency_edges(changed)
+
+        # Unchanged files may have imports that now also resolve to an added file
+        affected = set()
+        for file_path in added:
+            for import_module in self._imports_matching(file_path):
+                for source_file in self._importers.get(import_module, ()):
+                    if source_file not in changed_set:
+                        affected.add((source_file, import_module))
+        for source_file, import_module in sorted(affected, key=lambda item: (self._node_position(item[0]), item[1])):
+            self._add_import_edges(source_file, import_module)
+
+        logger.info(f"Updated dependency graph: {len(changed)} changed, {len(removed)} removed, "
+                    f"{len(affected)} imports re-resolved elsewhere")
+        return graph
+
+    def load_graph(self, input_path: str, compact: bool = False) -> Union[DependencyGraph, CompactDependencyGraph]:
+        """Load a graph written by save_graph (JSON or binary snapshot), replacing the current graph
+
+        With compact, the graph is kept as a read-only CompactDependencyGraph; a snapshot
+        is then used in place through a memory map, which is the fastest way to reload
+        a large graph. Otherwise a mutable DependencyGraph is built, e.g. for update. A
+        JSON graph that was truncated to fit the size limit only holds the files that were
+        kept; their edges are re-resolved from the files' imports.
+        """
+        self._node_order = {}
+        self._importers = None
+        if is_snapshot(input_path):
+            snapshot = CompactDependencyGraph.load(input_path)
+            if compact:
+                self.graph = snapshot
+            else:
+                self.graph = DependencyGraph()
+                for node in snapshot.nodes.values():
+                    self.graph.add_node(DependencyNode(node.file_path, node.file_type, node.imports,
+                                                       node.exports, dict(node.metadata)))
+                for edge in snapshot.edges:
+                    self.graph.add_edge(DependencyEdge(edge.source_file, edge.target_file, edge.dependency_type,
+                                                       edge.imported_items, edge.line_number))
+        else:
+            with open(input_path, 'r', encoding='utf-8') as f:
+                graph_data = json.load(f)
+
+            self.graph = DependencyGraph()
+            for node_data in graph_data.get('nodes', []):
+                self.graph.add_node(DependencyNode(**node_data))
+            if graph_data.get('metadata', {}).get('truncated'):
+                self._create_dependency_edges()
+            else:
+                for edge_data in graph_data.get('edges', []):
+                    self.graph.add_edge(DependencyEdge(**edge_data))
+            if compact:
+                self.graph = self.graph.compact()
 
-            # Check relative path matching
-            try:
-                rel_path = os.path.relpath(file_path, source_dir)
-                if rel_path.endswith('__init__.py'):
-                    rel_module = rel_path[:-12].replace(os.sep, '.')
-                else:
-                    rel_module = rel_path[:-3].replace(os.sep, '.')
+        logger.info(f"Loaded dependency graph with {len(self.graph.nodes)} nodes from {input_path}")
+        return self.graph
 
-                if rel_module == import_module:
-                    return True
+    @staticmethod
+    def _node_from_record(file_path: str, record: Dict[str, List[str]]) -> DependencyNode:
+        """Node for a file whose imports/exports the scan already extracted"""
+        return DependencyNode(file_path=file_path, file_type=os.path.splitext(file_path)[1].lower(),
+                              imports=list(record['imports']), exports=list(record['exports']))
 
-                # Handle case where import is just the module name
-                if os.path.basename(file_path) == f"{import_module}.py":
-                    return True
+    def _index_imports(self) -> None:
+        """Index the imports of every file in the graph"""
+        self._importers = defaultdict(set)
+        for file_path, node in self.graph.nodes.items():
+            self._index_imports_of(file_path, node.imports)
 
-            except ValueError:
-                pass
+    def _index_imports_of(self, file_path: str, imports: List[str]) -> None:
+        for import_module in imports:
+            self._importers[import_module].add(file_path)
 
-        elif file_type in ['.js', '.jsx', '.ts', '.tsx']:
-            # JavaScript/TypeScript module matching
-            file_name = os.path.splitext(os.path.basename(file_path))[0]
-            if file_name == import_module:
-                return True
+    def _unindex_imports(self, file_path: str, imports: List[str]) -> None:
+        for import_module in imports:
+            importers = self._importers.get(import_module)
+            if importers is None:
+                continue
+            importers.discard(file_path)
+            if not importers:
+                del self._importers[import_module]
+
+    def _imports_matching(self, file_path: str) -> Set[str]:
+        """Import names that may resolve to file_path (a superset of those that do)
+
+        Mirrors _resolve_import_to_files: a trailing part of the file's module name, or
+        the bare file name.
+        """
+        names = {os.path.splitext(os.path.basename(file_path))[0]}
+        module_name = self.graph.file_to_module_map.get(file_path)
+        if module_name:
+            names.update(self.graph._module_suffixes(module_name))
+        return names
+
+    def analyze_files(self, file_paths: List[str], workers: int = 1,
+                      base_dir: Optional[str] = None) -> List[DependencyNode]:
+        """Read and analyze files, returning their nodes in input order
+
+        Relative paths are read from base_dir (default: the current directory); nodes keep
+        the given paths. With workers > 1 the files are spread over a process pool in
+        chunks; if the pool cannot be used the files are analyzed serially instead.
+        """
+        if workers > 1 and len(file_paths) > 1:
+            # Larger chunks amortize inter-process overhead; keep enough chunks to balance the load
+            chunksize = max(1, len(file_paths) // (workers * 16))
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    return list(executor.map(partial(_analyze_file_task, base_dir), file_paths, chunksize=chunksize))
+            except Exception as e:
+                logger.warning(f"Parallel dependency analysis failed, analyzing serially: {e}")
+
+        return [_analyze_source(self.analyzer, file_path, base_dir) for file_path in file_paths]
+
+    def _create_dependency_edges(self, file_paths: Optional[List[str]] = None) -> None:
+        """Create dependency edges based on import relationships (of file_paths, default: all files)"""
+        nodes = self.graph.nodes
+        for file_path in (list(nodes) if file_paths is None else file_paths):
+            for import_module in nodes[file_path].imports:
+                self._add_import_edges(file_path, import_module)
+
+    def _add_import_edges(self, file_path: str, import_module: str) -> None:
+        """Add an edge from file_path to each file the import resolves to"""
+        # Try to find matching files for this import
+        target_files = self._resolve_import_to_files(import_module, file_path)
+
+        for target_file in target_files:
+            if target_file in self.graph.nodes:
+                edge = DependencyEdge(
+                    source_file=file_path,
+                    target_file=target_file,
+                    dependency_type='import',
+                    imported_items=[import_module]
+                )
+                self.graph.add_edge(edge)
 
-        # Add more language-specific matching logic as needed
-        return False
+    def _resolve_import_to_files(self, import_module: str, source_file: str) -> List[str]:
+        """Resolve an import module name to actual file paths
+
+        Python imports are absolute (relative ones were resolved during analysis) and match
+        the files whose dotted module name is the import or ends with it, so a repository
+        nested below its package root still resolves. Each import is one dict lookup.
+        """
+        graph = self.graph
+        source_type = os.path.splitext(source_file)[1].lower()
+
+        if source_type == '.py':
+            # e.g. 'utils.helpers' matches utils/helpers.py and app/utils/helpers.py
+            matching_files = graph.module_suffix_map.get(import_module, ())
+        elif source_type in self.JS_EXTENSIONS:
+            # JavaScript/TypeScript: the import is the file name without extension
+            matching_files = [file_path for file_path in graph.module_to_files_map.get(import_module, ())
+                              if os.path.splitext(file_path)[1].lower() in self.JS_EXTENSIONS]
+        else:
+            # Add more language-specific matching logic as needed
+            matching_files = ()
+
+        if len(matching_files) < 2:
+            return list(matching_files)
+        return sorted(matching_files, key=self._node_position)
+
+    def _node_position(self, file_path: str) -> int:
+        """Insertion position of a node, indexing the graph's nodes on first use"""
+        position = self._node_order.get(file_path)
+        if position is None:
+            self._node_order = {path: i for i, path in enumerate(self.graph.nodes)}
+            self._next_position = len(self._node_order)
+            position = self._node_order[file_path]
+        return position
 
     def serialize_graph(self, max_size_kb: int = 250) -> str:
-        """Serialize the dependency graph to JSON with size constraints"""
+        """Serialize the dependency graph to JSON with size constraints
+
+        A graph over max_size_kb keeps its most important files; see _dump_within_budget.
+        """
         graph_data = {
-            'nodes': [asdict(node) for node in self.graph.nodes.values()],
-            'edges': [asdict(edge) for edge in self.graph.edges],
+            'nodes': [_as_dict(node) for node in self.graph.nodes.values()],
+            'edges': [_as_dict(edge) for edge in self.graph.edges],
             'metadata': {
                 'total_nodes': len(self.graph.nodes),
                 'total_edges': len(self.graph.edges),
@@ -603,22 +680,24 @@ class DependencyGraphGenerator:
                 'generated_at': str(datetime.now())
             }
         }
+        node_index = {file_path: i for i, file_path in enumerate(self.graph.nodes)}
+        endpoints = [(node_index.get(edge['source_file']), node_index.get(edge['target_file']))
+                     for edge in graph_data['edges']]
 
-        json_str = json.dumps(graph_data, indent=2)
-        size_kb = len(json_str.encode('utf-8')) / 1024
+        return self._dump_within_budget(graph_data, 'nodes', 'edges', endpoints, max_size_kb)
 
-        if size_kb > max_size_kb:
-            logger.warning(f"Graph size ({size_kb:.1f}KB) exceeds limit ({max_size_kb}KB), truncating")
-            # Truncate by removing some edges if needed
-            max_edges = int(len(self.graph.edges) * (max_size_kb / size_kb) * 0.9)
-            graph_data['edges'] = graph_data['edges'][:max_edges]
-            graph_data['metadata']['truncated'] = True
-            json_str = json.dumps(graph_data, indent=2)
+    def save_graph(self, output_path: str, max_size_kb: int = 250, snapshot: bool = False) -> None:
+        """Save the dependency graph to a file
 
-        return json_str
+        With snapshot, the whole graph is written as a binary snapshot (see
+        CompactDependencyGraph.save) instead of size-limited JSON.
+        """
+        if snapshot:
+            graph = self.graph if isinstance(self.graph, CompactDependencyGraph) else self.graph.compact()
+            graph.save(output_path)
+            logger.info(f"Saved dependency graph snapshot to {output_path}")
+            return
 
-    def save_graph(self, output_path: str, max_size_kb: int = 250) -> None:
-        """Save the dependency graph to a file"""
         json_str = self.serialize_graph(max_size_kb)
 
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -629,23 +708,85 @@ class DependencyGraphGenerator:
     def export_to_arrows_app(self, output_path: str, max_size_kb: int = 250) -> None:
         """Export dependency graph in Arrows.app compatible format"""
         arrows_data = self._convert_to_arrows_format()
+        node_index = {node['id']: i for i, node in enumerate(arrows_data['nodes'])}
+        endpoints = [(node_index[rel['startNodeId']], node_index[rel['endNodeId']])
+                     for rel in arrows_data['relationships']]
 
         # Apply size constraints
-        json_str = json.dumps(arrows_data, indent=2)
-        size_kb = len(json_str.encode('utf-8')) / 1024
-
-        if size_kb > max_size_kb:
-            logger.warning(f"Arrows export size ({size_kb:.1f}KB) exceeds limit ({max_size_kb}KB), truncating")
-            # Truncate edges to fit within size limit
-            max_edges = int(len(arrows_data['relationships']) * (max_size_kb / size_kb) * 0.9)
-            arrows_data['relationships'] = arrows_data['relationships'][:max_edges]
-            json_str = json.dumps(arrows_data, indent=2)
+        json_str = self._dump_within_budget(arrows_data, 'nodes', 'relationships', endpoints, max_size_kb)
 
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(json_str)
 
         logger.info(f"Exported dependency graph to Arrows.app format: {output_path}")
 
+    def _dump_within_budget(self, document: Dict[str, Any], nodes_key: str, edges_key: str,
+                            endpoints: List[Tuple[Optional[int], Optional[int]]], max_size_kb: int) -> str:
+        """Encode document as compact JSON of at most max_size_kb, pruning the least important files
+
+        document[nodes_key] holds one element per graph node in graph order, and
+        endpoints the node indexes of each element of document[edges_key]. Every element is
+        encoded once and its size added up, so fitting the budget needs no re-encoding. If
+        the whole graph does not fit, nodes are taken in PageRank order, each followed by
+        its edges to the nodes already taken, until the next node and its edges would
+        overflow, so the output is the graph induced by the top-ranked files. The kept
+        elements are written most important first, and document['metadata'] records the
+        truncation.
+        """
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        nodes = [encode(item) for item in document[nodes_key]]
+        edges = [encode(item) for item in document[edges_key]]
+        budget = max_size_kb * 1024
+
+        def assemble(node_parts: List[str], edge_parts: List[str]) -> str:
+            parts = []
+            for key, value in document.items():
+                if key == nodes_key:
+                    value_json = '[' + ','.join(node_parts) + ']'
+                elif key == edges_key:
+                    value_json = '[' + ','.join(edge_parts) + ']'
+                else:
+                    value_json = encode(value)
+                parts.append(encode(key) + ':' + value_json)
+            return '{' + ','.join(parts) + '}'
+
+        # Each element costs its encoding plus a separating comma (ASCII, so characters are bytes)
+        elements_size = sum(map(len, nodes)) + sum(map(len, edges)) + len(nodes) + len(edges)
+        if len(assemble([], [])) + elements_size <= budget:
+            return assemble(nodes, edges)
+
+        metadata = document['metadata']
+        metadata.update(truncated=True, ranking='pagerank',
+                        serialized_nodes=len(nodes), serialized_edges=len(edges))
+        remaining = budget - len(assemble([], []))
+
+        scores = self.graph.pagerank()
+        paths = list(self.graph.nodes)
+        order = sorted(range(len(nodes)), key=lambda i: -scores.get(paths[i], 0.0))
+        position = [0] * len(nodes)
+        for rank, i in enumerate(order):
+            position[i] = rank
+        # An edge can be written once both of its files have been taken
+        edges_at: Dict[int, List[int]] = defaultdict(list)
+        for edge_id, (source, target) in enumerate(endpoints):
+            if source is not None and target is not None:
+                edges_at[max(position[source], position[target])].append(edge_id)
+
+        kept_nodes, kept_edges = [], []
+        for rank, i in enumerate(order):
+            node_edges = [edges[edge_id] for edge_id in edges_at.get(rank, ())]
+            cost = len(nodes[i]) + 1 + sum(len(edge) + 1 for edge in node_edges)
+            if cost > remaining:
+                break
+            remaining -= cost
+            kept_nodes.append(nodes[i])
+            kept_edges.extend(node_edges)
+
+        metadata.update(serialized_nodes=len(kept_nodes), serialized_edges=len(kept_edges))
+        logger.warning(f"Graph exceeds size limit ({max_size_kb}KB), keeping the {len(kept_nodes)} most important "
+                       f"of {len(nodes)} files and {len(kept_edges)} of {len(edges)} edges")
+        return assemble(kept_nodes, kept_edges)
+
     def _convert_to_arrows_format(self) -> Dict[str, Any]:
         """Convert dependency graph to Arrows.app compatible format"""
         arrows_data = {
@@ -751,8 +892,14 @@ class DependencyGraphGenerator:
 
         return color_map.get(file_type.lower(), '#CCCCCC')  # Default gray
 
-def generate_dependency_graph(schema_file: str, output_file: str) -> None:
-    """Generate dependency graph from schema file"""
+def generate_dependency_graph(schema_file: str, output_file: str, base_dir: Optional[str] = None,
+                              snapshot_file: Optional[str] = None) -> None:
+    """Generate dependency graph from schema file
+
+    base_dir is the scanned directory the schema's paths are relative to (default: the
+    current directory). snapshot_file, if given, also receives a binary snapshot of the
+    whole graph.
+    """
     logger.info(f"Generating dependency graph from {schema_file}")
 
     # Load schema data
@@ -761,10 +908,12 @@ def generate_dependency_graph(schema_file: str, output_file: str) -> None:
 
     # Generate dependency graph
     generator = DependencyGraphGenerator()
-    graph = generator.generate_from_schema(schema_data)
+    graph = generator.generate_from_schema(schema_data, base_dir=base_dir)
 
     # Save graph
     generator.save_graph(output_file)
+    if snapshot_file:
+        generator.save_graph(snapshot_file, snapshot=True)
 
     # Log statistics
     cycles = graph.detect_cycles()
@@ -780,6 +929,9 @@ if __name__ == "__main__":
     parser.add_argument("schema_file", help="Path to repo-schema.json file")
     parser.add_argument("output_file", help="Path to output dependency graph file")
     parser.add_argument("--max-size-kb", type=int, default=250, help="Maximum graph size in KB")
+    parser.add_argument("--base-dir", help="Directory the schema was generated from (default: current directory)")
+    parser.add_argument("--snapshot", help="Also write a binary snapshot of the whole graph to this path")
 
     args = parser.parse_args()
-    generate_dependency_graph(args.schema_file, args.output_file)
\ No newline at end of file
+    generate_dependency_graph(args.schema_file, args.output_file, base_dir=args.base_dir,
+                              snapshot_file=args.snapshot)
\ No newline at end of file
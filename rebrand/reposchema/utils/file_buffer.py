@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+File Buffer for Repository Schema Generator
+
+Reads a file once into a buffer that every per-file stage (binary sniffing, decoding,
+summary extraction, content hashing) works from. Large files are memory-mapped instead of
+copied into the process.
+"""
+
+import os
+import mmap
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Files at least this large are mmap'd rather than read
+MMAP_THRESHOLD = 256 * 1024
+
+# Bytes inspected when deciding if a file is UTF-8 text
+SNIFF_SIZE = 512
+
+Buffer = Union[bytes, mmap.mmap]
+
+@contextmanager
+def open_file_buffer(file_path: str, size: Optional[int] = None) -> Iterator[Buffer]:
+    """Yield the whole file as bytes, or as a read-only mmap for large files.
+
+    size is the caller's stat size, used to pick the strategy without another stat. The
+    buffer is only valid inside the with block.
+    """
+    with open(file_path, 'rb') as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        mapped = None
+        if size >= MMAP_THRESHOLD:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                # e.g. the file was truncated since it was stat'ed, or is not mappable
+                logger.debug(f"Could not mmap {file_path}, reading instead: {e}")
+
+        if mapped is None:
+            yield f.read()
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+def sniff_text(buffer: Buffer) -> bool:
+    """Check that the first SNIFF_SIZE bytes decode as UTF-8"""
+    try:
+        buffer[:SNIFF_SIZE].decode('utf-8')
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def decode_text(buffer: Buffer) -> str:
+    """Decode a buffer the way open(path, 'r', encoding='utf-8', errors='ignore').read() would"""
+    text = str(buffer, 'utf-8', 'ignore')
+    if '\r' in text:
+        # Universal newlines, as in text-mode reads
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+File Manifest for Repository Schema Generator
+
+Persists per-file stat data, content hashes, extracted metadata and (for source files)
+imports/exports between runs so that unchanged files can be skipped on re-scan
+(incremental updates).
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Bump when metadata extraction changes so stale cached results are discarded
+MANIFEST_VERSION = 4
+MANIFEST_FILENAME = "repo-schema.manifest"
+
+def compute_content_hash(file_path: str) -> Optional[str]:
+    """Compute the git blob SHA-1 of a file (matches `git hash-object`)"""
+    try:
+        size = os.path.getsize(file_path)
+        digest = hashlib.sha1(b"blob %d\0" % size)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError as e:
+        logger.warning(f"Could not hash {file_path}: {e}")
+        return None
+
+def hash_bytes(data: bytes) -> str:
+    """Compute the git blob SHA-1 of an in-memory buffer"""
+    digest = hashlib.sha1(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+class FileManifest:
+    """Tracks mtime/size/content hash and cached metadata per relative file path.
+
+    The manifest is stored as JSON lines: a header line followed by one record per file,
+    so it can be written incrementally and read without holding two copies in memory.
+    """
+
+    def __init__(self, base_dir: str):
+        self.base_dir = os.path.abspath(base_dir)
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.current: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"reused": 0, "rehashed": 0, "extracted": 0}
+        self._spool = None
+        self._spool_path = None
+
+    @classmethod
+    def load(cls, manifest_path: str, base_dir: str) -> 'FileManifest':
+        """Load a manifest from disk, returning an empty one if missing or incompatible"""
+        manifest = cls(base_dir)
+        if not os.path.exists(manifest_path):
+            return manifest
+
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline() or '{}')
+                if header.get('version') != MANIFEST_VERSION or header.get('base_dir') != manifest.base_dir:
+                    logger.info(f"Ignoring incompatible manifest at {manifest_path}")
+                    return manifest
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        manifest.previous[record.pop('path')] = record
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read manifest {manifest_path}: {e}")
+            manifest.previous = {}
+
+        logger.info(f"Loaded manifest with {len(manifest.previous)} entries from {manifest_path}")
+        return manifest
+
+    def lookup(self, rel_path: str, stat_result: os.stat_result, file_path: Optional[str] = None,
+               require_dependencies: bool = False) -> Optional[Dict[str, Any]]:
+        """Return cached metadata if the file is unchanged, recording it in the new manifest.
+
+        Files whose mtime and size match are reused on the stat alone. When the stat differs
+        but file_path is given, the content hash is compared before re-extracting. With
+        require_dependencies, entries recorded without imports/exports are not reused.
+        """
+        previous = self.previous.get(rel_path)
+        if previous is None or (require_dependencies and 'dependencies' not in previous):
+            return None
+
+        if previous['mtime_ns'] == stat_result.st_mtime_ns and previous['size'] == stat_result.st_size:
+            self.stats["reused"] += 1
+            return self._store(rel_path, previous)
+
+        if file_path is None or previous.get('hash') is None or previous['size'] != stat_result.st_size:
+            return None
+
+        content_hash = compute_content_hash(file_path)
+        if content_hash != previous['hash']:
+            return None
+
+        # Content is unchanged (e.g. touched or re-checked-out); only the timestamp moved
+        metadata = dict(previous['metadata'])
+        if metadata.get('modified'):
+            metadata['modified'] = datetime_from_stat(stat_result)
+        self.stats["rehashed"] += 1
+        return self._store(rel_path, self._entry(stat_result, content_hash, metadata, previous.get('dependencies')))
+
+    def lookup_hash(self, rel_path: str, content_hash: str,
+                    require_dependencies: bool = False) -> Optional[Dict[str, Any]]:
+        """Return cached metadata if the recorded content hash matches (e.g. a git blob SHA)"""
+        previous = self.previous.get(rel_path)
+        if previous is None or previous.get('hash') != content_hash:
+            return None
+        if require_dependencies and 'dependencies' not in previous:
+            return None
+        self.stats["reused"] += 1
+        return self._store(rel_path, previous)
+
+    def record(self, rel_path: str, stat_result: os.stat_result, content_hash: Optional[str],
+               metadata: Dict[str, Any], dependencies: Optional[Dict[str, Any]] = None) -> None:
+        """Record freshly extracted metadata (and imports/exports, if analyzed) for a file"""
+        self._store(rel_path, self._entry(stat_result, content_hash, metadata, dependencies))
+        self.stats["extracted"] += 1
+
+    def spool(self, manifest_path: str) -> None:
+        """Write records to disk as they are made instead of holding them until save
+
+        Once written, a record's metadata is dropped from memory (only its stat data, hash
+        and imports/exports stay), so a streamed scan does not keep every file's metadata.
+        """
+        self._spool_path = manifest_path + '.tmp'
+        self._spool = open(self._spool_path, 'w', encoding='utf-8')
+        self._write_header(self._spool)
+
+    def _store(self, rel_path: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a record to the new manifest, returning its metadata"""
+        self.current[rel_path] = record
+        metadata = record['metadata']
+        if self._spool is not None:
+            self._spool.write(json.dumps({'path': rel_path, **record}) + '\n')
+            # The record object is kept (changed_paths compares it with previous), minus its metadata
+            del record['metadata']
+        return metadata
+
+    def cached_dependencies(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        """Imports/exports recorded for a file in this scan, if any"""
+        current = self.current.get(rel_path)
+        return current.get('dependencies') if current is not None else None
+
+    @staticmethod
+    def _entry(stat_result: os.stat_result, content_hash: Optional[str],
+               metadata: Dict[str, Any], dependencies: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        entry = {
+            'mtime_ns': stat_result.st_mtime_ns,
+            'size': stat_result.st_size,
+            'hash': content_hash,
+            'metadata': metadata
+        }
+        if dependencies is not None:
+            entry['dependencies'] = dependencies
+        return entry
+
+    def _write_header(self, f) -> None:
+        f.write(json.dumps({'version': MANIFEST_VERSION, 'base_dir': self.base_dir}) + '\n')
+
+    def removed_paths(self):
+        """Paths present in the previous manifest but not seen in this scan"""
+        return [path for path in self.previous if path not in self.current]
+
+    def changed_paths(self):
+        """Paths seen in this scan whose record is new or changed since the previous manifest"""
+        return [path for path, record in self.current.items() if record is not self.previous.get(path)]
+
+    def save(self, manifest_path: str) -> None:
+        """Write the manifest for the files seen in this scan (atomically)"""
+        tmp_path = manifest_path + '.tmp'
+        if self._spool is not None:
+            # Every record was written as it was made
+            self._spool.close()
+            self._spool = None
+            os.replace(self._spool_path, manifest_path)
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                self._write_header(f)
+                for rel_path, record in self.current.items():
+                    f.write(json.dumps({'path': rel_path, **record}) + '\n')
+            os.replace(tmp_path, manifest_path)
+        logger.info(f"Saved manifest with {len(self.current)} entries to {manifest_path}")
+
+def datetime_from_stat(stat_result: os.stat_result) -> str:
+    """Format a stat mtime the same way get_file_metadata does"""
+    return datetime.fromtimestamp(stat_result.st_mtime).isoformat()
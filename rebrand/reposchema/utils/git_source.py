@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Git Source for Repository Schema Generator
+
+Builds the file list for a scan from the git index instead of walking the directory
+tree. Tracked files come with their index blob SHA so unchanged files can be matched
+against the manifest of the previous run without being opened or stat'ed.
+"""
+
+import os
+import subprocess
+import logging
+from typing import Dict, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Index entries with this mode are submodule gitlinks, not files
+GITLINK_MODE = "160000"
+
+def _run_git(base_dir: str, args: List[str], timeout: int = 120) -> Optional[bytes]:
+    """Run a git command in base_dir, returning stdout or None on failure"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", base_dir] + args,
+            capture_output=True,
+            timeout=timeout
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"git {' '.join(args)} failed: {e}")
+        return None
+
+    if result.returncode != 0:
+        logger.warning(f"git {' '.join(args)} failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+        return None
+    return result.stdout
+
+def _split_z(output: bytes) -> List[str]:
+    """Split NUL-terminated git output into paths"""
+    return [os.fsdecode(item) for item in output.split(b"\0") if item]
+
+def is_git_checkout(base_dir: str) -> bool:
+    """Check if base_dir is inside a git working tree"""
+    output = _run_git(base_dir, ["rev-parse", "--is-inside-work-tree"], timeout=10)
+    return output is not None and output.strip() == b"true"
+
+def list_git_files(base_dir: str) -> Optional[Dict[str, Optional[str]]]:
+    """List tracked and untracked-not-ignored files under base_dir.
+
+    Returns a dict of base_dir-relative paths (forward slashes) to the index blob SHA,
+    or None for files that are untracked or modified in the working tree. Returns None
+    if git is unavailable or base_dir is not a git checkout.
+    """
+    staged = _run_git(base_dir, ["ls-files", "--stage", "-z"])
+    if staged is None:
+        return None
+
+    files: Dict[str, Optional[str]] = {}
+    for record in _split_z(staged):
+        # "<mode> <sha> <stage>\t<path>"
+        info, _, path = record.partition("\t")
+        mode, sha, _ = info.split(" ", 2)
+        if mode == GITLINK_MODE:
+            continue
+        # Unmerged paths appear once per stage; the working tree copy is what we scan
+        files[path] = None if path in files else sha
+
+    modified = _run_git(base_dir, ["ls-files", "--modified", "-z"])
+    deleted = _run_git(base_dir, ["ls-files", "--deleted", "-z"])
+    untracked = _run_git(base_dir, ["ls-files", "--others", "--exclude-standard", "-z"])
+    if modified is None or deleted is None or untracked is None:
+        return None
+
+    for path in _split_z(deleted):
+        files.pop(path, None)
+    for path in _split_z(modified):
+        if path in files:
+            files[path] = None
+    for path in _split_z(untracked):
+        files[path] = None
+
+    logger.info(f"git listed {len(files)} files under {base_dir}")
+    return files
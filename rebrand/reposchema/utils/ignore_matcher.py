@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Ignore Matcher for Repository Schema Generator
+
+Compiled gitignore-style matcher. Literal basenames and suffix globs (``*.pyc``) are
+looked up in hash tables, the remaining patterns are compiled into a single regex, and
+directory decisions are memoized so a path's ancestors are never re-matched.
+"""
+
+import re
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pathspec import util as pathspec_util
+
+logger = logging.getLogger(__name__)
+
+# 'gitignore' is the non-deprecated name in pathspec >= 1.0; older releases only register 'gitwildmatch'
+try:
+    _PATTERN_CLASS = pathspec_util.lookup_pattern('gitignore')
+except KeyError:
+    _PATTERN_CLASS = pathspec_util.lookup_pattern('gitwildmatch')
+
+_GLOB_CHARS = frozenset('*?[\\')
+_NAMED_GROUP = re.compile(r'\(\?P<[^>]+>')
+# Trailing alternatives that let a pathspec regex also match everything below the path
+_DESCENDANT_SUFFIXES = (('(?:/.*)?$', '/?'), ('/.*$', '/'))
+
+# A rule hit: (pattern index, include). Higher index wins, include=False is a negation.
+Rule = Tuple[int, bool]
+
+def _is_literal(text: str) -> bool:
+    return bool(text) and not (_GLOB_CHARS & set(text))
+
+def _self_regex(regex: str, body: str) -> str:
+    """Restrict a pathspec regex to the path itself
+
+    Ancestors are matched separately (is_dir_ignored), so a rule must not also match the
+    contents of a matched directory, or a later '!dir/' could not re-include them. Patterns
+    ending in '**' name the contents themselves and are left alone, as is the match-all '.'.
+    """
+    if body.endswith('**') or regex == '.':
+        return regex
+    for suffix, replacement in _DESCENDANT_SUFFIXES:
+        if regex.endswith(suffix):
+            regex = regex[:-len(suffix)] + replacement
+            break
+    return f"(?:{regex})\\Z"
+
+class IgnoreMatcher:
+    """Matches base-relative, '/'-separated paths against gitignore patterns.
+
+    Semantics follow gitwildmatch: the last matching pattern wins, ``!pattern`` re-includes,
+    a trailing ``/`` only matches directories, and (as in git) nothing below an ignored
+    directory can be re-included.
+
+    Matchers for nested ignore files are stacked with child(): a child only sees paths
+    below its base directory, matches them relative to it, and defers to its parent when
+    none of its own patterns apply.
+
+    An outer matcher (the tool's own exclusions) is checked independently of the stack:
+    a path it ignores stays ignored whatever the .gitignore chain says, so a nested
+    ``!pattern`` cannot bring it back. Children share their parent's outer matcher.
+    """
+
+    def __init__(self, patterns: Iterable[str], base: str = '', parent: Optional['IgnoreMatcher'] = None,
+                 outer: Optional['IgnoreMatcher'] = None):
+        self.base = base
+        self.parent = parent
+        self.outer = outer
+        self._base_prefix = base + '/' if base else ''
+        self.patterns: List[str] = []
+        # Literal basenames and suffixes, split by whether the rule also applies to files
+        self._file_names: Dict[str, Rule] = {}
+        self._dir_names: Dict[str, Rule] = {}
+        self._file_suffixes: Dict[str, Rule] = {}
+        self._dir_suffixes: Dict[str, Rule] = {}
+        self._suffix_lengths: List[int] = []
+        self._regex_rules: List[Tuple[int, bool, str]] = []
+        self._regex = None
+        self._regex_includes: Dict[str, Rule] = {}
+        self._max_regex_index = -1
+        self._dir_cache: Dict[str, bool] = {}
+
+        for pattern in patterns:
+            self._add_pattern(pattern)
+        self._compile()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def child(self, base: str, patterns: Iterable[str]) -> 'IgnoreMatcher':
+        """Create a matcher for an ignore file in the base-relative directory base"""
+        return IgnoreMatcher(patterns, base=base, parent=self, outer=self.outer)
+
+    def _add_pattern(self, pattern: str) -> None:
+        regex, include = _PATTERN_CLASS.pattern_to_regex(pattern)
+        if include is None:
+            return  # Comment or blank line
+
+        index = len(self.patterns)
+        self.patterns.append(pattern)
+        rule = (index, include)
+
+        body = pattern[1:] if pattern.startswith('!') else pattern
+        dir_only = body.endswith('/')
+        body = body[:-1] if dir_only else body
+
+        if '/' not in body and _is_literal(body):
+            if not dir_only:
+                self._file_names[body] = rule
+            self._dir_names[body] = rule
+        elif '/' not in body and body.startswith('*') and _is_literal(body[1:]):
+            suffix = body[1:]
+            if not dir_only:
+                self._file_suffixes[suffix] = rule
+            self._dir_suffixes[suffix] = rule
+            if len(suffix) not in self._suffix_lengths:
+                self._suffix_lengths.append(len(suffix))
+        else:
+            self._regex_rules.append((index, include, _self_regex(regex, body)))
+
+    def _compile(self) -> None:
+        if not self._regex_rules:
+            return
+        # Alternatives are tried left to right, so listing the newest rule first makes the
+        # first successful alternative the last matching pattern.
+        alternatives = []
+        for index, include, regex in reversed(self._regex_rules):
+            group = f"r{index}"
+            self._regex_includes[group] = (index, include)
+            alternatives.append(f"(?P<{group}>{_NAMED_GROUP.sub('(?:', regex)})")
+        self._regex = re.compile('|'.join(alternatives))
+        self._max_regex_index = self._regex_rules[-1][0]
+
+    def _last_rule(self, rel_path: str, is_dir: bool) -> Optional[Rule]:
+        """Find the highest-index rule matching the path itself (ancestors are not considered)"""
+        name = rel_path.rpartition('/')[2]
+        best = (self._dir_names if is_dir else self._file_names).get(name)
+
+        suffixes = self._dir_suffixes if is_dir else self._file_suffixes
+        for length in self._suffix_lengths:
+            if length <= len(name):
+                rule = suffixes.get(name[-length:])
+                if rule is not None and (best is None or rule[0] > best[0]):
+                    best = rule
+
+        if self._regex is not None and (best is None or best[0] < self._max_regex_index):
+            match = self._regex.match(rel_path + '/' if is_dir else rel_path)
+            if match is not None:
+                rule = self._regex_includes[match.lastgroup]
+                if best is None or rule[0] > best[0]:
+                    best = rule
+        return best
+
+    def _decide(self, rel_path: str, is_dir: bool) -> bool:
+        rule = self._last_rule(rel_path[len(self._base_prefix):], is_dir) if self.patterns else None
+        if rule is not None:
+            return rule[1]
+        return self.parent is not None and self.parent._decide(rel_path, is_dir)
+
+    def is_dir_ignored(self, rel_dir: str) -> bool:
+        """Check a directory, memoizing the decision for every prefix along the way"""
+        cached = self._dir_cache.get(rel_dir)
+        if cached is not None:
+            return cached
+        parent = rel_dir.rpartition('/')[0]
+        # Directories at or above base were walked into, so they are known not to be ignored
+        below_base = len(parent) > len(self.base)
+        ignored = ((self.outer is not None and self.outer.is_dir_ignored(rel_dir))
+                   or (below_base and self.is_dir_ignored(parent)) or self._decide(rel_dir, True))
+        self._dir_cache[rel_dir] = ignored
+        return ignored
+
+    def match(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Check if a base-relative '/'-separated path is ignored"""
+        if is_dir:
+            return self.is_dir_ignored(rel_path)
+        if self.outer is not None and self.outer.match(rel_path, False):
+            return True
+        parent = rel_path.rpartition('/')[0]
+        if len(parent) > len(self.base) and self.is_dir_ignored(parent):
+            return True
+        return self._decide(rel_path, False)
+
+    def match_file(self, rel_path: str) -> bool:
+        """PathSpec-compatible check for a file path"""
+        return self.match(rel_path, False)
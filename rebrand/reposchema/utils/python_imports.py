@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Python Import Extraction for Repository Schema
+
+Finds the modules a Python file imports from its syntax tree, so multi-line and
+parenthesized imports are picked up and import-like text in strings and comments is not.
+Files that do not parse (e.g. Python 2 sources) fall back to a tokenizer scan. Relative
+imports are resolved against the importing file's package path. Parse results are cached
+by content hash, so analyzing the same content again (the code summary and the dependency
+analyzer both need it) costs a hash.
+"""
+
+import os
+import io
+import ast
+import sys
+import hashlib
+import tokenize
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+# (level, module, names): level is the number of leading dots of a relative import, module
+# the dotted module after them ('' for "from . import x") and names the imported names
+ImportStatement = Tuple[int, str, Tuple[str, ...]]
+
+# Parse results kept, by content hash
+PARSE_CACHE_SIZE = 4096
+
+# sys.stdlib_module_names is Python 3.10+; older versions use the common modules
+STDLIB_MODULES = frozenset(getattr(sys, 'stdlib_module_names', ())) or frozenset({
+    '__future__', 'abc', 'argparse', 'array', 'ast', 'asyncio', 'base64', 'bisect', 'calendar',
+    'cgi', 'codecs', 'collections', 'concurrent', 'configparser', 'contextlib', 'copy', 'csv',
+    'ctypes', 'dataclasses', 'datetime', 'decimal', 'difflib', 'email', 'enum', 'errno',
+    'fnmatch', 'fractions', 'functools', 'gc', 'getpass', 'glob', 'gzip', 'hashlib', 'heapq',
+    'hmac', 'html', 'http', 'importlib', 'inspect', 'io', 'ipaddress', 'itertools', 'json',
+    'locale', 'logging', 'math', 'mimetypes', 'mmap', 'multiprocessing', 'operator', 'os',
+    'pathlib', 'pickle', 'platform', 'plistlib', 'pprint', 'queue', 'random', 're', 'secrets',
+    'select', 'shlex', 'shutil', 'signal', 'socket', 'sqlite3', 'ssl', 'stat', 'statistics',
+    'string', 'struct', 'subprocess', 'sys', 'tempfile', 'textwrap', 'threading', 'time',
+    'timeit', 'tokenize', 'traceback', 'types', 'typing', 'unittest', 'urllib', 'uuid',
+    'warnings', 'weakref', 'wsgiref', 'xml', 'zipfile', 'zlib', 'zoneinfo',
+})
+
+_parse_cache: 'OrderedDict[bytes, Tuple[ImportStatement, ...]]' = OrderedDict()
+
+def parse_imports(content: str) -> Tuple[ImportStatement, ...]:
+    """Import statements of a Python source, in source order (cached by content hash)"""
+    key = hashlib.sha1(content.encode('utf-8', 'surrogatepass')).digest()
+    statements = _parse_cache.get(key)
+    if statements is not None:
+        _parse_cache.move_to_end(key)
+        return statements
+
+    try:
+        statements = tuple(_imports_from_ast(ast.parse(content)))
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        statements = tuple(_imports_from_tokens(content))
+
+    _parse_cache[key] = statements
+    if len(_parse_cache) > PARSE_CACHE_SIZE:
+        _parse_cache.popitem(last=False)
+    return statements
+
+def _imports_from_ast(tree: ast.AST) -> List[ImportStatement]:
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.extend(((node.lineno, node.col_offset, i), (0, alias.name, ()))
+                         for i, alias in enumerate(node.names))
+        elif isinstance(node, ast.ImportFrom):
+            found.append(((node.lineno, node.col_offset, 0),
+                          (node.level or 0, node.module or '', tuple(alias.name for alias in node.names))))
+    # ast.walk is breadth-first; report imports in source order
+    found.sort(key=lambda item: item[0])
+    return [statement for _, statement in found]
+
+def _imports_from_tokens(content: str) -> List[ImportStatement]:
+    """Best-effort import scan for sources the parser rejects
+
+    Only 'import' and 'from' at the start of a logical line count, so strings and
+    comments are skipped; parenthesized and backslash-continued imports span lines.
+    """
+    statements = []
+    line: List[tokenize.TokenInfo] = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(content).readline):
+            if token.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+                statements.extend(_statement_from_tokens(line))
+                line = []
+            elif token.type not in (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT):
+                line.append(token)
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return statements
+
+def _statement_from_tokens(tokens: List[tokenize.TokenInfo]) -> List[ImportStatement]:
+    words = [token.string for token in tokens]
+    if not words or words[0] not in ('import', 'from'):
+        return []
+
+    def dotted_names(parts: List[str]) -> List[str]:
+        # Split "a.b as c, d" into names, dropping aliases and parentheses
+        names, current, skip = [], [], False
+        for part in parts + [',']:
+            if part == ',':
+                if current:
+                    names.append(''.join(current))
+                current, skip = [], False
+            elif part == 'as':
+                skip = True
+            elif not skip and part not in ('(', ')'):
+                current.append(part)
+        return names
+
+    if words[0] == 'import':
+        return [(0, name, ()) for name in dotted_names(words[1:])]
+    if 'import' not in words:
+        return []
+    split = words.index('import')
+    module = ''.join(words[1:split])
+    level = len(module) - len(module.lstrip('.'))
+    return [(level, module[level:], tuple(dotted_names(words[split + 1:])))]
+
+def package_of(file_path: str) -> List[str]:
+    """Dotted package components of a file, by its path relative to the repository root"""
+    directory = os.path.dirname(os.path.normpath(file_path))
+    return [part for part in directory.split(os.sep) if part and part != '.']
+
+def resolve_import(statement: ImportStatement, file_path: Optional[str]) -> List[str]:
+    """Absolute module names an import statement refers to
+
+    'import a.b' gives a.b and 'from a.b import c' gives a.b. A relative import is
+    resolved against file_path's package ('from . import c' gives the submodule
+    package.c); without file_path, or reaching above the top-level package, it gives
+    nothing.
+    """
+    level, module, names = statement
+    if level == 0:
+        return [module] if module else []
+    if file_path is None:
+        return []
+    package = package_of(file_path)
+    if level - 1 > len(package):
+        return []
+    base = package[:len(package) - (level - 1)]
+    if module:
+        return ['.'.join(base + [module])]
+    return ['.'.join(base + [name]) for name in names if name != '*']
+
+def is_stdlib_module(module: str) -> bool:
+    """Check whether a dotted module name belongs to the standard library"""
+    return module.split('.', 1)[0] in STDLIB_MODULES
+
+def extract_python_imports(content: str, file_path: Optional[str] = None,
+                           include_stdlib: bool = False) -> List[str]:
+    """Modules a Python source imports, deduplicated in source order
+
+    Relative imports are resolved against file_path (a path relative to the repository
+    root). Standard library modules are left out unless include_stdlib; relative
+    imports are always kept, since a package named like a stdlib module ('platform',
+    'email', ...) is part of the repository.
+    """
+    modules = []
+    for statement in parse_imports(content):
+        for module in resolve_import(statement, file_path):
+            if include_stdlib or statement[0] or not is_stdlib_module(module):
+                modules.append(module)
+    return list(dict.fromkeys(modules))
+
+def imports_as_written(content: str) -> List[str]:
+    """Imported modules as they appear in the source (relative ones with their dots), deduplicated"""
+    return list(dict.fromkeys('.' * level + module for level, module, _ in parse_imports(content)
+                              if level or module))
@@ -8,9 +8,13 @@ including collection management, knowledge graph storage, and search operations.
 
 import os
 import json
+import uuid
+import array
 import hashlib
 import logging
-from typing import Optional, Dict, List, Any, Tuple
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Tuple, Iterable
 from pathlib import Path
 
 try:
@@ -24,16 +28,37 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Points per upsert request, and upsert requests in flight, for batched storage
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_PARALLEL_BATCHES = 1
+
+def point_id_for(file_path: str) -> str:
+    """Stable point ID for a file: Qdrant accepts UUIDs (or integers), so use the first
+    128 bits of the path's SHA-256 as one"""
+    return str(uuid.UUID(hashlib.sha256(file_path.encode()).hexdigest()[:32]))
+
+def content_hash(vector: List[float], payload: Dict[str, Any]) -> str:
+    """Hash of a point's vector and payload, stored in the payload to detect unchanged points"""
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode())
+    digest.update(array.array('d', vector).tobytes())
+    return digest.hexdigest()
+
 class QdrantManager:
     """Manages Qdrant vector database operations for repository schemas"""
 
-    def __init__(self, url: str = "http://localhost:6333", api_key: Optional[str] = None):
+    def __init__(self, url: str = "http://localhost:6333", api_key: Optional[str] = None,
+                 location: Optional[str] = None):
+        """Connect to the server at url, or pass location=":memory:" for qdrant-client's
+        in-process mode (e.g. for tests and benchmarks)."""
         if not QDRANT_AVAILABLE:
             raise ImportError("qdrant-client not installed. Run: pip install qdrant-client")
 
         self.url = url
         self.api_key = api_key
-        self.client = QdrantClient(url=url, api_key=api_key)
+        if location:
+            self.client = QdrantClient(location=location)
+        else:
+            self.client = QdrantClient(url=url, api_key=api_key)
 
     def generate_collection_name(self, project_name: str, workspace_path: str) -> str:
         """Generate unique collection name for CIR project"""
@@ -89,26 +114,10 @@ class QdrantManager:
                              metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Store knowledge graph data in Qdrant collection"""
         try:
-            # Generate unique ID for the point
-            point_id = hashlib.sha256(file_path.encode()).hexdigest()
-
-            # Prepare payload with knowledge graph
-            payload = {
-                "filePath": file_path,
-                "knowledgeGraph": knowledge_graph,
-                **(metadata or {})
-            }
-
             # Upsert point
             self.client.upsert(
                 collection_name=collection_name,
-                points=[
-                    models.PointStruct(
-                        id=point_id,
-                        vector=vector,
-                        payload=payload
-                    )
-                ]
+                points=[self._knowledge_graph_point(file_path, vector, knowledge_graph, metadata)]
             )
 
             logger.info(f"Stored knowledge graph for: {file_path}")
@@ -118,6 +127,147 @@ class QdrantManager:
             logger.error(f"Failed to store knowledge graph for {file_path}: {e}")
             return False
 
+    def store_knowledge_graph_batch(self, collection_name: str, points: Iterable[Dict[str, Any]],
+                                    batch_size: int = DEFAULT_BATCH_SIZE,
+                                    parallel: int = DEFAULT_PARALLEL_BATCHES,
+                                    wait: bool = False,
+                                    existing: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Any]:
+        """Store many knowledge graphs with one upsert request per batch of points
+
+        points yields dicts with the arguments of store_knowledge_graph (file_path, vector,
+        knowledge_graph and optionally metadata); it is consumed lazily, batch_size points
+        at a time, with up to parallel upsert requests in flight. With wait=False Qdrant
+        acknowledges each request without waiting for the points to be indexed.
+
+        existing maps file paths to the content hashes already stored (see
+        stored_content_hashes); points whose hash matches are skipped.
+
+        A point that cannot be stored does not abort the batch: a failed request is retried
+        point by point, and the points that still fail are reported. Returns
+        {"stored": count, "skipped": count, "failed": [{"file_path": ..., "error": ...}, ...]}.
+        """
+        report = {"stored": 0, "skipped": 0, "failed": []}
+        iterator = iter(points)
+        batch_size = max(1, batch_size)
+        parallel = max(1, parallel)
+
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            exhausted = False
+            while not exhausted:
+                # Build up to `parallel` batches, then send them concurrently
+                batches = []
+                while len(batches) < parallel:
+                    chunk = list(islice(iterator, batch_size))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    batch = self._build_batch(chunk, report, existing)
+                    if batch:
+                        batches.append(batch)
+
+                upserts = executor.map(lambda batch: self._upsert_batch(collection_name, batch, wait), batches)
+                for batch, error in zip(batches, upserts):
+                    if error is None:
+                        report["stored"] += len(batch)
+                    else:
+                        logger.warning(f"Batch upsert of {len(batch)} points failed, retrying one by one: {error}")
+                        self._upsert_one_by_one(collection_name, batch, report)
+
+        if report["failed"]:
+            logger.warning(f"Failed to store {len(report['failed'])} of "
+                           f"{report['stored'] + len(report['failed'])} knowledge graphs in {collection_name}")
+        logger.info(f"Stored {report['stored']} knowledge graphs in {collection_name}"
+                    f" ({report['skipped']} unchanged)")
+        return report
+
+    def stored_content_hashes(self, collection_name: str, page_size: int = 1024) -> Dict[str, Optional[str]]:
+        """Content hash of every point in a collection, by file path
+
+        Pages through the collection with scroll, fetching only the file path and hash
+        payload fields (no vectors). Points stored without a hash map to None.
+        """
+        hashes = {}
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=["filePath", "contentHash"],
+                with_vectors=False
+            )
+            for record in records:
+                payload = record.payload or {}
+                if "filePath" in payload:
+                    hashes[payload["filePath"]] = payload.get("contentHash")
+            if offset is None:
+                return hashes
+
+    def delete_knowledge_graphs(self, collection_name: str, file_paths: Iterable[str],
+                                batch_size: int = DEFAULT_BATCH_SIZE, wait: bool = False) -> int:
+        """Delete the points of the given files, batch_size per request; returns how many were deleted"""
+        point_ids = [point_id_for(file_path) for file_path in file_paths]
+        batch_size = max(1, batch_size)
+        deleted = 0
+        for start in range(0, len(point_ids), batch_size):
+            batch = point_ids[start:start + batch_size]
+            try:
+                self.client.delete(collection_name=collection_name,
+                                   points_selector=models.PointIdsList(points=batch), wait=wait)
+                deleted += len(batch)
+            except Exception as e:
+                logger.error(f"Failed to delete {len(batch)} points from {collection_name}: {e}")
+        if deleted:
+            logger.info(f"Deleted {deleted} knowledge graphs of removed files from {collection_name}")
+        return deleted
+
+    def _build_batch(self, points: List[Dict[str, Any]], report: Dict[str, Any],
+                     existing: Optional[Dict[str, Optional[str]]] = None) -> List[Tuple[str, Any]]:
+        """(file_path, PointStruct) pairs for the changed points, reporting those that cannot be built"""
+        batch = []
+        for point in points:
+            file_path = point.get("file_path", "")
+            try:
+                point_struct = self._knowledge_graph_point(
+                    file_path, point["vector"], point["knowledge_graph"], point.get("metadata"))
+            except Exception as e:
+                report["failed"].append({"file_path": file_path, "error": str(e)})
+                continue
+            if existing is not None and existing.get(file_path) == point_struct.payload["contentHash"]:
+                report["skipped"] += 1
+            else:
+                batch.append((file_path, point_struct))
+        return batch
+
+    def _upsert_batch(self, collection_name: str, batch: List[Tuple[str, Any]], wait: bool) -> Optional[Exception]:
+        try:
+            self.client.upsert(collection_name=collection_name, points=[point for _, point in batch], wait=wait)
+            return None
+        except Exception as e:
+            return e
+
+    def _upsert_one_by_one(self, collection_name: str, batch: List[Tuple[str, Any]],
+                           report: Dict[str, Any]) -> None:
+        for file_path, point in batch:
+            try:
+                self.client.upsert(collection_name=collection_name, points=[point])
+                report["stored"] += 1
+            except Exception as e:
+                logger.error(f"Failed to store knowledge graph for {file_path}: {e}")
+                report["failed"].append({"file_path": file_path, "error": str(e)})
+
+    @staticmethod
+    def _knowledge_graph_point(file_path: str, vector: List[float], knowledge_graph: Dict[str, Any],
+                               metadata: Optional[Dict[str, Any]] = None) -> 'models.PointStruct':
+        """Point holding a file's knowledge graph, with the content hash of its vector and payload"""
+        payload = {
+            "filePath": file_path,
+            "knowledgeGraph": knowledge_graph,
+            **(metadata or {})
+        }
+        payload["contentHash"] = content_hash(vector, payload)
+        return models.PointStruct(id=point_id_for(file_path), vector=vector, payload=payload)
+
     def store_enhanced_knowledge_graph(self, collection_name: str, file_path: str,
                                       vector: List[float], metadata: Dict[str, Any],
                                       ai_analysis: Optional[Dict[str, Any]] = None) -> bool:
@@ -127,7 +277,7 @@ class QdrantManager:
             schema = get_schema()
 
             # Generate unique ID for the point
-            point_id = hashlib.sha256(file_path.encode()).hexdigest()
+            point_id = point_id_for(file_path)
 
             # Create enhanced payload
             payload = schema.create_enhanced_payload(file_path, metadata, ai_analysis)
@@ -242,7 +392,7 @@ class QdrantManager:
             logger.error(f"Metadata search failed in collection {collection_name}: {e}")
             return []
 
-    def _convert_filters_to_qdrant(self, filters: Dict[str, Any]) -> models.Filter:
+    def _convert_filters_to_qdrant(self, filters: Dict[str, Any]) -> 'models.Filter':
         """Convert filter dict to Qdrant Filter object"""
         conditions = []
 
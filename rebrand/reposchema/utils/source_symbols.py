@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Source Symbol Extraction for Repository Schema
+
+Extracts a source file's symbols (imports, exports, classes, functions and the language's
+other declarations) into a SymbolRecord in a single pass over its text. The schema's code
+summary and the dependency graph node are both derived from the record, so each file is
+parsed once and the two outputs agree.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from .python_imports import extract_python_imports, imports_as_written
+except ImportError:
+    from python_imports import extract_python_imports, imports_as_written
+
+@dataclass
+class SymbolRecord:
+    """Symbols of one source file
+
+    dependencies are the modules (resolved, for Python) that the dependency graph links and
+    exports its 'kind:name' entries, for every import and declaration. imports, classes and
+    functions are the summary's lists, in summary form (e.g. 'Model(Base)', 'main(2p)') and
+    may stop at the length the summary shows; details holds the language's other summary
+    sections and tags its feature markers.
+    """
+    language: str
+    imports: List[str] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
+    exports: List[str] = field(default_factory=list)
+    classes: List[str] = field(default_factory=list)
+    functions: List[str] = field(default_factory=list)
+    details: Dict[str, List[str]] = field(default_factory=dict)
+    tags: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+# Common external JavaScript packages, left out of the dependency graph
+JS_EXTERNAL_PACKAGES = frozenset({
+    'react', 'react-dom', 'vue', 'angular', 'jquery', 'lodash', 'underscore',
+    'axios', 'fetch', 'express', 'mongoose', 'mongodb', 'mysql', 'postgres',
+    'redis', 'socket.io', 'webpack', 'babel', 'typescript', 'eslint',
+    'prettier', 'jest', 'mocha', 'chai', 'sinon', 'enzyme', 'testing-library',
+    'redux', 'mobx', 'rxjs', 'rxjs/operators', 'immutable', 'moment',
+    'date-fns', 'ramda', 'bluebird', 'q', 'async', 'co', 'thunkify',
+    'fs', 'path', 'os', 'crypto', 'http', 'https', 'url', 'querystring',
+    'events', 'stream', 'buffer', 'util', 'child_process', 'cluster',
+    'zlib', 'readline', 'repl', 'vm', 'v8', 'webassembly'
+})
+
+def _source_lines(content: str, comment_prefixes: Tuple[str, ...]):
+    """Stripped, non-empty lines that do not start with a comment"""
+    for line in content.split('\n'):
+        line = line.strip()
+        if line and not line.startswith(comment_prefixes):
+            yield line
+
+def _python_symbols(record: SymbolRecord, content: str, file_path: Optional[str]) -> None:
+    # Imports come from the syntax tree (a cached parse); declarations from one line scan.
+    # Unlike the old line-split summaries, the Imports section lists relative imports with
+    # their dots and every module of a parenthesized or multi-module import, and skips
+    # 'import' lines inside strings, so Python summaries differ there by design.
+    record.imports = imports_as_written(content)[:5]
+    record.dependencies = extract_python_imports(content, file_path)
+    decorators = record.details['decorators'] = []
+    constants = record.details['constants'] = []
+
+    for line in _source_lines(content, ('#',)):
+        if line.startswith(('import ', 'from ')):
+            continue
+
+        # Every public declaration is exported, however many the summary lists
+        if line.startswith(('def ', 'async def ')):
+            func_name = line.split('def ', 1)[1].split('(')[0].strip()
+            if not func_name.startswith('_'):
+                record.exports.append(f"function:{func_name}")
+        elif line.startswith('class '):
+            class_name = line.split('class ', 1)[1].split('(')[0].split(':')[0].strip()
+            if not class_name.startswith('_'):
+                record.exports.append(f"class:{class_name}")
+
+        if line.startswith('@') and len(decorators) < 3:
+            decorators.append(line[1:].strip())
+
+        elif line.startswith(('def ', 'async def ')) and len(record.functions) < 4:
+            func_line = line.split('def ', 1)[1]
+            func_name = func_line.split('(')[0].strip()
+            params_part = func_line.split('(')[1].split(')')[0] if '(' in func_line else ""
+            param_count = len([p for p in params_part.split(',') if p.strip() and p.strip() != 'self'])
+            record.functions.append(f"{func_name}({param_count}p)")
+
+        elif line.startswith('class ') and len(record.classes) < 3:
+            class_line = line.split('class ')[1]
+            class_name = class_line.split('(')[0].split(':')[0].strip()
+            if '(' in class_line and ')' in class_line:
+                record.classes.append(f"{class_name}({class_line.split('(')[1].split(')')[0]})")
+            else:
+                record.classes.append(class_name)
+
+        # Constants (uppercase module-level style names)
+        elif '=' in line and len(constants) < 3:
+            var_part = line.split('=')[0].strip()
+            if var_part.isupper() and not var_part.startswith('_'):
+                constants.append(var_part)
+
+    if 'async def' in content:
+        record.tags.append("Async support")
+    if '__main__' in content:
+        record.tags.append("Executable")
+    if 'if __name__' in content:
+        record.tags.append("Script entry point")
+
+def _javascript_symbols(record: SymbolRecord, content: str, file_path: Optional[str]) -> None:
+    components = record.details['components'] = []
+    interfaces = record.details['interfaces'] = []
+    types = record.details['types'] = []
+
+    for line in _source_lines(content, ('//', '/*')):
+        # Graph: every import and export
+        if line.startswith('import ') and 'from ' in line:
+            module = line.split('from ')[1].strip().strip("';\"")
+            # Only non-relative imports that are not common external packages are linked
+            if (module and not module.startswith(('./', '../', '@types/'))
+                    and module not in JS_EXTERNAL_PACKAGES):
+                record.dependencies.append(module)
+        elif line.startswith('export '):
+            words = line.split()
+            if 'function ' in line:
+                record.exports.append(f"function:{line.split('function ')[1].split('(')[0].strip()}")
+            elif 'class ' in line:
+                record.exports.append(f"class:{line.split('class ')[1].split()[0]}")
+            elif words[1:2] in (['const'], ['let'], ['var']) and len(words) > 2:
+                record.exports.append(f"variable:{words[2].split('=')[0].strip()}")
+
+        # Summary: each line feeds the first section it fits that still has room
+        if line.startswith('import ') and len(record.imports) < 5:
+            if 'from ' in line:
+                record.imports.append(line.split('from ')[1].strip().strip("';\""))
+
+        elif line.startswith(('type ', 'interface ')) and len(types) < 3:
+            if line.startswith('interface '):
+                interfaces.append(line.split('interface ')[1].split()[0])
+            else:
+                types.append(line.split('type ')[1].split('=')[0].strip())
+
+        elif ('function ' in line or '=> ' in line or 'const ' in line) and len(record.functions) < 4:
+            if 'function ' in line:
+                record.functions.append(f"{line.split('function ')[1].split('(')[0].strip()}()")
+            elif 'const ' in line and '=>' in line:
+                record.functions.append(f"{line.split('const ')[1].split('=')[0].strip()}=>")
+
+        elif line.startswith('class ') and len(record.classes) < 3:
+            record.classes.append(line.split('class ')[1].split()[0])
+
+        elif ('function ' in line or 'const ' in line) and len(components) < 2:
+            # Only reached once the function list is full
+            if any(keyword in line.upper() for keyword in ('COMPONENT', 'JSX', 'REACT')):
+                if 'function ' in line:
+                    components.append(f"FC:{line.split('function ')[1].split('(')[0].strip()}")
+                elif '(' in line or '<' in line:
+                    components.append(f"Comp:{line.split('const ')[1].split('=')[0].strip()}")
+
+    for framework in ('React', 'Vue', 'Angular', 'Express'):
+        if any(framework.lower() in module.lower() for module in record.imports):
+            record.tags.append(framework)
+    if 'typescript' in content.lower():
+        record.tags.append("TypeScript")
+
+def _compiled_symbols(record: SymbolRecord, content: str, file_path: Optional[str]) -> None:
+    """Java, C# and C/C++: includes, using directives and imports, types and functions"""
+    namespaces = record.details['namespaces'] = []
+    includes, usings, imports = [], [], []
+
+    for line in _source_lines(content, ('//', '/*')):
+        # Graph: every dependency and public class
+        if line.startswith('#include '):
+            if '<' in line and '>' in line:
+                record.dependencies.append(line.split('<')[1].split('>')[0])
+            elif '"' in line:
+                record.dependencies.append(line.split('"')[1])
+        elif line.startswith('using ') and '(' not in line:
+            # using directives; 'using (...)' statements are not imports
+            namespace = line.split('using ')[1].split(';')[0]
+            if not namespace.startswith('System.'):
+                record.dependencies.append(namespace)
+        elif line.startswith('import '):
+            package = line.split('import ')[1].split(';')[0]
+            if not package.startswith(('java.', 'javax.')):
+                record.dependencies.append(package)
+        elif line.startswith(('public class ', 'class ')):
+            record.exports.append(f"class:{(line.split('class ')[1].split() or [''])[0]}")
+
+        # Summary: each line feeds the first section it fits that still has room
+        if line.startswith('#include ') and len(includes) < 4:
+            if '<' in line and '>' in line:
+                includes.append(line.split('<')[1].split('>')[0])
+            elif '"' in line:
+                includes.append(line.split('"')[1])
+
+        elif line.startswith('using ') and len(usings) < 4:
+            usings.append(line.split('using ')[1].split(';')[0])
+
+        elif line.startswith('import ') and len(imports) < 4:
+            imports.append(line.split('import ')[1].split(';')[0])
+
+        elif line.startswith(('namespace ', 'package ')) and len(namespaces) < 2:
+            namespaces.append(line.split()[1].split(';')[0])
+
+        elif ('class ' in line or 'interface ' in line) and len(record.classes) < 3:
+            modifiers = ' '.join(m for m in ('public', 'private', 'protected', 'static') if f"{m} " in line)
+            kind = 'class' if 'class ' in line else 'interface'
+            record.classes.append(f"{modifiers} {kind} {line.split(f'{kind} ')[1].split()[0]}")
+
+        elif '(' in line and ')' in line and '{' in line and len(record.functions) < 4:
+            if any(keyword in line for keyword in ('if ', 'for ', 'while ', 'switch ')):
+                continue
+            func_part = line.split('(')[0].split()
+            if not func_part or func_part[-1].startswith(('if', 'for', 'while')):
+                continue
+            return_type = func_part[-2] if len(func_part) > 1 else "void"
+            modifiers = ' '.join(func_part[:-2])
+            record.functions.append(f"{modifiers} {return_type} {func_part[-1]}()")
+
+    record.imports = includes + usings + imports
+    if includes:
+        record.tags.append("C/C++")
+    if usings:
+        record.tags.append("C#")
+    # As before the merge, both markers look at import statements
+    if any('System.' in package for package in imports):
+        record.tags.append(".NET")
+    if any('java.' in package for package in imports):
+        record.tags.append("Java")
+
+def _go_symbols(record: SymbolRecord, content: str, file_path: Optional[str]) -> None:
+    packages = record.details['package'] = []
+    structs = record.details['structs'] = []
+    interfaces = record.details['interfaces'] = []
+    in_import_block = False
+
+    for line in _source_lines(content, ('//',)):
+        if in_import_block:
+            if line.startswith(')'):
+                in_import_block = False
+            elif '"' in line:
+                record.imports.append(line.split('"')[1])
+            continue
+
+        if line.startswith('package '):
+            packages.append(line.split('package ')[1])
+
+        elif line.startswith('import '):
+            if '(' in line and '"' not in line:
+                in_import_block = True
+            elif '"' in line:
+                record.imports.append(line.split('"')[1])
+
+        elif line.startswith('func '):
+            func_line = line.split('func ', 1)[1]
+            if func_line.startswith('(') and ')' in func_line:
+                # Method: skip the receiver
+                func_line = func_line.split(')', 1)[1].strip()
+            func_name = func_line.split('(')[0].strip()
+            record.functions.append(f"func {func_name}")
+            if func_name[:1].isupper():  # Exported in Go
+                record.exports.append(f"function:{func_name}")
+
+        elif line.startswith('type '):
+            type_parts = line.split('type ', 1)[1].split()
+            if not type_parts:
+                continue
+            type_name = type_parts[0]
+            type_kind = type_parts[1] if len(type_parts) > 1 else ""
+            # Once three structs are listed the summary takes no more types
+            if 'struct' in type_kind and len(structs) < 3:
+                structs.append(f"struct {type_name}")
+            elif 'interface' in type_kind and len(structs) < 3:
+                interfaces.append(f"interface {type_name}")
+            if type_name[:1].isupper():
+                record.exports.append(f"type:{type_name}")
+
+    record.dependencies = list(record.imports)
+    record.tags.append("Go")
+
+def _rust_symbols(record: SymbolRecord, content: str, file_path: Optional[str]) -> None:
+    mods = record.details['modules'] = []
+    enums = record.details['enums'] = []
+    traits = record.details['traits'] = []
+    structs = record.details['structs'] = []
+
+    for line in _source_lines(content, ('//',)):
+        if line.startswith('use '):
+            record.imports.append(line.split('use ')[1].split(';')[0])
+
+        elif line.startswith('mod '):
+            mods.append(line.split('mod ')[1].split(';')[0].split()[0])
+
+        elif line.startswith(('fn ', 'pub fn ')):
+            fn_name = line.replace('pub ', '').split('fn ')[1].split('(')[0].strip()
+            record.functions.append(f"fn {fn_name}")
+            record.exports.append(f"function:{fn_name}")
+
+        elif line.startswith(('struct ', 'pub struct ')):
+            struct_name = line.replace('pub ', '').split('struct ')[1].split()[0]
+            structs.append(f"struct {struct_name}")
+            record.exports.append(f"struct:{struct_name}")
+
+        elif line.startswith(('enum ', 'pub enum ')):
+            enums.append(f"enum {line.replace('pub ', '').split('enum ')[1].split()[0]}")
+
+        elif line.startswith(('trait ', 'pub trait ')):
+            traits.append(f"trait {line.replace('pub ', '').split('trait ')[1].split()[0]}")
+
+    record.dependencies = list(record.imports)
+    record.tags.append("Rust")
+
+def _php_symbols(record: SymbolRecord, content: str, file_path: Optional[str]) -> None:
+    namespaces = record.details['namespace'] = []
+    interfaces = record.details['interfaces'] = []
+
+    for line in _source_lines(content, ('//', '#')):
+        if line.startswith('namespace '):
+            namespaces.append(line.split('namespace ')[1].split(';')[0])
+
+        elif line.startswith('use '):
+            record.imports.append(line.split('use ')[1].split(';')[0])
+
+        elif line.startswith(('class ', 'abstract class ', 'final class ')):
+            class_name = line.replace('abstract ', '').replace('final ', '').split('class ')[1].split()[0]
+            record.classes.append(f"class {class_name}")
+            record.exports.append(f"class:{class_name}")
+
+        elif line.startswith(('function ', 'public function ', 'private function ', 'protected function ')):
+            func_line = line.replace('public ', '').replace('private ', '').replace('protected ', '')
+            func_name = func_line.split('function ')[1].split('(')[0].strip()
+            record.functions.append(f"function {func_name}")
+            if line.startswith(('function ', 'public function ')):
+                record.exports.append(f"function:{func_name}")
+
+        elif line.startswith('interface '):
+            interfaces.append(f"interface {line.split('interface ')[1].split()[0]}")
+
+    record.dependencies = list(record.imports)
+    record.tags.append("PHP")
+
+# Language and extractor by file type
+_EXTRACTORS: Dict[str, Tuple[str, Callable[[SymbolRecord, str, Optional[str]], None]]] = {
+    '.py': ('python', _python_symbols),
+    '.js': ('javascript', _javascript_symbols),
+    '.jsx': ('javascript', _javascript_symbols),
+    '.ts': ('javascript', _javascript_symbols),
+    '.tsx': ('javascript', _javascript_symbols),
+    '.java': ('compiled', _compiled_symbols),
+    '.cs': ('compiled', _compiled_symbols),
+    '.cpp': ('compiled', _compiled_symbols),
+    '.c': ('compiled', _compiled_symbols),
+    '.go': ('go', _go_symbols),
+    '.rs': ('rust', _rust_symbols),
+    '.php': ('php', _php_symbols),
+}
+
+# File types with a symbol extractor
+SYMBOL_EXTENSIONS = tuple(_EXTRACTORS)
+
+# Summary of each language: its name and (label, record field or detail, limit) sections in order.
+# Extractors stop most lists at the length the summary shows; limit None lists all entries.
+_SUMMARY_LAYOUTS = {
+    'python': ("Python", (("Imports", 'imports', 5), ("Classes", 'classes', None), ("Functions", 'functions', 4),
+                          ("Decorators", 'decorators', None), ("Constants", 'constants', None))),
+    'javascript': ("JavaScript/TypeScript", (("Imports", 'imports', 5), ("Components", 'components', None),
+                                             ("Classes", 'classes', None), ("Functions", 'functions', 4),
+                                             ("Interfaces", 'interfaces', None), ("Types", 'types', None))),
+    'compiled': ("Compiled language", (("Dependencies", 'imports', 5), ("Namespaces", 'namespaces', None),
+                                       ("Types", 'classes', None), ("Functions", 'functions', 4))),
+    'go': ("Go", (("Package", 'package', 1), ("Imports", 'imports', 4), ("Functions", 'functions', 4),
+                  ("Structs", 'structs', None), ("Interfaces", 'interfaces', None))),
+    'rust': ("Rust", (("Uses", 'imports', 4), ("Modules", 'modules', 3), ("Functions", 'functions', 4),
+                      ("Structs", 'structs', 3), ("Enums", 'enums', 3), ("Traits", 'traits', 2))),
+    'php': ("PHP", (("Namespace", 'namespace', 1), ("Uses", 'imports', 4), ("Classes", 'classes', 3),
+                    ("Functions", 'functions', 4), ("Interfaces", 'interfaces', 2))),
+}
+
+def extract_symbols(content: str, file_type: str, file_path: Optional[str] = None) -> Optional[SymbolRecord]:
+    """Extract a source file's symbols, or None for file types without an extractor
+
+    file_path (relative to the repository root) is what Python relative imports resolve
+    against. An extractor error is recorded in the returned record's error.
+    """
+    if file_type not in _EXTRACTORS:
+        return None
+    language, extractor = _EXTRACTORS[file_type]
+    record = SymbolRecord(language)
+    try:
+        extractor(record, content, file_path)
+    except Exception as e:
+        return SymbolRecord(language, error=str(e))
+    return record
+
+def summarize_symbols(record: SymbolRecord) -> str:
+    """Concise code summary of a symbol record for AI agents"""
+    name, sections = _SUMMARY_LAYOUTS[record.language]
+    if record.error is not None:
+        return f"{name} file (parsing error: {record.error[:30]})"
+
+    summary_parts = []
+    for label, key, limit in sections:
+        items = record.details.get(key) if key in record.details else getattr(record, key)
+        if items:
+            summary_parts.append(f"{label}: {', '.join(items[:limit])}")
+    summary_parts.extend(record.tags)
+    return ' | '.join(summary_parts) if summary_parts else f"{name} module"